@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""章节检测基准测试 - 对比逐行逐模式匹配与单遍预编译扫描"""
+import argparse
+import random
+import re
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Tuple
+from src.chunking.chapter_detector import ChapterDetector
+
+
+def generate_corpus(num_lines: int, chapter_every: int = 200, seed: int = 0) -> str:
+    """
+    生成合成的网络小说文本
+
+    Args:
+        num_lines: 总行数
+        chapter_every: 平均每隔多少行出现一个章节标题
+        seed: 随机种子
+
+    Returns:
+        文本内容
+    """
+    rng = random.Random(seed)
+    body = [
+        "　　他抬头看了一眼天色，转身走进了雨里。",
+        "　　“你真的要走？”她低声问道。",
+        "　　1999年的冬天格外漫长，街上几乎没有行人。",
+        "",
+    ]
+    lines = []
+    chapter = 0
+    for _ in range(num_lines):
+        if rng.randrange(chapter_every) == 0:
+            chapter += 1
+            lines.append(f"第{chapter}章 风起云涌")
+        else:
+            lines.append(rng.choice(body))
+    return "\n".join(lines)
+
+
+def detect_naive(content: str) -> List[Tuple[str, int, int]]:
+    """逐行逐模式匹配（旧实现）"""
+    chapters = []
+    for line_num, line in enumerate(content.split("\n")):
+        line = line.strip()
+        if not line:
+            continue
+        for pattern, level in ChapterDetector.PATTERNS:
+            if re.match(pattern, line, re.MULTILINE):
+                chapters.append((line, level, line_num + 1))
+                break
+    return chapters
+
+
+def timed(func, *args):
+    """返回 (结果, 耗时秒数)"""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="章节检测基准测试")
+    parser.add_argument("--lines", type=int, default=3_000_000, help="合成文本行数（默认: 3000000）")
+    parser.add_argument("--encoding", type=str, default="gb18030", help="写入临时文件的编码（默认: gb18030）")
+    parser.add_argument("--skip-naive", action="store_true", help="跳过旧实现")
+    args = parser.parse_args()
+
+    content = generate_corpus(args.lines)
+    detector = ChapterDetector()
+    print(f"📚 合成文本: {args.lines:,} 行，{len(content):,} 个字符")
+
+    chapters, elapsed = timed(detector.detect_txt_chapters, content)
+    print(f"⚡ 单遍扫描（字符串）: {elapsed:.2f}s，{args.lines / elapsed:,.0f} 行/秒，{len(chapters)} 个章节")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / "corpus.txt"
+        path.write_bytes(content.encode(args.encoding))
+        file_chapters, elapsed = timed(detector.detect_file_chapters, str(path))
+        print(f"⚡ 单遍扫描（内存映射 {args.encoding}）: {elapsed:.2f}s，{args.lines / elapsed:,.0f} 行/秒")
+
+    if not args.skip_naive:
+        expected, elapsed = timed(detect_naive, content)
+        print(f"🐢 逐行逐模式匹配: {elapsed:.2f}s，{args.lines / elapsed:,.0f} 行/秒")
+        actual = [(c.title, c.level, c.line_start) for c in chapters]
+        assert actual == expected, "单遍扫描结果与旧实现不一致"
+        assert [(c.title, c.line_start) for c in file_chapters] == [(t, n) for t, _, n in expected]
+        print("✅ 结果一致")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""量化索引基准测试 - 对比 Chroma HNSW 与 int8 / 二值量化索引的召回率、延迟和常驻内存"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, List, Tuple
+import numpy as np
+from src.quantized_index import QuantizedIndex
+
+# 写入时每批的向量数
+ADD_BATCH_SIZE = 5000
+
+
+def generate_vectors(num: int, dim: int, clusters: int, seed: int = 0) -> np.ndarray:
+    """
+    生成聚类分布的归一化向量（近似真实 embedding 的分布）
+
+    Args:
+        num: 向量数
+        dim: 维度
+        clusters: 聚类中心数
+        seed: 随机种子
+
+    Returns:
+        float32 向量（num × dim）
+    """
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    vectors = centers[rng.integers(0, clusters, num)] + rng.standard_normal((num, dim)).astype(np.float32) * 0.8
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def load_collection_vectors(limit: int) -> np.ndarray:
+    """分页读取向量库中已有的 embedding"""
+    from src.vector_store import get_vector_store
+
+    collection = get_vector_store().collection
+    pages = []
+    offset = 0
+    while offset < limit:
+        page = collection.get(limit=min(ADD_BATCH_SIZE, limit - offset), offset=offset, include=["embeddings"])
+        if not page["ids"]:
+            break
+        pages.append(np.asarray(page["embeddings"], dtype=np.float32))
+        offset += len(page["ids"])
+    vectors = np.concatenate(pages)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def make_queries(vectors: np.ndarray, num: int, seed: int = 1) -> np.ndarray:
+    """在库中向量附近取查询向量"""
+    rng = np.random.default_rng(seed)
+    queries = vectors[rng.integers(0, len(vectors), num)]
+    queries = queries + rng.standard_normal(queries.shape).astype(np.float32) * 0.3 / np.sqrt(vectors.shape[1]) * 8
+    return queries / np.linalg.norm(queries, axis=1, keepdims=True)
+
+
+def exact_top_k(vectors: np.ndarray, queries: np.ndarray, k: int) -> List[set]:
+    """暴力计算真实的 top_k"""
+    truth = []
+    for start in range(0, len(queries), 256):
+        scores = queries[start:start + 256] @ vectors.T
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        truth.extend(set(row.tolist()) for row in top)
+    return truth
+
+
+def measure(search: Callable[[np.ndarray], List[int]], queries: np.ndarray, truth: List[set], k: int) -> Tuple[float, float, float]:
+    """
+    逐个查询计时
+
+    Returns:
+        (平均召回率, 平均延迟毫秒, P95 延迟毫秒)
+    """
+    recalls, latencies = [], []
+    for query, expected in zip(queries, truth):
+        start = time.perf_counter()
+        found = search(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+        recalls.append(len(expected & set(found[:k])) / k)
+    return float(np.mean(recalls)), float(np.mean(latencies)), float(np.percentile(latencies, 95))
+
+
+def bench_hnsw(vectors: np.ndarray, queries: np.ndarray, truth: List[set], k: int) -> Tuple[float, float, float]:
+    """Chroma HNSW（当前检索路径）"""
+    import chromadb
+
+    client = chromadb.EphemeralClient()
+    collection = client.create_collection(name="bench_hnsw", metadata={"hnsw:space": "cosine"})
+    batch_size = min(ADD_BATCH_SIZE, client.get_max_batch_size())
+    for start in range(0, len(vectors), batch_size):
+        batch = vectors[start:start + batch_size]
+        collection.add(ids=[str(i) for i in range(start, start + len(batch))], embeddings=batch)
+
+    def search(query):
+        result = collection.query(query_embeddings=[query], n_results=k, include=[])
+        return [int(i) for i in result["ids"][0]]
+
+    return measure(search, queries, truth, k)
+
+
+def bench_quantized(
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    truth: List[set],
+    k: int,
+    quantization: str,
+    candidates: int,
+    index_dir: Path,
+) -> Tuple[float, float, float, int]:
+    """量化索引（粗排 + 全精度精排）"""
+    index = QuantizedIndex(path=index_dir / quantization, quantization=quantization)
+    for start in range(0, len(vectors), ADD_BATCH_SIZE):
+        batch = vectors[start:start + ADD_BATCH_SIZE]
+        index.add([str(i) for i in range(start, start + len(batch))], batch, [""] * len(batch))
+
+    def search(query):
+        return [int(chunk_id) for chunk_id, _ in index.search(query, k, candidates=candidates)]
+
+    return (*measure(search, queries, truth, k), index.stats()["code_bytes"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="量化索引基准测试")
+    parser.add_argument("--num", type=int, default=100_000, help="向量数（默认: 100000）")
+    parser.add_argument("--dim", type=int, default=384, help="合成向量的维度（默认: 384）")
+    parser.add_argument("--clusters", type=int, default=1000, help="合成向量的聚类中心数（默认: 1000）")
+    parser.add_argument("--queries", type=int, default=200, help="查询数（默认: 200）")
+    parser.add_argument("--k", type=int, default=10, help="top_k（默认: 10）")
+    parser.add_argument(
+        "--candidates",
+        type=int,
+        nargs="+",
+        default=[50, 100, 400],
+        help="粗排保留的候选数，可以给多个（默认: 50 100 400）",
+    )
+    parser.add_argument("--from-collection", action="store_true", help="使用向量库中已有的 embedding")
+    parser.add_argument("--skip-hnsw", action="store_true", help="跳过 HNSW")
+    args = parser.parse_args()
+
+    if args.from_collection:
+        vectors = load_collection_vectors(args.num)
+        print(f"🗄️ 向量库 embedding: {len(vectors):,} 个，{vectors.shape[1]} 维")
+    else:
+        vectors = generate_vectors(args.num, args.dim, args.clusters)
+        print(f"🎲 合成向量: {len(vectors):,} 个，{vectors.shape[1]} 维，{args.clusters} 个聚类")
+
+    queries = make_queries(vectors, args.queries)
+    truth = exact_top_k(vectors, queries, args.k)
+    float_bytes = vectors.nbytes
+
+    print(f"\n{'方式':<22}{'recall@' + str(args.k):>10}{'平均延迟':>12}{'P95':>10}{'常驻向量':>12}{'压缩比':>8}")
+
+    def row(name, recall, mean_ms, p95_ms, resident):
+        print(
+            f"{name:<22}{recall:>10.3f}{mean_ms:>10.2f}ms{p95_ms:>8.2f}ms"
+            f"{resident / 2**20:>10.1f}MB{float_bytes / resident:>7.1f}x"
+        )
+
+    if not args.skip_hnsw:
+        # HNSW 的常驻内存按 float32 向量计算（不含图结构）
+        row("HNSW (float32)", *bench_hnsw(vectors, queries, truth, args.k), float_bytes)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for quantization in ("int8", "binary"):
+            for candidates in args.candidates:
+                row(
+                    f"{quantization} + 精排 {candidates}",
+                    *bench_quantized(
+                        vectors, queries, truth, args.k, quantization, candidates, Path(tmp_dir) / str(candidates)
+                    ),
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,42 +1,87 @@
 #!/usr/bin/env python3
 """文档摄入脚本 - 加载文档、切片并存入向量数据库"""
 import argparse
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List
-from src.chunking.splitter import get_text_splitter
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from src.config import config
+from src.chunking.chapter_splitter import ChapterAwareSplitter
 from src.loaders import get_loader
 from src.loaders.base import Document
+from src.manifest import FileFingerprint, file_fingerprint, hash_chunk, make_chunk_ids
 from src.vector_store import get_vector_store
 
+# 流水线模式下，每次写入向量库的最小块数（跨文件攒批）
+DEFAULT_BATCH_SIZE = 512
 
-def split_documents(documents: List[Document]) -> List[Document]:
+
+def split_documents(documents: Iterable[Document]) -> List[Document]:
     """
-    切分文档
+    按章节切分文档，每个块带有章节和页码信息
 
     Args:
-        documents: 原始文档列表
+        documents: 原始文档（可以是加载器的惰性迭代器）
 
     Returns:
         切分后的文档列表
     """
-    chunked_docs = []
+    return ChapterAwareSplitter().split_documents(documents)
+
+
+def load_chunks(file_path: str) -> Tuple[int, List[Document]]:
+    """
+    逐段加载并切分文件，原始文档段切分后即可释放
+
+    Args:
+        file_path: 文件路径
+
+    Returns:
+        (文档段数量, 切分后的文档列表)
+    """
+    num_documents = 0
+
+    def counted() -> Iterator[Document]:
+        nonlocal num_documents
+        for doc in get_loader(file_path).iter_load(file_path):
+            num_documents += 1
+            yield doc
 
-    for doc in documents:
-        chunks = get_text_splitter().split_text(doc.content)
+    chunked_docs = split_documents(counted())
+    return num_documents, chunked_docs
 
-        for i, chunk in enumerate(chunks):
-            chunked_doc = Document(
-                content=chunk,
-                metadata={
-                    **doc.metadata,
-                    "chunk_index": i,
-                    "total_chunks": len(chunks),
-                },
-                source=doc.source,
-            )
-            chunked_docs.append(chunked_doc)
 
-    return chunked_docs
+@dataclass
+class LoadedFile:
+    """工作进程加载并切分后的文件"""
+    num_documents: int
+    chunks: List[Document]
+    chunk_ids: List[str]
+    chunk_hashes: List[str]
+    fingerprint: FileFingerprint
+
+
+def load_and_split(file_path: str) -> LoadedFile:
+    """
+    加载并切分单个文件（在工作进程中执行）
+
+    Args:
+        file_path: 文件路径
+
+    Returns:
+        加载结果（包含块、chunk ID、块哈希和文件指纹）
+    """
+    fingerprint = file_fingerprint(file_path)
+    num_documents, chunked_docs = load_chunks(file_path)
+    # 按来源和内容生成 ID，与 add_documents 的默认规则一致，跨文件攒批时也不会冲突
+    chunk_ids = make_chunk_ids(chunked_docs)
+    return LoadedFile(
+        num_documents=num_documents,
+        chunks=chunked_docs,
+        chunk_ids=chunk_ids,
+        chunk_hashes=[hash_chunk(doc) for doc in chunked_docs],
+        fingerprint=fingerprint,
+    )
 
 
 def ingest_file(file_path: str, vector_store, clear_source: bool = False):
@@ -46,7 +91,7 @@ def ingest_file(file_path: str, vector_store, clear_source: bool = False):
     Args:
         file_path: 文件路径
         vector_store: 向量存储实例
-        clear_source: 是否先清除该来源的旧数据
+        clear_source: 是否先清除该来源的旧数据（强制全量重新摄入）
     """
     path = Path(file_path)
 
@@ -54,26 +99,24 @@ def ingest_file(file_path: str, vector_store, clear_source: bool = False):
         print(f"❌ 文件不存在: {file_path}")
         return
 
-    print(f"📄 正在处理: {path.name}")
-
-    # 获取加载器
-    loader = get_loader(str(path))
+    # 清除旧数据（如果需要），同时清除清单记录
+    if clear_source:
+        vector_store.delete_by_source(str(path))
+    elif vector_store.manifest.is_unchanged(str(path)):
+        print(f"⏭️  未变化，跳过: {path.name}")
+        return
 
-    # 加载文档
-    documents = loader.load(str(path))
-    print(f"   加载了 {len(documents)} 个文档段")
+    print(f"📄 正在处理: {path.name}")
+    fingerprint = file_fingerprint(str(path))
 
-    # 切分文档
-    chunked_docs = split_documents(documents)
+    # 逐段加载并切分文档
+    num_documents, chunked_docs = load_chunks(str(path))
+    print(f"   加载了 {num_documents} 个文档段")
     print(f"   切分为 {len(chunked_docs)} 个块")
 
-    # 清除旧数据（如果需要）
-    if clear_source:
-        vector_store.delete_by_source(str(path))
-
-    # 添加到向量存储
-    vector_store.add_documents(chunked_docs)
-    print(f"   ✅ 已添加到向量数据库")
+    # 增量写入向量存储：只 embedding 变化的块
+    added, deleted = vector_store.sync_source(str(path), chunked_docs, fingerprint)
+    print(f"   ✅ 已同步到向量数据库（写入 {added} 个块，删除 {deleted} 个块）")
 
 
 def ingest_directory(
@@ -81,6 +124,8 @@ def ingest_directory(
     vector_store,
     recursive: bool = True,
     clear: bool = False,
+    workers: int = 1,
+    batch_size: int = DEFAULT_BATCH_SIZE,
 ):
     """
     摄入目录中的所有支持的文档
@@ -90,6 +135,8 @@ def ingest_directory(
         vector_store: 向量存储实例
         recursive: 是否递归处理子目录
         clear: 是否先清空数据库
+        workers: 解析进程数，大于 1 时启用流水线模式
+        batch_size: 流水线模式下每批写入的最小块数
     """
     dir_path = Path(directory)
 
@@ -122,12 +169,155 @@ def ingest_directory(
 
     print(f"📁 找到 {len(files)} 个文档文件\n")
 
+    if workers > 1:
+        ingest_files_parallel(sorted(files), vector_store, workers, batch_size)
+        return
+
     for file_path in sorted(files):
         ingest_file(str(file_path), vector_store)
 
     print(f"\n✨ 摄入完成！共处理 {len(files)} 个文件")
 
 
+def ingest_files_parallel(
+    files: List[Path],
+    vector_store,
+    workers: int,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Tuple[int, int]:
+    """
+    流水线方式摄入多个文件
+
+    加载和切分在进程池中并行执行；主进程作为唯一的消费者，
+    把多个文件的块攒成大批次后统一 embedding 并写入向量库。
+    写入期间工作进程继续解析后续文件，CPU 解析与模型推理互相重叠。
+    与 ingest_file 一样按摄入清单跳过未变化的文件，只写入变化的块。
+
+    Args:
+        files: 文件路径列表
+        vector_store: 向量存储实例
+        workers: 工作进程数
+        batch_size: 每批写入的最小块数
+
+    Returns:
+        (成功文件数, 失败文件数)
+    """
+    manifest = vector_store.manifest
+    succeeded = 0
+    failed = 0
+    done = 0
+
+    unchanged = [path for path in files if manifest.is_unchanged(str(path))]
+    if unchanged:
+        print(f"⏭️  跳过 {len(unchanged)} 个未变化的文件")
+        skipped = set(unchanged)
+        files = [path for path in files if path not in skipped]
+    total = len(files)
+
+    # 待写入的批次（同一文件的块总是在同一批次中）
+    # pending_files 中每个文件附带写入成功后要删除的旧块 ID（None 表示删除来源中多余的全部旧块）
+    pending_docs: List[Document] = []
+    pending_ids: List[str] = []
+    pending_files: List[Tuple[Path, LoadedFile, Optional[List[str]]]] = []
+
+    def flush() -> None:
+        nonlocal succeeded, failed, pending_docs, pending_ids, pending_files
+        if not pending_files:
+            return
+        try:
+            vector_store.add_documents(pending_docs, chunk_ids=pending_ids)
+            print(f"   ✅ 已写入 {len(pending_docs)} 个块（{len(pending_files)} 个文件）")
+        except Exception as e:
+            failed += len(pending_files)
+            names = ", ".join(path.name for path, _, _ in pending_files)
+            print(f"   ❌ 写入失败（{names}）: {e}")
+            pending_files = []
+
+        # 新块写入成功后再删除旧块并更新清单，失败的文件下次会重新处理
+        for path, loaded, to_delete in pending_files:
+            source = str(path)
+            try:
+                if to_delete is None:
+                    vector_store.delete_stale(source, loaded.chunk_ids)
+                else:
+                    vector_store.delete_ids(to_delete)
+                manifest.record(source, loaded.fingerprint, loaded.chunk_ids, loaded.chunk_hashes)
+                succeeded += 1
+            except Exception as e:
+                failed += 1
+                print(f"   ❌ 清理旧块失败（{path.name}）: {e}")
+        pending_docs, pending_ids, pending_files = [], [], []
+
+    print(f"⚙️  流水线模式: {workers} 个解析进程，批大小 {batch_size}\n")
+
+    file_iter = iter(files)
+    # 限制在途任务数，避免解析结果在内存中无限堆积
+    max_in_flight = workers * 2
+    in_flight: Dict[Future, Path] = {}
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        def submit_next() -> None:
+            for path in file_iter:
+                in_flight[executor.submit(load_and_split, str(path))] = path
+                if len(in_flight) >= max_in_flight:
+                    break
+
+        submit_next()
+
+        while in_flight:
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+
+            for future in finished:
+                path = in_flight.pop(future)
+                done += 1
+
+                try:
+                    loaded = future.result()
+                except Exception as e:
+                    failed += 1
+                    print(f"❌ [{done}/{total}] {path.name}: {e}")
+                    continue
+
+                source = str(path)
+                try:
+                    if manifest.get(source) is None:
+                        # 没有清单记录，写入全部块，写入后删除多余的旧块
+                        to_add, to_delete = list(range(len(loaded.chunks))), None
+                    else:
+                        to_add, to_update, to_delete = manifest.diff_chunks(
+                            source, loaded.chunk_ids, loaded.chunk_hashes
+                        )
+                        # 内容未变、只有元数据变化的块直接更新，不进入 embedding 批次
+                        vector_store.update_metadatas(
+                            [loaded.chunks[i] for i in to_update],
+                            [loaded.chunk_ids[i] for i in to_update],
+                        )
+                except Exception as e:
+                    failed += 1
+                    print(f"❌ [{done}/{total}] {path.name}: {e}")
+                    continue
+
+                print(
+                    f"📄 [{done}/{total}] {path.name}: {loaded.num_documents} 个文档段 → "
+                    f"{len(loaded.chunks)} 个块（{len(to_add)} 个需要写入）"
+                )
+
+                pending_docs.extend(loaded.chunks[i] for i in to_add)
+                pending_ids.extend(loaded.chunk_ids[i] for i in to_add)
+                pending_files.append((path, loaded, to_delete))
+
+            # 先补充任务再写入，让工作进程在 embedding 期间保持忙碌
+            submit_next()
+
+            if len(pending_docs) >= batch_size:
+                flush()
+
+        flush()
+
+    print(f"\n✨ 摄入完成！成功 {succeeded} 个，失败 {failed} 个，跳过 {len(unchanged)} 个未变化的文件")
+    return succeeded, failed
+
+
 def main():
     parser = argparse.ArgumentParser(description="文档摄入脚本")
     parser.add_argument(
@@ -147,12 +337,39 @@ def main():
         action="store_true",
         help="清空向量数据库后重新摄入",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="解析进程数，大于 1 时启用并行流水线（默认: 1）",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help=f"流水线模式下每批写入的块数（默认: {DEFAULT_BATCH_SIZE}）",
+    )
+
+    parser.add_argument(
+        "--rebuild-quantized-index",
+        action="store_true",
+        help="按向量库中的现有数据重建量化索引后退出（需要 QUANTIZED_INDEX_ENABLED=true）",
+    )
 
     args = parser.parse_args()
 
     # 获取向量存储
     vector_store = get_vector_store()
 
+    if args.rebuild_quantized_index:
+        if vector_store.quantized_index is None:
+            print("❌ 未启用量化索引（QUANTIZED_INDEX_ENABLED=false）")
+            return
+        print("🔄 正在重建量化索引...")
+        vector_store.rebuild_quantized_index()
+        print(f"✅ 量化索引已重建（{len(vector_store.quantized_index)} 个块）")
+        return
+
     path = Path(args.path)
 
     if path.is_file():
@@ -160,7 +377,14 @@ def main():
         ingest_file(str(path), vector_store, clear_source=args.clear)
     elif path.is_dir():
         # 处理目录
-        ingest_directory(str(path), vector_store, args.recursive, args.clear)
+        ingest_directory(
+            str(path),
+            vector_store,
+            args.recursive,
+            args.clear,
+            workers=args.workers,
+            batch_size=args.batch_size,
+        )
     else:
         print(f"❌ 路径不存在: {args.path}")
 
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""截断报告 - 统计有多少块超过 embedding 模型的最大 token 数（超出部分在 embedding 时被丢弃）"""
+import argparse
+from collections import Counter
+from pathlib import Path
+from typing import Iterable, Iterator, List, Tuple
+import numpy as np
+from src.config import config
+from src.chunking.splitter import get_tokenizer
+from src.loaders import LOADER_MAPPING
+
+# 每批计算 token 数的块数
+BATCH_SIZE = 1000
+
+
+def iter_collection_chunks(batch_size: int = BATCH_SIZE) -> Iterator[Tuple[List[str], List[str]]]:
+    """分页读取向量库中的块，产出 (文本列表, 来源列表)"""
+    from src.vector_store import get_vector_store
+
+    collection = get_vector_store().collection
+    offset = 0
+    while True:
+        page = collection.get(limit=batch_size, offset=offset, include=["documents", "metadatas"])
+        if not page["ids"]:
+            return
+        yield page["documents"], [metadata.get("source", "") for metadata in page["metadatas"]]
+        offset += len(page["ids"])
+
+
+def iter_file_chunks(path: Path, batch_size: int = BATCH_SIZE) -> Iterator[Tuple[List[str], List[str]]]:
+    """按当前切分配置切分文件（不写入向量库），产出 (文本列表, 来源列表)"""
+    from scripts.ingest import load_chunks
+
+    files = [path] if path.is_file() else sorted(
+        p for p in path.rglob("*") if p.suffix.lower() in LOADER_MAPPING
+    )
+    for file_path in files:
+        _, chunks = load_chunks(str(file_path))
+        for start in range(0, len(chunks), batch_size):
+            batch = chunks[start:start + batch_size]
+            yield [doc.content for doc in batch], [doc.source for doc in batch]
+
+
+def report(batches: Iterable[Tuple[List[str], List[str]]], tokenizer, max_tokens: int, top: int = 10) -> None:
+    """
+    统计并打印截断情况
+
+    Args:
+        batches: (文本列表, 来源列表) 批次
+        tokenizer: embedding 模型的 tokenizer
+        max_tokens: 模型的最大序列长度（含特殊 token）
+        top: 列出截断最多的来源数量
+    """
+    lengths: List[int] = []
+    truncated_by_source: Counter = Counter()
+
+    for texts, sources in batches:
+        encoded = tokenizer(texts, add_special_tokens=True)["input_ids"]
+        for ids, source in zip(encoded, sources):
+            lengths.append(len(ids))
+            if len(ids) > max_tokens:
+                truncated_by_source[source] += 1
+
+    if not lengths:
+        print("📭 没有块")
+        return
+
+    counts = np.asarray(lengths)
+    truncated = counts > max_tokens
+    dropped = np.clip(counts - max_tokens, 0, None).sum()
+
+    print(f"🔢 模型最大长度: {max_tokens} tokens（含特殊 token）")
+    print(f"📦 块数: {len(counts)}")
+    print(
+        f"✂️ 被截断: {truncated.sum()} 块（{truncated.mean():.1%}），"
+        f"丢弃 {dropped} / {counts.sum()} 个 token（{dropped / counts.sum():.1%}）"
+    )
+    print(
+        f"📏 token 数: 平均 {counts.mean():.0f}，中位数 {np.median(counts):.0f}，"
+        f"P95 {np.percentile(counts, 95):.0f}，最大 {counts.max()}"
+    )
+
+    if truncated_by_source:
+        print(f"\n截断最多的来源（前 {top} 个）:")
+        for source, count in truncated_by_source.most_common(top):
+            print(f"   {count:>6}  {source}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="统计 embedding 时被截断的块")
+    parser.add_argument(
+        "--path",
+        type=str,
+        default=None,
+        help="按当前切分配置统计文件或目录（默认统计向量库中已有的块）",
+    )
+    parser.add_argument("--model", type=str, default=config.EMBEDDING_MODEL, help="embedding 模型名称")
+    parser.add_argument("--top", type=int, default=10, help="列出截断最多的来源数量（默认: 10）")
+    args = parser.parse_args()
+
+    from sentence_transformers import SentenceTransformer
+
+    # 最大长度以 sentence-transformers 的 max_seq_length 为准（tokenizer 的上限通常更大）
+    max_tokens = SentenceTransformer(args.model, device=config.EMBEDDING_DEVICE).max_seq_length
+    tokenizer = get_tokenizer(args.model)
+
+    if args.path:
+        print(f"📂 切分方式: {config.CHUNK_SIZE_UNIT}（{args.path}）")
+        batches = iter_file_chunks(Path(args.path))
+    else:
+        print(f"🗄️ 向量库集合: {config.CHROMA_COLLECTION_NAME}")
+        batches = iter_collection_chunks()
+
+    report(batches, tokenizer, max_tokens, args.top)
+
+
+if __name__ == "__main__":
+    main()
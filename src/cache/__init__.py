@@ -0,0 +1,12 @@
+"""缓存模块"""
+from src.cache.answer_cache import AnswerCache, get_answer_cache
+from src.cache.embedding_cache import EmbeddingCache, get_embedding_cache
+from src.cache.lru import LRUCache
+
+__all__ = [
+    "AnswerCache",
+    "EmbeddingCache",
+    "LRUCache",
+    "get_answer_cache",
+    "get_embedding_cache",
+]
@@ -0,0 +1,219 @@
+"""语义答案缓存 - 相似问题命中相同文档块时复用已生成的答案"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+import numpy as np
+from src.config import config
+
+
+def hash_chunk_ids(chunk_ids: Sequence[str]) -> str:
+    """
+    计算检索结果的键（顺序相关，顺序不同提示词也不同）
+
+    Args:
+        chunk_ids: 检索到的 chunk ID 列表
+
+    Returns:
+        十六进制哈希值
+    """
+    return hashlib.sha256("\x1f".join(chunk_ids).encode("utf-8")).hexdigest()
+
+
+class AnswerCache:
+    """
+    基于 SQLite 的语义答案缓存
+
+    条目按 (模型, 过滤条件, 检索到的 chunk ID) 精确分组，组内比较查询向量的余弦相似度，
+    超过阈值时返回缓存的问答结果。条目超过 ttl 秒后过期，超过 max_entries 时按最近访问时间淘汰。
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        threshold: Optional[float] = None,
+        ttl: Optional[float] = None,
+        max_entries: Optional[int] = None,
+    ):
+        """
+        初始化缓存
+
+        Args:
+            path: 缓存数据库路径，默认 data/index/answer_cache.sqlite3
+            threshold: 查询向量的最低余弦相似度
+            ttl: 条目有效期（秒），0 表示不过期
+            max_entries: 最大条目数
+        """
+        self.path = str(path or config.INDEX_DIR / "answer_cache.sqlite3")
+        self.threshold = config.ANSWER_CACHE_THRESHOLD if threshold is None else threshold
+        self.ttl = config.ANSWER_CACHE_TTL if ttl is None else ttl
+        self.max_entries = max_entries or config.ANSWER_CACHE_MAX_ENTRIES
+        self.hits = 0
+        self.misses = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """获取数据库连接（延迟创建）"""
+        if self._conn is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS answers (
+                    id INTEGER PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    filter_key TEXT NOT NULL,
+                    chunk_key TEXT NOT NULL,
+                    embedding BLOB NOT NULL,
+                    result TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_answers_group ON answers (model, filter_key, chunk_key);
+                CREATE INDEX IF NOT EXISTS idx_answers_last_access ON answers (last_access);
+                """
+            )
+        return self._conn
+
+    @staticmethod
+    def _normalize(embedding: Sequence[float]) -> np.ndarray:
+        """转为单位长度的 float32 向量"""
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def get(
+        self,
+        embedding: Sequence[float],
+        model: str,
+        filter_key: str,
+        chunk_ids: Sequence[str],
+    ) -> Optional[Dict[str, Any]]:
+        """
+        查询缓存
+
+        Args:
+            embedding: 查询向量
+            model: LLM 模型名称
+            filter_key: 序列化后的过滤条件
+            chunk_ids: 本次检索到的 chunk ID 列表
+
+        Returns:
+            缓存的问答结果字典，未命中时返回 None
+        """
+        query = self._normalize(embedding)
+        now = time.time()
+        params: List[Any] = [model, filter_key, hash_chunk_ids(chunk_ids)]
+        sql = "SELECT id, embedding, result FROM answers WHERE model = ? AND filter_key = ? AND chunk_key = ?"
+        if self.ttl:
+            sql += " AND created_at >= ?"
+            params.append(now - self.ttl)
+
+        with self._lock:
+            rows = self.conn.execute(sql, params).fetchall()
+
+            best_id, best_result, best_score = None, None, self.threshold
+            for entry_id, blob, result in rows:
+                score = float(np.dot(query, np.frombuffer(blob, dtype=np.float32)))
+                if score >= best_score:
+                    best_id, best_result, best_score = entry_id, result, score
+
+            if best_id is None:
+                self.misses += 1
+                return None
+
+            with self.conn:
+                self.conn.execute("UPDATE answers SET last_access = ? WHERE id = ?", (now, best_id))
+            self.hits += 1
+
+        return json.loads(best_result)
+
+    def put(
+        self,
+        embedding: Sequence[float],
+        model: str,
+        filter_key: str,
+        chunk_ids: Sequence[str],
+        result: Dict[str, Any],
+    ) -> None:
+        """
+        写入缓存
+
+        Args:
+            embedding: 查询向量
+            model: LLM 模型名称
+            filter_key: 序列化后的过滤条件
+            chunk_ids: 检索到的 chunk ID 列表
+            result: 问答结果字典
+        """
+        now = time.time()
+        with self._lock:
+            with self.conn:
+                self.conn.execute(
+                    "INSERT INTO answers (model, filter_key, chunk_key, embedding, result, created_at, last_access) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        model,
+                        filter_key,
+                        hash_chunk_ids(chunk_ids),
+                        self._normalize(embedding).tobytes(),
+                        json.dumps(result, ensure_ascii=False),
+                        now,
+                        now,
+                    ),
+                )
+            self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        """淘汰过期和超出容量的条目（调用方需持有锁）"""
+        with self.conn:
+            if self.ttl:
+                self.conn.execute("DELETE FROM answers WHERE created_at < ?", (now - self.ttl,))
+            overflow = self.conn.execute("SELECT COUNT(*) FROM answers").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                self.conn.execute(
+                    "DELETE FROM answers WHERE id IN "
+                    "(SELECT id FROM answers ORDER BY last_access LIMIT ?)",
+                    (overflow,),
+                )
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM answers")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+
+    def stats(self) -> Dict[str, float]:
+        """
+        获取缓存统计信息
+
+        Returns:
+            命中数、未命中数、命中率和条目数
+        """
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(self),
+        }
+
+
+# 全局单例
+_answer_cache_instance = None
+
+
+def get_answer_cache() -> AnswerCache:
+    """获取全局 AnswerCache 实例"""
+    global _answer_cache_instance
+    if _answer_cache_instance is None:
+        _answer_cache_instance = AnswerCache()
+    return _answer_cache_instance
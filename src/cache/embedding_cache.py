@@ -0,0 +1,190 @@
+"""Embedding 磁盘缓存 - 避免重复 embedding 相同的文本"""
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+from src.config import config
+
+# SQLite 单条语句的参数数量有上限，批量查询时分段
+_QUERY_BATCH = 500
+
+
+def hash_text(text: str) -> str:
+    """计算文本的 SHA-256"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    基于 SQLite 的 embedding 缓存
+
+    键为 (模型名, 是否归一化, sha256(文本))，值为 float32 向量。
+    超过 max_entries 时按最近访问时间淘汰最旧的条目。
+    """
+
+    def __init__(self, path: Optional[str] = None, max_entries: Optional[int] = None):
+        """
+        初始化缓存
+
+        Args:
+            path: 缓存数据库路径，默认 data/index/embedding_cache.sqlite3
+            max_entries: 最大条目数
+        """
+        self.path = str(path or config.INDEX_DIR / "embedding_cache.sqlite3")
+        self.max_entries = max_entries or config.EMBEDDING_CACHE_MAX_ENTRIES
+        self.hits = 0
+        self.misses = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._size: Optional[int] = None
+        self._lock = threading.Lock()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """获取数据库连接（延迟创建）"""
+        if self._conn is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    model TEXT NOT NULL,
+                    normalize INTEGER NOT NULL,
+                    text_hash TEXT NOT NULL,
+                    vector BLOB NOT NULL,
+                    last_access REAL NOT NULL,
+                    PRIMARY KEY (model, normalize, text_hash)
+                );
+                CREATE INDEX IF NOT EXISTS idx_embeddings_last_access ON embeddings (last_access);
+                """
+            )
+            self._size = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        return self._conn
+
+    def get_many(self, model: str, normalize: bool, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """
+        批量查询缓存
+
+        Args:
+            model: 模型名称
+            normalize: 是否归一化
+            texts: 文本列表
+
+        Returns:
+            与 texts 对应的向量列表，未命中的位置为 None
+        """
+        hashes = [hash_text(text) for text in texts]
+        found: Dict[str, np.ndarray] = {}
+
+        with self._lock:
+            unique = list(dict.fromkeys(hashes))
+            for start in range(0, len(unique), _QUERY_BATCH):
+                batch = unique[start:start + _QUERY_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                rows = self.conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings "
+                    f"WHERE model = ? AND normalize = ? AND text_hash IN ({placeholders})",
+                    (model, int(normalize), *batch),
+                ).fetchall()
+                for text_hash, blob in rows:
+                    found[text_hash] = np.frombuffer(blob, dtype=np.float32)
+
+            if found:
+                now = time.time()
+                with self.conn:
+                    self.conn.executemany(
+                        "UPDATE embeddings SET last_access = ? "
+                        "WHERE model = ? AND normalize = ? AND text_hash = ?",
+                        [(now, model, int(normalize), text_hash) for text_hash in found],
+                    )
+
+            results = [found.get(text_hash) for text_hash in hashes]
+            hit_count = sum(vector is not None for vector in results)
+            self.hits += hit_count
+            self.misses += len(results) - hit_count
+
+        return results
+
+    def put_many(self, model: str, normalize: bool, texts: Sequence[str], vectors: np.ndarray) -> None:
+        """
+        批量写入缓存
+
+        Args:
+            model: 模型名称
+            normalize: 是否归一化
+            texts: 文本列表
+            vectors: 与 texts 对应的向量矩阵
+        """
+        if not len(texts):
+            return
+
+        now = time.time()
+        vectors = np.asarray(vectors, dtype=np.float32)
+        rows = [
+            (model, int(normalize), hash_text(text), vector.tobytes(), now)
+            for text, vector in zip(texts, vectors)
+        ]
+
+        with self._lock:
+            with self.conn:
+                before = self.conn.total_changes
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO embeddings (model, normalize, text_hash, vector, last_access) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    rows,
+                )
+                self._size += self.conn.total_changes - before
+            self._evict()
+
+    def _evict(self) -> None:
+        """淘汰最久未访问的条目（调用方需持有锁）"""
+        overflow = self._size - self.max_entries
+        if overflow <= 0:
+            return
+
+        with self.conn:
+            self.conn.execute(
+                "DELETE FROM embeddings WHERE rowid IN "
+                "(SELECT rowid FROM embeddings ORDER BY last_access LIMIT ?)",
+                (overflow,),
+            )
+        self._size -= overflow
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM embeddings")
+            self._size = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def stats(self) -> Dict[str, float]:
+        """
+        获取缓存统计信息
+
+        Returns:
+            命中数、未命中数、命中率和条目数
+        """
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(self),
+        }
+
+
+# 全局单例
+_embedding_cache_instance = None
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """获取全局 EmbeddingCache 实例"""
+    global _embedding_cache_instance
+    if _embedding_cache_instance is None:
+        _embedding_cache_instance = EmbeddingCache()
+    return _embedding_cache_instance
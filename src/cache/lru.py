@@ -0,0 +1,100 @@
+"""线程安全的 LRU 缓存"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class LRUCache:
+    """
+    进程内有界 LRU 缓存
+
+    超过 maxsize 时淘汰最久未使用的条目；maxsize 为 0 时不缓存。
+    设置 ttl 时条目写入 ttl 秒后过期（用于缓存可能被其他进程改变的数据）。
+    """
+
+    def __init__(self, maxsize: int = 128, ttl: float = 0):
+        """
+        初始化缓存
+
+        Args:
+            maxsize: 最大条目数
+            ttl: 条目有效期（秒），0 表示不过期
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        # 键 -> (过期时间, 值)，不过期的条目过期时间为 None
+        self._data: "OrderedDict[Hashable, Tuple[Optional[float], Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        获取缓存值
+
+        Args:
+            key: 缓存键
+            default: 未命中时的返回值
+
+        Returns:
+            缓存值或 default
+        """
+        with self._lock:
+            if key in self._data:
+                expires, value = self._data[key]
+                if expires is None or time.monotonic() < expires:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """
+        写入缓存
+
+        Args:
+            key: 缓存键
+            value: 缓存值
+        """
+        if self.maxsize <= 0:
+            return
+
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl if self.ttl > 0 else None, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            if key not in self._data:
+                return False
+            expires = self._data[key][0]
+            return expires is None or time.monotonic() < expires
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+    def stats(self) -> Dict[str, float]:
+        """
+        获取缓存统计信息
+
+        Returns:
+            命中数、未命中数、命中率和条目数
+        """
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(self),
+        }
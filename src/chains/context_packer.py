@@ -0,0 +1,242 @@
+"""上下文打包 - 在 token 预算内按相关度组织检索到的文档块"""
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from src.chunking.chapter_splitter import document_key
+from src.chunking.splitter import MIN_OVERLAP_CHARS, overlap_length
+
+# 预算剩余不足该 token 数时不再截断放入下一个块
+MIN_PARTIAL_TOKENS = 64
+
+_CJK_RE = re.compile(r"[　-〿㐀-䶿一-鿿豈-﫿＀-￯]")
+
+_encoding = None
+
+
+def count_tokens(text: str) -> int:
+    """
+    计算文本的 token 数
+
+    安装了 tiktoken 时使用 cl100k_base 编码，否则按中日韩字符每字 1 个、其余字符每 4 个 1 个估算。
+
+    Args:
+        text: 文本
+
+    Returns:
+        token 数
+    """
+    global _encoding
+    if _encoding is None:
+        try:
+            import tiktoken
+
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except ImportError:
+            _encoding = False
+
+    if _encoding:
+        return len(_encoding.encode(text, disallowed_special=()))
+
+    cjk = len(_CJK_RE.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+@dataclass
+class _Block:
+    """合并后的连续文本块"""
+    rank: int
+    file_name: str
+    first_index: int
+    last_index: int
+    text: str
+    sources: List[Dict[str, Any]] = field(default_factory=list)
+    chunk_ids: Set[str] = field(default_factory=set)
+
+    def format(self, text: Optional[str] = None) -> str:
+        """格式化为提示词中的一段参考文档"""
+        if self.first_index == self.last_index:
+            label = f"第{self.first_index}块"
+        else:
+            label = f"第{self.first_index}-{self.last_index}块"
+        return f"[{self.file_name} {label}]\n内容：{self.text if text is None else text}"
+
+
+@dataclass
+class PackedContext:
+    """打包后的上下文"""
+    text: str
+    sources: List[Dict[str, Any]]  # 放入上下文的来源（保持检索顺序）
+    tokens: int
+    original_tokens: int  # 逐块拼接全部来源时的 token 数
+    merged_chunks: int = 0  # 合并进相邻块的块数
+    dropped_chunks: int = 0  # 超出预算未放入的块数
+    truncated_chunks: int = 0  # 被截断后放入的块数
+
+    @property
+    def tokens_saved(self) -> int:
+        """相对逐块拼接节省的 token 数"""
+        return self.original_tokens - self.tokens
+
+    def stats(self) -> Dict[str, int]:
+        """打包统计信息"""
+        return {
+            "tokens": self.tokens,
+            "original_tokens": self.original_tokens,
+            "tokens_saved": self.tokens_saved,
+            "merged_chunks": self.merged_chunks,
+            "dropped_chunks": self.dropped_chunks,
+            "truncated_chunks": self.truncated_chunks,
+        }
+
+
+class ContextPacker:
+    """
+    上下文打包器
+
+    - 同一来源（同一页 / 同一段）中 chunk_index 连续的块合并为一段，并去掉切分时的重叠部分
+    - 合并后的段落按其中最相关块的排名排序，依次放入直到用完 token 预算
+    - 放不下的段落在剩余预算足够时截断放入，否则跳过，继续尝试后面更短的段落
+    """
+
+    def __init__(
+        self,
+        token_counter: Callable[[str], int] = count_tokens,
+        min_overlap: int = MIN_OVERLAP_CHARS,
+    ):
+        """
+        初始化打包器
+
+        Args:
+            token_counter: token 计数函数
+            min_overlap: 相邻块去重的最小重叠字符数
+        """
+        self.token_counter = token_counter
+        self.min_overlap = min_overlap
+
+    def pack(self, sources: List[Dict[str, Any]], budget: int) -> PackedContext:
+        """
+        在 token 预算内打包上下文
+
+        Args:
+            sources: 按相关度降序排列的来源列表
+            budget: 上下文的 token 预算
+
+        Returns:
+            打包后的上下文
+        """
+        blocks, merged = self._merge(sources)
+        separator_tokens = self.token_counter("\n\n")
+
+        parts: List[str] = []
+        included: List[Dict[str, Any]] = []
+        used = dropped = truncated = 0
+
+        for block in blocks:
+            separator = separator_tokens if parts else 0
+            text = block.format()
+            tokens = self.token_counter(text)
+
+            if used + separator + tokens > budget:
+                remaining = budget - used - separator
+                text = self._truncate(block, remaining) if remaining >= MIN_PARTIAL_TOKENS else None
+                if text is None:
+                    dropped += len(block.sources)
+                    continue
+                tokens = self.token_counter(text)
+                truncated += len(block.sources)
+
+            parts.append(text)
+            included.extend(block.sources)
+            used += separator + tokens
+
+        original = "\n\n".join(
+            _Block(0, self._file_name(source), index, index, source.get("content", "")).format()
+            for source in sources
+            for index in [source.get("metadata", {}).get("chunk_index", 0) + 1]
+        )
+        order = {id(source): rank for rank, source in enumerate(sources)}
+
+        return PackedContext(
+            text="\n\n".join(parts),
+            sources=sorted(included, key=lambda source: order[id(source)]),
+            tokens=used,
+            original_tokens=self.token_counter(original) if sources else 0,
+            merged_chunks=merged,
+            dropped_chunks=dropped,
+            truncated_chunks=truncated,
+        )
+
+    @staticmethod
+    def _file_name(source: Dict[str, Any]) -> str:
+        """来源的文件名（不含扩展名）"""
+        source_file = source.get("source", "未知来源")
+        return Path(source_file).stem if source_file != "未知来源" else "未知"
+
+    def _merge(self, sources: List[Dict[str, Any]]) -> Tuple[List[_Block], int]:
+        """
+        合并同一来源中相邻的块
+
+        Returns:
+            (按最相关块排名排序的段落列表, 被合并的块数)
+        """
+        groups: Dict[tuple, List[Tuple[int, Dict[str, Any]]]] = {}
+        for rank, source in enumerate(sources):
+            # chunk_index 只在同一文档内唯一（见 document_key）
+            key = document_key(source.get("metadata", {}), source.get("source"))
+            groups.setdefault(key, []).append((rank, source))
+
+        blocks: List[_Block] = []
+        merged = 0
+        for members in groups.values():
+            members.sort(key=lambda member: member[1].get("metadata", {}).get("chunk_index", 0))
+            block: Optional[_Block] = None
+            for rank, source in members:
+                metadata = source.get("metadata", {})
+                index = metadata.get("chunk_index", 0) + 1
+                # 检索时扩展过相邻块的段落覆盖 chunk_index ~ last_chunk_index
+                last_index = metadata.get("last_chunk_index", index - 1) + 1
+                content = source.get("content", "")
+
+                ids = self._chunk_ids(source)
+                if block is not None and ids and ids <= block.chunk_ids:
+                    # 重复的块（如多路召回的同一块，或已包含在扩展段落中的块）
+                    block.rank = min(block.rank, rank)
+                    block.sources.append(source)
+                    merged += 1
+                    continue
+
+                if block is not None and index == block.last_index + 1:
+                    overlap = overlap_length(block.text, content, self.min_overlap)
+                    block.text += content[overlap:]
+                    block.last_index = last_index
+                    block.chunk_ids |= ids
+                    block.rank = min(block.rank, rank)
+                    block.sources.append(source)
+                    merged += 1
+                    continue
+
+                block = _Block(rank, self._file_name(source), index, last_index, content, [source], ids)
+                blocks.append(block)
+
+        blocks.sort(key=lambda block: block.rank)
+        return blocks, merged
+
+    @staticmethod
+    def _chunk_ids(source: Dict[str, Any]) -> Set[str]:
+        """块包含的 chunk ID（扩展过相邻块的段落为 metadata 中的 chunk_ids）"""
+        ids = source.get("metadata", {}).get("chunk_ids") or [source.get("id")]
+        return {chunk_id for chunk_id in ids if chunk_id is not None}
+
+    def _truncate(self, block: _Block, budget: int) -> Optional[str]:
+        """二分查找能放入预算的最长前缀，放不下标题时返回 None"""
+        low, high = 0, len(block.text)
+        best = None
+        while low <= high:
+            middle = (low + high) // 2
+            text = block.format(block.text[:middle] + "…")
+            if self.token_counter(text) <= budget:
+                best, low = text, middle + 1
+            else:
+                high = middle - 1
+        return best
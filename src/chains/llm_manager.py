@@ -1,7 +1,48 @@
 """LLM 管理器 - 使用 OpenRouter 统一管理多个 LLM"""
+import asyncio
 import os
-from typing import Optional
-from openai import OpenAI
+import random
+import weakref
+from dataclasses import dataclass
+from typing import AsyncIterator, Iterator, Optional
+import httpx
+from openai import AsyncOpenAI, OpenAI, APIConnectionError, InternalServerError, RateLimitError
+from src.config import config
+
+# 可重试的错误：连接失败（含超时）、限流、服务端 5xx
+RETRYABLE_ERRORS = (APIConnectionError, RateLimitError, InternalServerError)
+
+
+@dataclass
+class _AsyncResources:
+    """同一事件循环内所有 LLMManager 共享的异步资源"""
+    http_client: httpx.AsyncClient
+    semaphore: asyncio.Semaphore
+
+
+# 连接池和信号量都绑定事件循环，按事件循环分别创建
+_async_resources: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _AsyncResources]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _get_async_resources() -> _AsyncResources:
+    """获取当前事件循环共享的 HTTP 连接池和并发信号量"""
+    loop = asyncio.get_running_loop()
+    resources = _async_resources.get(loop)
+    if resources is None:
+        resources = _AsyncResources(
+            http_client=httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=config.LLM_MAX_CONCURRENCY,
+                    max_keepalive_connections=config.LLM_MAX_CONCURRENCY,
+                ),
+                timeout=config.LLM_TIMEOUT,
+            ),
+            semaphore=asyncio.Semaphore(config.LLM_MAX_CONCURRENCY),
+        )
+        _async_resources[loop] = resources
+    return resources
 
 
 class LLMManager:
@@ -27,6 +68,18 @@ class LLMManager:
         "llama": "meta-llama/llama-3-70b",
     }
 
+    # 常用模型的上下文窗口（token 数）
+    CONTEXT_WINDOWS = {
+        "deepseek/deepseek-chat": 64000,
+        "deepseek/deepseek-r1": 64000,
+        "openai/gpt-4-turbo": 128000,
+        "openai/gpt-3.5-turbo": 16385,
+        "anthropic/claude-3-opus": 200000,
+        "anthropic/claude-3-sonnet": 200000,
+        "google/gemini-pro": 32760,
+        "meta-llama/llama-3-70b": 8192,
+    }
+
     def __init__(
         self,
         api_key: str = None,
@@ -48,6 +101,12 @@ class LLMManager:
         self.client = OpenAI(
             base_url=self.BASE_URL,
             api_key=self.api_key,
+            timeout=config.LLM_TIMEOUT,
+            max_retries=config.LLM_MAX_RETRIES,
+        )
+        # 异步客户端按事件循环创建，共享同一个连接池
+        self._async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncOpenAI]" = (
+            weakref.WeakKeyDictionary()
         )
 
         # 设置默认模型
@@ -60,6 +119,29 @@ class LLMManager:
 
         self.temperature = temperature
 
+    @property
+    def async_client(self) -> AsyncOpenAI:
+        """获取当前事件循环的异步客户端（需在协程中调用）"""
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            client = AsyncOpenAI(
+                base_url=self.BASE_URL,
+                api_key=self.api_key,
+                http_client=_get_async_resources().http_client,
+                timeout=config.LLM_TIMEOUT,
+                # 重试由 _retry_delay 控制，避免与 SDK 内置重试叠加
+                max_retries=0,
+            )
+            self._async_clients[loop] = client
+        return client
+
+    @staticmethod
+    def _retry_delay(attempt: int) -> float:
+        """第 attempt 次重试前的等待时间（指数退避 + 随机抖动）"""
+        delay = config.LLM_RETRY_BACKOFF * (2 ** attempt)
+        return delay + random.uniform(0, delay / 2)
+
     def _resolve_model(self, model: str) -> str:
         """
         解析模型名称
@@ -119,6 +201,45 @@ class LLMManager:
         except Exception as e:
             raise RuntimeError(f"LLM 调用失败: {e}")
 
+    def stream(
+        self,
+        prompt: str,
+        model: str = None,
+        temperature: float = None,
+    ) -> Iterator[str]:
+        """
+        流式生成回答
+
+        Args:
+            prompt: 提示词
+            model: 模型名称，默认使用 default_model
+            temperature: 温度参数，默认使用初始化时的值
+
+        Yields:
+            逐段生成的文本增量
+        """
+        model = self._resolve_model(model) if model else self.default_model
+        temperature = temperature if temperature is not None else self.temperature
+
+        if not isinstance(prompt, str):
+            prompt = str(prompt)
+
+        try:
+            response = self.client.chat.completions.create(
+                model=model,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=temperature,
+                stream=True,
+            )
+            for chunk in response:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    yield delta
+        except Exception as e:
+            raise RuntimeError(f"LLM 调用失败: {e}")
+
     def chat(
         self,
         messages: list,
@@ -159,6 +280,9 @@ class LLMManager:
         """
         异步生成回答
 
+        同一事件循环内的请求共享连接池，并发数受 LLM_MAX_CONCURRENCY 限制；
+        连接错误、限流和 5xx 按指数退避重试。
+
         Args:
             prompt: 提示词
             model: 模型名称
@@ -167,9 +291,95 @@ class LLMManager:
         Returns:
             生成的文本
         """
-        # OpenAI SDK 不直接支持异步，使用同步版本
-        # 如需真正的异步，可以使用 httpx 异步客户端
-        return self.generate(prompt, model, temperature)
+        model = self._resolve_model(model) if model else self.default_model
+        temperature = temperature if temperature is not None else self.temperature
+
+        if not isinstance(prompt, str):
+            prompt = str(prompt)
+
+        semaphore = _get_async_resources().semaphore
+        for attempt in range(config.LLM_MAX_RETRIES + 1):
+            try:
+                async with semaphore:
+                    response = await self.async_client.chat.completions.create(
+                        model=model,
+                        messages=[{"role": "user", "content": prompt}],
+                        temperature=temperature,
+                    )
+                return response.choices[0].message.content
+            except RETRYABLE_ERRORS as e:
+                if attempt >= config.LLM_MAX_RETRIES:
+                    raise RuntimeError(f"LLM 调用失败: {e}")
+            except Exception as e:
+                raise RuntimeError(f"LLM 调用失败: {e}")
+
+            await asyncio.sleep(self._retry_delay(attempt))
+
+    async def astream(
+        self,
+        prompt: str,
+        model: str = None,
+        temperature: float = None,
+    ) -> AsyncIterator[str]:
+        """
+        异步流式生成回答
+
+        只在尚未返回任何文本时重试，避免重复输出。
+
+        Args:
+            prompt: 提示词
+            model: 模型名称
+            temperature: 温度参数
+
+        Yields:
+            逐段生成的文本增量
+        """
+        model = self._resolve_model(model) if model else self.default_model
+        temperature = temperature if temperature is not None else self.temperature
+
+        if not isinstance(prompt, str):
+            prompt = str(prompt)
+
+        semaphore = _get_async_resources().semaphore
+        for attempt in range(config.LLM_MAX_RETRIES + 1):
+            started = False
+            try:
+                async with semaphore:
+                    response = await self.async_client.chat.completions.create(
+                        model=model,
+                        messages=[{"role": "user", "content": prompt}],
+                        temperature=temperature,
+                        stream=True,
+                    )
+                    async for chunk in response:
+                        if not chunk.choices:
+                            continue
+                        delta = chunk.choices[0].delta.content
+                        if delta:
+                            started = True
+                            yield delta
+                return
+            except RETRYABLE_ERRORS as e:
+                if started or attempt >= config.LLM_MAX_RETRIES:
+                    raise RuntimeError(f"LLM 调用失败: {e}")
+            except Exception as e:
+                raise RuntimeError(f"LLM 调用失败: {e}")
+
+            await asyncio.sleep(self._retry_delay(attempt))
+
+    @classmethod
+    def context_window(cls, model: str) -> int:
+        """
+        获取模型的上下文窗口
+
+        Args:
+            model: 模型名称，可以是简写或完整路径
+
+        Returns:
+            上下文窗口的 token 数，未知模型返回 LLM_CONTEXT_WINDOW 配置值
+        """
+        model = cls.MODELS.get(model, model)
+        return cls.CONTEXT_WINDOWS.get(model, config.LLM_CONTEXT_WINDOW)
 
     def list_available_models(self) -> dict:
         """
@@ -1,13 +1,17 @@
 """RAG 问答链模块"""
-from typing import List, Dict, Any, Optional, TYPE_CHECKING
+import asyncio
+import json
+from typing import AsyncIterator, Iterator, List, Dict, Any, Optional, TYPE_CHECKING
 from dataclasses import dataclass, field
 from pathlib import Path
 from collections import defaultdict
+from src.config import config
 from src.retriever.base import Retriever
+from src.chains.context_packer import ContextPacker, PackedContext, count_tokens
 from src.chains.llm_manager import LLMManager
 
 if TYPE_CHECKING:
-    pass
+    from src.cache.answer_cache import AnswerCache
 
 
 @dataclass
@@ -31,6 +35,11 @@ class Citation:
             "confidence": self.confidence,
         }
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Citation":
+        """从字典创建"""
+        return cls(**data)
+
     def format(self, language: str = "zh") -> str:
         """
         格式化引用
@@ -55,6 +64,7 @@ class QAResult:
     citations: List[Citation] = field(default_factory=list)
     answer_html: str = ""  # 带引用链接的 HTML
     documents_data: List[Dict[str, Any]] = field(default_factory=list)  # 按文档分组的数据
+    context_stats: Dict[str, int] = field(default_factory=dict)  # 上下文打包统计（token 数、节省的 token 数等）
 
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典"""
@@ -64,12 +74,44 @@ class QAResult:
             "sources": self.sources,
             "citations": [c.to_dict() for c in self.citations],
             "documents_data": self.documents_data,
+            "context_stats": self.context_stats,
         }
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "QAResult":
+        """从字典创建"""
+        return cls(
+            answer=data["answer"],
+            answer_html=data.get("answer_html", ""),
+            sources=data.get("sources", []),
+            citations=[Citation.from_dict(c) for c in data.get("citations", [])],
+            documents_data=data.get("documents_data", []),
+            context_stats=data.get("context_stats", {}),
+        )
+
+
+@dataclass
+class QAStreamEvent:
+    """
+    流式问答事件
+
+    type 取值：
+    - "sources": 检索完成，sources 为检索到的文档块
+    - "delta": 答案增量，delta 为新生成的文本
+    - "done": 生成结束，result 为完整的问答结果
+    """
+    type: str
+    sources: List[Dict[str, Any]] = field(default_factory=list)
+    delta: str = ""
+    result: Optional[QAResult] = None
+
 
 class QAChain:
     """RAG 问答链"""
 
+    # 没有检索到文档时的回答
+    NO_SOURCES_ANSWER = "抱歉，我在知识库中没有找到与您的问题相关的信息。"
+
     # 提示词模板
     SYSTEM_PROMPT = """你是一个专业的知识库助手。请根据以下参考文档回答用户的问题。
 
@@ -91,6 +133,8 @@ class QAChain:
         self,
         retriever: Optional[Retriever] = None,
         llm_manager: Optional[LLMManager] = None,
+        answer_cache: Optional["AnswerCache"] = None,
+        context_packer: Optional[ContextPacker] = None,
     ) -> None:
         """
         初始化问答链
@@ -98,9 +142,13 @@ class QAChain:
         Args:
             retriever: 检索器实例
             llm_manager: LLM 管理器实例
+            answer_cache: 可选的语义答案缓存
+            context_packer: 上下文打包器
         """
         self.retriever: Retriever = retriever or Retriever()
         self.llm_manager: Optional[LLMManager] = llm_manager
+        self.answer_cache: Optional["AnswerCache"] = answer_cache
+        self.context_packer: ContextPacker = context_packer or ContextPacker()
 
     @property
     def llm(self) -> LLMManager:
@@ -125,27 +173,189 @@ class QAChain:
         # 如果没有检索到相关文档
         if not sources:
             return QAResult(
-                answer="抱歉，我在知识库中没有找到与您的问题相关的信息。",
+                answer=self.NO_SOURCES_ANSWER,
                 sources=[],
                 citations=[],
             )
 
-        # 构建上下文
-        context = self._build_context(sources)
+        # 相似问题检索到相同文档块时直接返回缓存的答案
+        cache_key = self._answer_cache_key(query, sources)
+        cached = self._get_cached_answer(cache_key)
+        if cached is not None:
+            return cached
 
         # 构建提示词
-        prompt = self.SYSTEM_PROMPT.format(
-            context=context,
-            question=query,
-        )
+        packed = self._pack_context(query, sources)
+        prompt = self._build_prompt(query, packed)
 
         # 调用 LLM
         if self.llm_manager:
             answer = self.llm_manager.generate(prompt)
         else:
             # 如果没有 LLM 管理器，返回简单回答
-            answer = f"根据知识库找到 {len(sources)} 个相关文档。请配置 LLM API 获取完整回答。"
+            answer = self._fallback_answer(packed.sources)
+
+        result = self._build_result(answer, packed.sources, packed)
+        self._put_cached_answer(cache_key, result)
+        return result
+
+    def stream(self, query: str) -> Iterator[QAStreamEvent]:
+        """
+        流式运行问答链
+
+        先返回检索结果，再逐段返回 LLM 生成的答案，最后返回完整结果。
+
+        Args:
+            query: 用户问题
+
+        Yields:
+            流式问答事件
+        """
+        sources = self.retriever.get_sources(query)
+        yield QAStreamEvent(type="sources", sources=sources)
+
+        if not sources:
+            yield QAStreamEvent(type="delta", delta=self.NO_SOURCES_ANSWER)
+            yield QAStreamEvent(
+                type="done",
+                result=QAResult(answer=self.NO_SOURCES_ANSWER, sources=[], citations=[]),
+            )
+            return
 
+        cache_key = self._answer_cache_key(query, sources)
+        cached = self._get_cached_answer(cache_key)
+        if cached is not None:
+            yield QAStreamEvent(type="delta", delta=cached.answer)
+            yield QAStreamEvent(type="done", result=cached)
+            return
+
+        packed = self._pack_context(query, sources)
+        prompt = self._build_prompt(query, packed)
+
+        if self.llm_manager:
+            answer_parts = []
+            for delta in self.llm_manager.stream(prompt):
+                answer_parts.append(delta)
+                yield QAStreamEvent(type="delta", delta=delta)
+            answer = "".join(answer_parts)
+        else:
+            answer = self._fallback_answer(packed.sources)
+            yield QAStreamEvent(type="delta", delta=answer)
+
+        result = self._build_result(answer, packed.sources, packed)
+        self._put_cached_answer(cache_key, result)
+        yield QAStreamEvent(type="done", result=result)
+
+    def _answer_cache_key(self, query: str, sources: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """
+        计算答案缓存的键
+
+        只有配置了答案缓存和 LLM 时才缓存；查询 embedding 命中向量库的查询缓存，不会重复推理。
+
+        Args:
+            query: 用户问题
+            sources: 检索到的来源列表
+
+        Returns:
+            缓存键参数，不使用缓存时返回 None
+        """
+        if self.answer_cache is None or self.llm_manager is None:
+            return None
+
+        return {
+            "embedding": self.retriever.vector_store.embeddings.embed_query(query),
+            "model": self.llm_manager.default_model,
+            "filter_key": json.dumps(
+                self.retriever.filter_metadata, sort_keys=True, ensure_ascii=False, default=str
+            ),
+            "chunk_ids": [source.get("id") or "" for source in sources],
+        }
+
+    def _get_cached_answer(self, cache_key: Optional[Dict[str, Any]]) -> Optional[QAResult]:
+        """查询答案缓存"""
+        if cache_key is None:
+            return None
+        cached = self.answer_cache.get(**cache_key)
+        return QAResult.from_dict(cached) if cached is not None else None
+
+    def _put_cached_answer(self, cache_key: Optional[Dict[str, Any]], result: QAResult) -> None:
+        """写入答案缓存"""
+        if cache_key is not None:
+            self.answer_cache.put(result=result.to_dict(), **cache_key)
+
+    def _context_budget(self, query: str) -> int:
+        """
+        计算参考文档的 token 预算
+
+        不超过 CONTEXT_TOKEN_BUDGET，且模型上下文窗口扣除提示词模板、问题和答案预留后仍能放下。
+
+        Args:
+            query: 用户问题
+
+        Returns:
+            token 预算
+        """
+        model = self.llm_manager.default_model if self.llm_manager else None
+        budget = (
+            LLMManager.context_window(model)
+            - config.CONTEXT_ANSWER_RESERVE
+            - count_tokens(self.SYSTEM_PROMPT.format(context="", question=query))
+        )
+        if config.CONTEXT_TOKEN_BUDGET > 0:
+            budget = min(budget, config.CONTEXT_TOKEN_BUDGET)
+        return max(budget, 0)
+
+    def _pack_context(self, query: str, sources: List[Dict[str, Any]]) -> PackedContext:
+        """
+        在 token 预算内打包参考文档
+
+        Args:
+            query: 用户问题
+            sources: 检索到的来源列表
+
+        Returns:
+            打包后的上下文（sources 为实际放入提示词的来源）
+        """
+        return self.context_packer.pack(sources, self._context_budget(query))
+
+    def _build_prompt(self, query: str, packed: PackedContext) -> str:
+        """
+        构建提示词
+
+        Args:
+            query: 用户问题
+            packed: 打包后的上下文
+
+        Returns:
+            提示词
+        """
+        return self.SYSTEM_PROMPT.format(
+            context=packed.text,
+            question=query,
+        )
+
+    @staticmethod
+    def _fallback_answer(sources: List[Dict[str, Any]]) -> str:
+        """没有 LLM 管理器时的简单回答"""
+        return f"根据知识库找到 {len(sources)} 个相关文档。请配置 LLM API 获取完整回答。"
+
+    def _build_result(
+        self,
+        answer: str,
+        sources: List[Dict[str, Any]],
+        packed: Optional[PackedContext] = None,
+    ) -> QAResult:
+        """
+        由 LLM 答案和检索结果构建问答结果
+
+        Args:
+            answer: LLM 生成的原始答案
+            sources: 放入提示词的来源列表
+            packed: 打包后的上下文，用于记录打包统计
+
+        Returns:
+            问答结果
+        """
         # 生成引用
         citations = self._generate_citations(sources)
 
@@ -159,6 +369,7 @@ class QAChain:
             sources=sources,
             citations=citations,
             documents_data=[],  # 保持兼容性，但不再使用
+            context_stats=packed.stats() if packed else {},
         )
 
     def _format_answer_with_citations(self, answer: str, sources: List[Dict[str, Any]]) -> str:
@@ -234,6 +445,7 @@ class QAChain:
                 page_num=page_num,
                 excerpt=excerpt,
                 full_content=content,  # 保存完整内容
+                confidence=source.get("retrieval_score", source.get("score", 1.0)),
             )
             citations.append(citation)
 
@@ -247,22 +459,9 @@ class QAChain:
             sources: 检索到的来源列表
 
         Returns:
-            格式化的上下文文本
+            格式化的上下文文本（相邻块已合并，不超过 token 预算）
         """
-        context_parts = []
-
-        for source in sources:
-            source_file = source.get("source", "未知来源")
-            content = source.get("content", "")
-            metadata = source.get("metadata", {})
-
-            # 提取文件名和块编号
-            file_name = Path(source_file).stem if source_file != "未知来源" else "未知"
-            chunk_index = metadata.get("chunk_index", 0) + 1  # 从1开始
-
-            context_parts.append(f"[{file_name} 第{chunk_index}块]\n内容：{content}")
-
-        return "\n\n".join(context_parts)
+        return self._pack_context("", sources).text
 
     async def arun(self, query: str) -> QAResult:
         """
@@ -274,6 +473,75 @@ class QAChain:
         Returns:
             问答结果（包含答案和来源）
         """
-        # 同步版本的异步包装
-        # 对于真正的异步实现，需要使用异步 LLM
-        return self.run(query)
+        # 检索是阻塞操作（embedding 推理 + 向量库查询），放到线程池中执行
+        sources = await asyncio.to_thread(self.retriever.get_sources, query)
+
+        if not sources:
+            return QAResult(
+                answer=self.NO_SOURCES_ANSWER,
+                sources=[],
+                citations=[],
+            )
+
+        # 查询 embedding 和缓存读写同样是阻塞操作
+        cache_key = await asyncio.to_thread(self._answer_cache_key, query, sources)
+        cached = await asyncio.to_thread(self._get_cached_answer, cache_key)
+        if cached is not None:
+            return cached
+
+        packed = self._pack_context(query, sources)
+        prompt = self._build_prompt(query, packed)
+
+        if self.llm_manager:
+            answer = await self.llm_manager.agenerate(prompt)
+        else:
+            answer = self._fallback_answer(packed.sources)
+
+        result = self._build_result(answer, packed.sources, packed)
+        await asyncio.to_thread(self._put_cached_answer, cache_key, result)
+        return result
+
+    async def astream(self, query: str) -> AsyncIterator[QAStreamEvent]:
+        """
+        异步流式运行问答链，事件顺序与 stream 相同
+
+        Args:
+            query: 用户问题
+
+        Yields:
+            流式问答事件
+        """
+        sources = await asyncio.to_thread(self.retriever.get_sources, query)
+        yield QAStreamEvent(type="sources", sources=sources)
+
+        if not sources:
+            yield QAStreamEvent(type="delta", delta=self.NO_SOURCES_ANSWER)
+            yield QAStreamEvent(
+                type="done",
+                result=QAResult(answer=self.NO_SOURCES_ANSWER, sources=[], citations=[]),
+            )
+            return
+
+        cache_key = await asyncio.to_thread(self._answer_cache_key, query, sources)
+        cached = await asyncio.to_thread(self._get_cached_answer, cache_key)
+        if cached is not None:
+            yield QAStreamEvent(type="delta", delta=cached.answer)
+            yield QAStreamEvent(type="done", result=cached)
+            return
+
+        packed = self._pack_context(query, sources)
+        prompt = self._build_prompt(query, packed)
+
+        if self.llm_manager:
+            answer_parts = []
+            async for delta in self.llm_manager.astream(prompt):
+                answer_parts.append(delta)
+                yield QAStreamEvent(type="delta", delta=delta)
+            answer = "".join(answer_parts)
+        else:
+            answer = self._fallback_answer(packed.sources)
+            yield QAStreamEvent(type="delta", delta=answer)
+
+        result = self._build_result(answer, packed.sources, packed)
+        await asyncio.to_thread(self._put_cached_answer, cache_key, result)
+        yield QAStreamEvent(type="done", result=result)
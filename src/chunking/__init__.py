@@ -1,7 +1,9 @@
 """文本分块模块"""
 from src.chunking.chapter_detector import ChapterDetector, ChapterInfo
+from src.chunking.chapter_splitter import ChapterAwareSplitter
 
 __all__ = [
     "ChapterDetector",
     "ChapterInfo",
+    "ChapterAwareSplitter",
 ]
@@ -1,6 +1,8 @@
 """章节检测器 - 从文档中提取章节结构"""
 from dataclasses import dataclass
-from typing import List
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import codecs
+import mmap
 import re
 from pathlib import Path
 
@@ -14,6 +16,10 @@ class ChapterInfo:
     page_num: int = 0
     line_start: int = 0
     line_end: int = 0
+    char_start: int = 0  # 标题行起始字符偏移
+    char_end: int = 0  # 章节结束字符偏移（不包含）
+    byte_start: int = 0  # 标题行起始字节偏移
+    byte_end: int = 0  # 章节结束字节偏移（不包含）
 
     def to_dict(self) -> dict:
         """转换为字典"""
@@ -24,6 +30,10 @@ class ChapterInfo:
             "page_num": self.page_num,
             "line_start": self.line_start,
             "line_end": self.line_end,
+            "char_start": self.char_start,
+            "char_end": self.char_end,
+            "byte_start": self.byte_start,
+            "byte_end": self.byte_end,
         }
 
 
@@ -43,42 +53,146 @@ class ChapterDetector:
         (r"^#{1,3}\s+.+", 1),
     ]
 
-    def detect_txt_chapters(self, content: str) -> List[ChapterInfo]:
+    def __init__(self):
+        """初始化检测器，把 PATTERNS 预编译为两个正则"""
+        alternation = "|".join(f"(?:{pattern.lstrip('^')})" for pattern, _ in self.PATTERNS)
+        # 扫描用：在行首（跳过空白）以零宽前瞻定位可能的标题行，一次遍历整个文本
+        self._candidate_re = re.compile(rf"^[^\S\n]*(?={alternation})", re.MULTILINE)
+        # 确认用：按 PATTERNS 的顺序匹配去掉首尾空白后的候选行，命中的分组即级别
+        self._line_re = re.compile(
+            "|".join(f"(?P<p{i}>{pattern})" for i, (pattern, _) in enumerate(self.PATTERNS))
+        )
+        self._levels: Dict[str, int] = {f"p{i}": level for i, (_, level) in enumerate(self.PATTERNS)}
+
+    def match_heading(self, line: str) -> Optional[int]:
+        """
+        判断一行是否是章节标题
+
+        Args:
+            line: 文本行
+
+        Returns:
+            章节级别，不是标题时返回 None
+        """
+        match = self._line_re.match(line.strip())
+        return self._levels[match.lastgroup] if match else None
+
+    def iter_headings(self, text: str) -> Iterator[Tuple[int, str, int]]:
+        """
+        单遍扫描文本中的章节标题
+
+        Args:
+            text: 文本内容
+
+        Yields:
+            (标题行起始字符偏移, 标题, 级别)
+        """
+        for candidate in self._candidate_re.finditer(text):
+            line_start = candidate.start()
+            line_end = text.find("\n", line_start)
+            title = text[line_start:line_end if line_end >= 0 else len(text)].strip()
+            level = self.match_heading(title)
+            if level is not None:
+                yield line_start, title, level
+
+    def detect_txt_chapters(self, content: str, encoding: str = "utf-8") -> List[ChapterInfo]:
         """
         检测 TXT 文件中的章节
 
         Args:
             content: TXT 文本内容
+            encoding: 计算字节偏移时使用的编码
 
         Returns:
             章节信息列表
         """
-        chapters = []
-        lines = content.split('\n')
-
-        for line_num, line in enumerate(lines):
-            line = line.strip()
-            if not line:
-                continue
-
-            # 检查是否匹配章节标题模式
-            for pattern, level in self.PATTERNS:
-                if re.match(pattern, line, re.MULTILINE):
-                    chapter = ChapterInfo(
-                        chapter_id=f"ch_{len(chapters) + 1}",
-                        title=line,
-                        level=level,
-                        line_start=line_num + 1,
-                    )
-                    chapters.append(chapter)
-                    break
+        return self._detect_chapters([content], encoding)
+
+    def detect_file_chapters(self, path: str, encoding: Optional[str] = None) -> List[ChapterInfo]:
+        """
+        通过内存映射检测 TXT 文件中的章节，不把整个文件读入内存
 
-        # 设置章节结束行号
-        for i in range(len(chapters) - 1):
-            chapters[i].line_end = chapters[i + 1].line_start - 1
+        Args:
+            path: TXT 文件路径
+            encoding: 文件编码，默认从文件样本检测
+
+        Returns:
+            章节信息列表（字节偏移对应文件中的原始位置）
+        """
+        from src.loaders.txt_loader import READ_BLOCK_BYTES, detect_mapped_encoding
+
+        if Path(path).stat().st_size == 0:
+            return []
+
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            encoding = encoding or detect_mapped_encoding(mm)
+            return self._detect_chapters(self._iter_line_blocks(mm, encoding, READ_BLOCK_BYTES), encoding)
+
+    @staticmethod
+    def _iter_line_blocks(mm: mmap.mmap, encoding: str, block_bytes: int) -> Iterator[str]:
+        """分块增量解码，每块在换行处结束，保证标题行不跨块"""
+        decoder = codecs.getincrementaldecoder(encoding)()
+        pending = ""
+
+        for start in range(0, len(mm), block_bytes):
+            text = pending + decoder.decode(mm[start:start + block_bytes], final=start + block_bytes >= len(mm))
+            cut = text.rfind("\n") + 1
+            if cut:
+                yield text[:cut]
+            pending = text[cut:]
+
+        if pending:
+            yield pending
+
+    def _detect_chapters(self, blocks: Iterable[str], encoding: str) -> List[ChapterInfo]:
+        """
+        扫描按行对齐的文本块，计算章节的行号、字符偏移和字节偏移
+
+        Args:
+            blocks: 按顺序排列的文本块（除最后一块外都以换行结尾）
+            encoding: 计算字节偏移时使用的编码
+
+        Returns:
+            章节信息列表
+        """
+        chapters: List[ChapterInfo] = []
+        encoder = codecs.getincrementalencoder(encoding)()
+        # 当前块开头之前的行数、字符数，以及已扫描位置之前的字节数（含 BOM）
+        line_count = 0
+        char_count = 0
+        byte_count = len(encoder.encode(""))
+
+        for block in blocks:
+            cursor = 0
+            for line_start, title, level in self.iter_headings(block):
+                segment = block[cursor:line_start]
+                line_count += segment.count("\n")
+                byte_count += len(encoder.encode(segment))
+                cursor = line_start
+                chapters.append(ChapterInfo(
+                    chapter_id=f"ch_{len(chapters) + 1}",
+                    title=title,
+                    level=level,
+                    line_start=line_count + 1,
+                    char_start=char_count + line_start,
+                    byte_start=byte_count,
+                ))
+
+            rest = block[cursor:]
+            line_count += rest.count("\n")
+            byte_count += len(encoder.encode(rest))
+            char_count += len(block)
+
+        # 设置章节结束位置
+        for current, following in zip(chapters, chapters[1:]):
+            current.line_end = following.line_start - 1
+            current.char_end = following.char_start
+            current.byte_end = following.byte_start
 
         if chapters:
-            chapters[-1].line_end = len(lines)
+            chapters[-1].line_end = line_count + 1
+            chapters[-1].char_end = char_count
+            chapters[-1].byte_end = byte_count
 
         return chapters
 
@@ -162,15 +276,14 @@ class ChapterDetector:
                                 continue
 
                             # 检查是否匹配章节模式
-                            for pattern, level in self.PATTERNS:
-                                if re.match(pattern, line):
-                                    chapters.append(ChapterInfo(
-                                        chapter_id=f"ch_{len(chapters) + 1}",
-                                        title=line,
-                                        level=level,
-                                        page_num=page_num + 1,
-                                    ))
-                                    break
+                            level = self.match_heading(line)
+                            if level is not None:
+                                chapters.append(ChapterInfo(
+                                    chapter_id=f"ch_{len(chapters) + 1}",
+                                    title=line,
+                                    level=level,
+                                    page_num=page_num + 1,
+                                ))
 
         except Exception as e:
             pass
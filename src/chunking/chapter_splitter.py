@@ -0,0 +1,134 @@
+"""章节感知切分 - 在章节边界内切分文档，并为每个块标注章节信息"""
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from src.chunking.chapter_detector import ChapterDetector
+from src.chunking.splitter import TextSplitter, get_default_text_splitter
+from src.loaders.base import Document
+
+# 标识块所属文档的元数据字段：chunk_index 在加载器产出的每个文档（页、段、EPUB 章节）内编号，
+# 同一文档内跨章节的块也分开（章节之间没有切分重叠）
+DOCUMENT_KEY_FIELDS = ("source", "page", "section_index", "chapter_id")
+
+
+def document_key(metadata: Dict[str, Any], source: Optional[str] = None) -> Tuple[Tuple[str, Any], ...]:
+    """
+    块所属文档的标识，同一标识下的 chunk_index 唯一且连续
+
+    Args:
+        metadata: 块的元数据
+        source: 块的来源，默认取 metadata 中的 source
+
+    Returns:
+        (字段, 值) 组成的元组，缺少的字段值为 None
+    """
+    return tuple(
+        (name, source if name == "source" and source is not None else metadata.get(name))
+        for name in DOCUMENT_KEY_FIELDS
+    )
+
+
+class ChapterAwareSplitter:
+    """
+    章节感知切分器
+
+    - 加载器已提供章节信息（如 EPUB）的文档直接在文档内切分
+    - 其余文档用 ChapterDetector 检测章节标题，块不会跨越章节边界
+    - 同一来源的连续文档（TXT 分段、PDF 分页）共享章节状态，
+      章节跨越多个文档时后续文档的块也带有该章节的信息
+    - 每个块带有 chunk_index / total_chunks（文档内编号）、page，
+      以及所属章节的 chapter_id / chapter_title（第一个章节标题之前的内容没有章节信息）
+    """
+
+    def __init__(
+        self,
+        text_splitter: Optional[TextSplitter] = None,
+        detector: Optional[ChapterDetector] = None,
+        levels: Sequence[int] = (1,),
+    ):
+        """
+        初始化切分器
+
+        Args:
+            text_splitter: 章节内使用的文本切分器，默认按 CHUNK_SIZE_UNIT 配置创建
+            detector: 章节检测器
+            levels: 作为切分边界的章节级别，默认只使用一级标题
+        """
+        self.text_splitter = text_splitter or get_default_text_splitter()
+        self.detector = detector or ChapterDetector()
+        self.levels = set(levels)
+
+    def split_documents(self, documents: Iterable[Document]) -> List[Document]:
+        """
+        切分文档
+
+        Args:
+            documents: 原始文档（可以是加载器的惰性迭代器）
+
+        Returns:
+            切分后的文档列表
+        """
+        return list(self.iter_split(documents))
+
+    def iter_split(self, documents: Iterable[Document]) -> Iterator[Document]:
+        """
+        逐个文档切分，原始文档切分后即可释放
+
+        Args:
+            documents: 原始文档
+
+        Yields:
+            切分后的文档块
+        """
+        # 每个来源当前所在的章节和已出现的章节数
+        current: Dict[str, Optional[Dict[str, str]]] = {}
+        counters: Dict[str, int] = {}
+
+        for doc in documents:
+            if "chapter_title" in doc.metadata:
+                spans = [(doc.content, {})]
+            else:
+                spans = []
+                for text, heading in self._iter_chapter_spans(doc.content):
+                    if heading is not None:
+                        counters[doc.source] = counters.get(doc.source, 0) + 1
+                        current[doc.source] = {
+                            "chapter_id": f"ch_{counters[doc.source]}",
+                            "chapter_title": heading,
+                        }
+                    spans.append((text, current.get(doc.source) or {}))
+
+            chunks = [
+                (chunk, chapter)
+                for text, chapter in spans
+                for chunk in self.text_splitter.split_text(text)
+            ]
+            for i, (chunk, chapter) in enumerate(chunks):
+                yield Document(
+                    content=chunk,
+                    metadata={
+                        **doc.metadata,
+                        **chapter,
+                        "page": doc.metadata.get("page", 0),
+                        "chunk_index": i,
+                        "total_chunks": len(chunks),
+                    },
+                    source=doc.source,
+                )
+
+    def _iter_chapter_spans(self, text: str) -> Iterator[Tuple[str, Optional[str]]]:
+        """
+        按章节标题切开文本
+
+        Yields:
+            (文本片段, 片段开头的章节标题)，第一个标题之前的片段标题为 None
+        """
+        start, title = 0, None
+        for line_start, heading, level in self.detector.iter_headings(text):
+            if level not in self.levels:
+                continue
+            if line_start > start:
+                yield text[start:line_start], title
+            start, title = line_start, heading
+
+        if start < len(text) or title is not None:
+            yield text[start:], title
+
@@ -1,10 +1,18 @@
 """文本切分模块 - 统一的文档切分接口"""
-from typing import List, Protocol
+from typing import Callable, Dict, List, Optional, Protocol
 from langchain_text_splitters import RecursiveCharacterTextSplitter
+from src.cache.lru import LRUCache
+from src.config import config
 
 # 默认切分参数
 DEFAULT_CHUNK_SIZE = 500
 DEFAULT_CHUNK_OVERLAP = 50
+# token 长度缓存大小（切分时同一片段会被反复计算长度）
+TOKEN_LENGTH_CACHE_SIZE = 65536
+# 相邻块首尾重叠的最小字符数，更短的重复视为巧合
+MIN_OVERLAP_CHARS = 5
+# 检查重叠的最大字符数
+MAX_OVERLAP_CHARS = 1000
 
 
 class TextSplitter(Protocol):
@@ -15,6 +23,24 @@ class TextSplitter(Protocol):
         ...
 
 
+def overlap_length(previous: str, following: str, min_overlap: int = MIN_OVERLAP_CHARS) -> int:
+    """
+    计算相邻块的重叠长度（切分时 chunk_overlap 产生的重复文本）
+
+    Args:
+        previous: 前一块
+        following: 后一块
+        min_overlap: 最小重叠字符数
+
+    Returns:
+        previous 的后缀与 following 的前缀重合的最大长度，小于 min_overlap 时返回 0
+    """
+    for length in range(min(len(previous), len(following), MAX_OVERLAP_CHARS), min_overlap - 1, -1):
+        if previous.endswith(following[:length]):
+            return length
+    return 0
+
+
 class LangchainTextSplitter:
     """基于 langchain 的文本切分器"""
 
@@ -23,22 +49,72 @@ class LangchainTextSplitter:
         chunk_size: int = DEFAULT_CHUNK_SIZE,
         chunk_overlap: int = DEFAULT_CHUNK_OVERLAP,
         separators: List[str] = None,
+        length_function: Callable[[str], int] = len,
     ):
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
         self.separators = separators or ["\n\n", "\n", "。", "！", "？", ".", " ", ""]
+        self.length_function = length_function
 
         self._splitter = RecursiveCharacterTextSplitter(
             separators=self.separators,
             chunk_size=self.chunk_size,
             chunk_overlap=self.chunk_overlap,
-            length_function=len,
+            length_function=self.length_function,
         )
 
     def split_text(self, text: str) -> List[str]:
         return self._splitter.split_text(text)
 
 
+class TokenLengthFunction:
+    """
+    按 tokenizer 计算文本的 token 数（不含特殊 token）
+
+    递归切分时同一片段会被多次计算长度，结果放在 LRU 缓存中。
+    """
+
+    def __init__(self, tokenizer, cache_size: int = TOKEN_LENGTH_CACHE_SIZE):
+        """
+        初始化长度函数
+
+        Args:
+            tokenizer: HuggingFace tokenizer（需要支持 encode）
+            cache_size: 缓存条目数
+        """
+        self.tokenizer = tokenizer
+        self.cache = LRUCache(cache_size)
+
+    def __call__(self, text: str) -> int:
+        length = self.cache.get(text)
+        if length is None:
+            length = len(self.tokenizer.encode(text, add_special_tokens=False))
+            self.cache.put(text, length)
+        return length
+
+
+# 已加载的 tokenizer（按模型名）
+_tokenizers: Dict[str, object] = {}
+
+
+def get_tokenizer(model_name: Optional[str] = None):
+    """
+    获取 embedding 模型的 tokenizer（只加载 tokenizer，不加载模型权重）
+
+    Args:
+        model_name: 模型名称，默认使用配置的 embedding 模型
+
+    Returns:
+        tokenizer 实例
+    """
+    model_name = model_name or config.EMBEDDING_MODEL
+    if model_name not in _tokenizers:
+        from transformers import AutoTokenizer
+
+        _tokenizers[model_name] = AutoTokenizer.from_pretrained(model_name)
+    return _tokenizers[model_name]
+
+
 def get_text_splitter(
     chunk_size: int = DEFAULT_CHUNK_SIZE,
     chunk_overlap: int = DEFAULT_CHUNK_OVERLAP,
@@ -48,3 +124,46 @@ def get_text_splitter(
         chunk_size=chunk_size,
         chunk_overlap=chunk_overlap,
     )
+
+
+def get_token_text_splitter(
+    chunk_size: Optional[int] = None,
+    chunk_overlap: Optional[int] = None,
+    tokenizer=None,
+) -> TextSplitter:
+    """
+    获取按 token 数计量块大小的文本切分器
+
+    Args:
+        chunk_size: 每块的 token 数，默认使用配置值
+        chunk_overlap: 重叠的 token 数，默认使用配置值
+        tokenizer: tokenizer 实例，默认使用 embedding 模型的 tokenizer
+
+    Returns:
+        文本切分器
+    """
+    return LangchainTextSplitter(
+        chunk_size=chunk_size or config.CHUNK_TOKEN_SIZE,
+        chunk_overlap=config.CHUNK_TOKEN_OVERLAP if chunk_overlap is None else chunk_overlap,
+        length_function=TokenLengthFunction(tokenizer or get_tokenizer()),
+    )
+
+
+# 按配置创建的切分器（token 模式下复用长度缓存）
+_default_splitter: Optional[TextSplitter] = None
+
+
+def get_default_text_splitter() -> TextSplitter:
+    """
+    按 CHUNK_SIZE_UNIT 配置获取默认文本切分器
+
+    Returns:
+        chars 模式下为按字符切分的切分器，tokens 模式下为按 token 切分的切分器
+    """
+    global _default_splitter
+    if _default_splitter is None:
+        if config.CHUNK_SIZE_UNIT == "tokens":
+            _default_splitter = get_token_text_splitter()
+        else:
+            _default_splitter = get_text_splitter()
+    return _default_splitter
@@ -14,6 +14,7 @@ class Config:
     DATA_DIR = BASE_DIR / "data"
     DOCUMENTS_DIR = DATA_DIR / "documents"
     CHROMA_DIR = DATA_DIR / "chroma"
+    INDEX_DIR = DATA_DIR / "index"  # 清单、缓存等辅助索引
 
     # DeepSeek API
     DEEPSEEK_API_KEY: str = os.getenv("DEEPSEEK_API_KEY", "")
@@ -21,19 +22,79 @@ class Config:
     DEEPSEEK_MODEL: str = os.getenv("DEEPSEEK_MODEL", "deepseek-chat")
     DEEPSEEK_TEMPERATURE: float = float(os.getenv("DEEPSEEK_TEMPERATURE", "0"))
 
+    # LLM 调用
+    LLM_TIMEOUT: float = float(os.getenv("LLM_TIMEOUT", "60"))
+    LLM_MAX_RETRIES: int = int(os.getenv("LLM_MAX_RETRIES", "3"))
+    LLM_RETRY_BACKOFF: float = float(os.getenv("LLM_RETRY_BACKOFF", "1.0"))
+    LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+    # 提示词上下文：参考文档的 token 预算、为答案预留的 token 数、未知模型的上下文窗口
+    CONTEXT_TOKEN_BUDGET: int = int(os.getenv("CONTEXT_TOKEN_BUDGET", "3000"))
+    CONTEXT_ANSWER_RESERVE: int = int(os.getenv("CONTEXT_ANSWER_RESERVE", "1024"))
+    LLM_CONTEXT_WINDOW: int = int(os.getenv("LLM_CONTEXT_WINDOW", "8192"))
+
     # Embedding
     EMBEDDING_MODEL: str = os.getenv(
         "EMBEDDING_MODEL",
         "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
     )
     EMBEDDING_DEVICE: str = os.getenv("EMBEDDING_DEVICE", "cpu")
+    EMBEDDING_CACHE_ENABLED: bool = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+    EMBEDDING_CACHE_MAX_ENTRIES: int = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "200000"))
+    QUERY_EMBEDDING_CACHE_SIZE: int = int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "1024"))
 
     # Chroma
     CHROMA_PERSIST_DIR: str = str(CHROMA_DIR)
     CHROMA_COLLECTION_NAME: str = os.getenv("CHROMA_COLLECTION_NAME", "knowledge_base")
+    # 写入时每个窗口 embedding 并提交的块数（不超过 Chroma 的最大批大小）
+    CHROMA_ADD_BATCH_SIZE: int = int(os.getenv("CHROMA_ADD_BATCH_SIZE", "256"))
+
+    # 文档加载
+    # PDF 并行提取文本的进程数（1 表示逐页串行提取）和每个任务的页数
+    PDF_EXTRACT_WORKERS: int = int(os.getenv("PDF_EXTRACT_WORKERS", "1"))
+    PDF_PAGES_PER_TASK: int = int(os.getenv("PDF_PAGES_PER_TASK", "32"))
+    # TXT/Markdown 逐段加载时每段的目标字符数
+    LOADER_SECTION_CHARS: int = int(os.getenv("LOADER_SECTION_CHARS", "200000"))
+
+    # 切分
+    # 块大小的计量单位：chars（字符数）或 tokens（embedding 模型的 token 数）
+    CHUNK_SIZE_UNIT: str = os.getenv("CHUNK_SIZE_UNIT", "chars")
+    CHUNK_TOKEN_SIZE: int = int(os.getenv("CHUNK_TOKEN_SIZE", "120"))
+    CHUNK_TOKEN_OVERLAP: int = int(os.getenv("CHUNK_TOKEN_OVERLAP", "12"))
 
     # 检索
     TOP_K_RETRIEVALS: int = int(os.getenv("TOP_K_RETRIEVALS", "4"))
+    SEARCH_RESULT_CACHE_SIZE: int = int(os.getenv("SEARCH_RESULT_CACHE_SIZE", "256"))
+    # 检索结果、相邻块窗口缓存的有效期（秒），其他进程写入集合后最迟在该时间后生效
+    SEARCH_RESULT_CACHE_TTL: float = float(os.getenv("SEARCH_RESULT_CACHE_TTL", "60"))
+    # 语义答案缓存：相似问题检索到相同文档块时复用答案
+    ANSWER_CACHE_ENABLED: bool = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true"
+    ANSWER_CACHE_THRESHOLD: float = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.95"))
+    ANSWER_CACHE_TTL: float = float(os.getenv("ANSWER_CACHE_TTL", "86400"))
+    ANSWER_CACHE_MAX_ENTRIES: int = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "10000"))
+    # 余弦相似度低于该值的检索结果不放入提示词（0 表示不过滤）
+    MIN_RELEVANCE_SCORE: float = float(os.getenv("MIN_RELEVANCE_SCORE", "0.0"))
+    # 混合检索：随向量库同步维护 BM25 词法索引
+    LEXICAL_INDEX_ENABLED: bool = os.getenv("LEXICAL_INDEX_ENABLED", "true").lower() == "true"
+    # 量化向量索引：int8 / 二值量化码内存映射检索，全精度向量精排（替代 HNSW 检索）
+    QUANTIZED_INDEX_ENABLED: bool = os.getenv("QUANTIZED_INDEX_ENABLED", "false").lower() == "true"
+    QUANTIZATION: str = os.getenv("QUANTIZATION", "int8")
+    QUANTIZED_RESCORE_CANDIDATES: int = int(os.getenv("QUANTIZED_RESCORE_CANDIDATES", "100"))
+    # 交叉编码器重排：多召回候选，重排后取 top_k
+    RERANK_ENABLED: bool = os.getenv("RERANK_ENABLED", "false").lower() == "true"
+    RERANK_MODEL: str = os.getenv("RERANK_MODEL", "cross-encoder/mmarco-mMiniLMv2-L12-H384-v1")
+    RERANK_CANDIDATES: int = int(os.getenv("RERANK_CANDIDATES", "20"))
+    RERANK_BATCH_SIZE: int = int(os.getenv("RERANK_BATCH_SIZE", "16"))
+    RERANK_MAX_LENGTH: int = int(os.getenv("RERANK_MAX_LENGTH", "256"))
+    RERANK_CACHE_SIZE: int = int(os.getenv("RERANK_CACHE_SIZE", "4096"))
+    RERANK_LATENCY_BUDGET: float = float(os.getenv("RERANK_LATENCY_BUDGET", "1.0"))
+    # 相邻块扩展：命中块前后各取 NEIGHBOR_WINDOW 个块合并为连续段落（0 表示不扩展）
+    NEIGHBOR_WINDOW: int = int(os.getenv("NEIGHBOR_WINDOW", "0"))
+    NEIGHBOR_CACHE_SIZE: int = int(os.getenv("NEIGHBOR_CACHE_SIZE", "1024"))
+    # MMR 多样化：多召回候选，按相关度与多样性权衡选取 top_k
+    MMR_ENABLED: bool = os.getenv("MMR_ENABLED", "false").lower() == "true"
+    MMR_LAMBDA: float = float(os.getenv("MMR_LAMBDA", "0.5"))
+    MMR_CANDIDATES: int = int(os.getenv("MMR_CANDIDATES", "20"))
+    MMR_MAX_PER_SOURCE: int = int(os.getenv("MMR_MAX_PER_SOURCE", "0"))
 
     # API
     API_HOST: str = os.getenv("API_HOST", "0.0.0.0")
@@ -45,6 +106,7 @@ class Config:
         cls.DATA_DIR.mkdir(parents=True, exist_ok=True)
         cls.DOCUMENTS_DIR.mkdir(parents=True, exist_ok=True)
         cls.CHROMA_DIR.mkdir(parents=True, exist_ok=True)
+        cls.INDEX_DIR.mkdir(parents=True, exist_ok=True)
 
 
 # 初始化时创建目录
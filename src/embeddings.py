@@ -1,22 +1,36 @@
 """Embedding 封装模块"""
 from sentence_transformers import SentenceTransformer
-from typing import List
+from typing import List, Optional
+import numpy as np
+from src.cache.embedding_cache import EmbeddingCache, get_embedding_cache
+from src.cache.lru import LRUCache
 from src.config import config
 
 
 class Embeddings:
     """Sentence Transformers Embedding 封装"""
 
-    def __init__(self, model_name: str = None, device: str = None):
+    # 文档 embedding 是否归一化（参与缓存键）
+    NORMALIZE_DOCUMENTS = True
+
+    def __init__(
+        self,
+        model_name: str = None,
+        device: str = None,
+        cache: Optional[EmbeddingCache] = None,
+    ):
         """
         初始化 Embedding 模型
 
         Args:
             model_name: 模型名称
             device: 设备 (cpu/cuda)
+            cache: 可选的 embedding 磁盘缓存
         """
         self.model_name = model_name or config.EMBEDDING_MODEL
         self.device = device or config.EMBEDDING_DEVICE
+        self.cache = cache
+        self.query_cache = LRUCache(config.QUERY_EMBEDDING_CACHE_SIZE)
         self._model = None
 
     @property
@@ -37,14 +51,49 @@ class Embeddings:
         Returns:
             嵌入向量列表
         """
+        return self.embed_documents_array(texts).tolist()
+
+    def embed_documents_array(self, texts: List[str]) -> np.ndarray:
+        """
+        嵌入文档列表，返回 NumPy 矩阵
+
+        配置了缓存时，只对未命中缓存的文本调用模型（同一批次内的重复文本只计算一次）。
+
+        Args:
+            texts: 文本列表
+
+        Returns:
+            形状为 (len(texts), dim) 的嵌入矩阵
+        """
+        if self.cache is None or not texts:
+            return self._encode_documents(texts)
+
+        cached = self.cache.get_many(self.model_name, self.NORMALIZE_DOCUMENTS, texts)
+        missing = list(dict.fromkeys(
+            text for text, vector in zip(texts, cached) if vector is None
+        ))
+
+        encoded = {}
+        if missing:
+            vectors = self._encode_documents(missing)
+            self.cache.put_many(self.model_name, self.NORMALIZE_DOCUMENTS, missing, vectors)
+            encoded = dict(zip(missing, vectors))
+
+        return np.stack([
+            vector if vector is not None else encoded[text]
+            for text, vector in zip(texts, cached)
+        ]).astype(np.float32, copy=False)
+
+    def _encode_documents(self, texts: List[str]) -> np.ndarray:
+        """调用模型批量嵌入文档"""
         # 使用批处理优化性能
         return self.model.encode(
             texts,
             convert_to_numpy=True,
             batch_size=32,  # 批处理大小，平衡内存和速度
             show_progress_bar=False,  # 禁用内部进度条，避免干扰
-            normalize_embeddings=True,
-        ).tolist()
+            normalize_embeddings=self.NORMALIZE_DOCUMENTS,
+        )
 
     def embed_query(self, text: str) -> List[float]:
         """
@@ -56,7 +105,47 @@ class Embeddings:
         Returns:
             嵌入向量
         """
-        return self.model.encode(text, convert_to_numpy=True).tolist()
+        cached = self.query_cache.get(text)
+        if cached is not None:
+            return list(cached)
+
+        embedding = self.model.encode(text, convert_to_numpy=True).tolist()
+        self.query_cache.put(text, tuple(embedding))
+        return embedding
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """
+        批量嵌入查询文本
+
+        命中缓存的查询直接返回，其余查询在一次 encode 调用中批量计算。
+
+        Args:
+            texts: 查询文本列表
+
+        Returns:
+            嵌入向量列表
+        """
+        cached = [self.query_cache.get(text) for text in texts]
+        missing = list(dict.fromkeys(
+            text for text, embedding in zip(texts, cached) if embedding is None
+        ))
+
+        encoded = {}
+        if missing:
+            vectors = self.model.encode(
+                missing,
+                convert_to_numpy=True,
+                batch_size=32,
+                show_progress_bar=False,
+            ).tolist()
+            for text, embedding in zip(missing, vectors):
+                self.query_cache.put(text, tuple(embedding))
+                encoded[text] = embedding
+
+        return [
+            list(embedding) if embedding is not None else list(encoded[text])
+            for text, embedding in zip(texts, cached)
+        ]
 
     def get_dimension(self) -> int:
         """获取嵌入维度"""
@@ -71,5 +160,6 @@ def get_embeddings() -> Embeddings:
     """获取全局 Embeddings 实例"""
     global _embeddings_instance
     if _embeddings_instance is None:
-        _embeddings_instance = Embeddings()
+        cache = get_embedding_cache() if config.EMBEDDING_CACHE_ENABLED else None
+        _embeddings_instance = Embeddings(cache=cache)
     return _embeddings_instance
@@ -0,0 +1,239 @@
+"""词法索引模块 - 基于 SQLite FTS5 的 BM25 倒排索引"""
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from src.config import config
+
+# 英文、数字和代码标识符
+_WORD_RE = re.compile(r"[0-9a-z_]+")
+# 连续的中日韩字符
+_CJK_RE = re.compile(r"[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\u3040-\u30ff\uac00-\ud7af]+")
+# 单次查询最多使用的词项数，避免超长问题拖慢检索
+MAX_QUERY_TERMS = 32
+# SQLite 单条语句的参数数量有上限，批量操作时分段
+_SQL_BATCH = 500
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    CJK 感知的分词
+
+    - 英文、数字、下划线组成的词（如代码标识符）整体作为一个词项，统一小写
+    - 连续的中日韩字符切分为重叠的二元组（单个字符时保留单字）
+
+    Args:
+        text: 文本
+
+    Returns:
+        词项列表
+    """
+    text = text.lower()
+    tokens = _WORD_RE.findall(text)
+
+    for run in _CJK_RE.findall(text):
+        if len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+
+    return tokens
+
+
+class LexicalIndex:
+    """
+    BM25 词法索引
+
+    使用 SQLite FTS5 存储预先分好词的文本，检索时由 FTS5 的 bm25() 排序。
+    docs 表记录 chunk ID 和来源，支持按来源增量删除和过滤。
+    """
+
+    def __init__(self, path: Optional[str] = None, collection_name: Optional[str] = None):
+        """
+        初始化词法索引
+
+        Args:
+            path: 索引数据库路径，默认按集合名存放在 data/index 下
+            collection_name: 集合名称
+        """
+        collection_name = collection_name or config.CHROMA_COLLECTION_NAME
+        self.path = str(path or config.INDEX_DIR / f"{collection_name}_lexical.sqlite3")
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """获取数据库连接（延迟创建）"""
+        if self._conn is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS docs (
+                    rowid INTEGER PRIMARY KEY,
+                    chunk_id TEXT NOT NULL UNIQUE,
+                    source TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_docs_source ON docs (source);
+                CREATE VIRTUAL TABLE IF NOT EXISTS docs_fts USING fts5(
+                    tokens,
+                    tokenize = "unicode61 tokenchars '_'"
+                );
+                """
+            )
+        return self._conn
+
+    def add(self, chunk_ids: Sequence[str], texts: Sequence[str], sources: Sequence[str]) -> None:
+        """
+        添加或替换文档块
+
+        Args:
+            chunk_ids: chunk ID 列表
+            texts: 文本列表
+            sources: 来源列表
+        """
+        if not chunk_ids:
+            return
+
+        with self._lock, self.conn:
+            self._delete_ids(chunk_ids)
+            for chunk_id, text, source in zip(chunk_ids, texts, sources):
+                cursor = self.conn.execute(
+                    "INSERT INTO docs (chunk_id, source) VALUES (?, ?)",
+                    (chunk_id, source),
+                )
+                self.conn.execute(
+                    "INSERT INTO docs_fts (rowid, tokens) VALUES (?, ?)",
+                    (cursor.lastrowid, " ".join(tokenize(text))),
+                )
+
+    def delete_ids(self, chunk_ids: Sequence[str]) -> None:
+        """
+        按 chunk ID 删除
+
+        Args:
+            chunk_ids: chunk ID 列表
+        """
+        with self._lock, self.conn:
+            self._delete_ids(chunk_ids)
+
+    def delete_source(self, source: str) -> None:
+        """
+        删除来源的所有文档块
+
+        Args:
+            source: 文档来源
+        """
+        with self._lock, self.conn:
+            self.conn.execute(
+                "DELETE FROM docs_fts WHERE rowid IN (SELECT rowid FROM docs WHERE source = ?)",
+                (source,),
+            )
+            self.conn.execute("DELETE FROM docs WHERE source = ?", (source,))
+
+    def _delete_ids(self, chunk_ids: Sequence[str]) -> None:
+        """按 chunk ID 删除（调用方需持有锁并开启事务）"""
+        for start in range(0, len(chunk_ids), _SQL_BATCH):
+            batch = list(chunk_ids[start:start + _SQL_BATCH])
+            placeholders = ",".join("?" * len(batch))
+            self.conn.execute(
+                f"DELETE FROM docs_fts WHERE rowid IN "
+                f"(SELECT rowid FROM docs WHERE chunk_id IN ({placeholders}))",
+                batch,
+            )
+            self.conn.execute(f"DELETE FROM docs WHERE chunk_id IN ({placeholders})", batch)
+
+    def clear(self) -> None:
+        """清空索引"""
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM docs_fts")
+            self.conn.execute("DELETE FROM docs")
+
+    def search(
+        self,
+        query: str,
+        top_k: int,
+        sources: Optional[Iterable[str]] = None,
+    ) -> List[Tuple[str, float]]:
+        """
+        BM25 检索
+
+        Args:
+            query: 查询文本
+            top_k: 返回结果数量
+            sources: 可选的来源白名单
+
+        Returns:
+            (chunk ID, BM25 分数) 列表，分数越大越相关
+        """
+        terms = list(dict.fromkeys(tokenize(query)))[:MAX_QUERY_TERMS]
+        if not terms:
+            return []
+
+        match = " OR ".join(f'"{term}"' for term in terms)
+        # 先在 FTS5 内部按 rank（即 bm25）取 top_k，FTS5 对这种查询有专门的优化
+        sql = "SELECT rowid, rank FROM docs_fts WHERE docs_fts MATCH ?"
+        params: List = [match]
+
+        if sources is not None:
+            sources = list(sources)
+            if not sources:
+                return []
+            sql += f" AND rowid IN (SELECT rowid FROM docs WHERE source IN ({','.join('?' * len(sources))}))"
+            params.extend(sources)
+
+        sql += " ORDER BY rank LIMIT ?"
+        params.append(top_k)
+
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT docs.chunk_id, hits.rank FROM ({sql}) AS hits "
+                f"JOIN docs ON docs.rowid = hits.rowid ORDER BY hits.rank",
+                params,
+            ).fetchall()
+
+        # FTS5 的 bm25() 越小越相关，取反后越大越相关
+        return [(chunk_id, -score) for chunk_id, score in rows]
+
+    def is_empty(self) -> bool:
+        """索引是否为空"""
+        with self._lock:
+            return self.conn.execute("SELECT 1 FROM docs LIMIT 1").fetchone() is None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+
+
+def sources_from_filter(filter: Optional[Dict]) -> Tuple[Optional[List[str]], bool]:
+    """
+    从 Chroma 过滤条件中提取来源白名单
+
+    Args:
+        filter: Chroma where 条件
+
+    Returns:
+        (来源列表或 None, 过滤条件是否只包含来源条件)
+    """
+    if not filter:
+        return None, True
+
+    # $and 中的来源条件可以下推到索引，其余条件仍需 Chroma 过滤
+    if set(filter) == {"$and"}:
+        for condition in filter["$and"]:
+            sources, pushed_down = sources_from_filter(condition)
+            if sources is not None and pushed_down:
+                return sources, False
+        return None, False
+
+    if set(filter) == {"source"}:
+        condition = filter["source"]
+        if isinstance(condition, str):
+            return [condition], True
+        if isinstance(condition, dict) and set(condition) == {"$eq"}:
+            return [condition["$eq"]], True
+        if isinstance(condition, dict) and set(condition) == {"$in"}:
+            return list(condition["$in"]), True
+
+    return None, False
@@ -1,6 +1,6 @@
 """基础文档加载器"""
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from typing import Callable, Dict, Any, Iterable, Iterator, List
 from dataclasses import dataclass
 from pathlib import Path
 
@@ -45,7 +45,6 @@ class BaseLoader(ABC):
             raise FileNotFoundError(f"{msg}: {path}")
         return path_obj
 
-    @abstractmethod
     def load(self, path: str) -> List[Document]:
         """
         加载文档
@@ -56,4 +55,52 @@ class BaseLoader(ABC):
         Returns:
             文档列表
         """
+        return list(self.iter_load(path))
+
+    @abstractmethod
+    def iter_load(self, path: str) -> Iterator[Document]:
+        """
+        惰性加载文档
+
+        Args:
+            path: 文档路径
+
+        Yields:
+            文档
+        """
         pass
+
+    @staticmethod
+    def iter_sections(
+        lines: Iterable[str],
+        is_boundary: Callable[[str], bool],
+        max_chars: int,
+    ) -> Iterator[str]:
+        """
+        把逐行读取的文本合并为有界大小的段落
+
+        累计达到 max_chars 后，在下一个边界行（如章节标题、空行）之前切开；
+        达到 2 倍 max_chars 仍没有边界时在当前行切开。小于 max_chars 的文本只产生一段。
+
+        Args:
+            lines: 保留换行符的文本行
+            is_boundary: 判断某行是否可以作为新段落开头（按顺序对每行调用一次）
+            max_chars: 每段的目标字符数
+
+        Yields:
+            段落文本（所有段落按顺序拼接等于原文）
+        """
+        buffer: List[str] = []
+        size = 0
+
+        for line in lines:
+            # 每行都调用 is_boundary，便于其跟踪代码块等跨行状态
+            boundary = is_boundary(line)
+            if buffer and ((size >= max_chars and boundary) or size >= 2 * max_chars):
+                yield "".join(buffer)
+                buffer, size = [], 0
+            buffer.append(line)
+            size += len(line)
+
+        if buffer:
+            yield "".join(buffer)
@@ -1,5 +1,5 @@
 """Word 文档加载器"""
-from typing import List
+from typing import Iterator
 from docx import Document as DocxDocument
 from src.loaders.base import BaseLoader, Document
 
@@ -7,15 +7,15 @@ from src.loaders.base import BaseLoader, Document
 class DocxLoader(BaseLoader):
     """Word (.docx) 文档加载器"""
 
-    def load(self, path: str) -> List[Document]:
+    def iter_load(self, path: str) -> Iterator[Document]:
         """
         加载 Word 文档
 
         Args:
             path: Word 文件路径
 
-        Returns:
-            文档列表（整个文档作为一个文档）
+        Yields:
+            整个文档作为一个文档
         """
         path_obj = self.validate_file_path(path, file_type="Word")
 
@@ -28,13 +28,11 @@ class DocxLoader(BaseLoader):
 
         content = "\n".join(paragraphs)
 
-        return [
-            Document(
-                content=content,
-                metadata={
-                    "type": "docx",
-                    "paragraphs_count": len(doc.paragraphs),
-                },
-                source=str(path_obj),
-            )
-        ]
+        yield Document(
+            content=content,
+            metadata={
+                "type": "docx",
+                "paragraphs_count": len(doc.paragraphs),
+            },
+            source=str(path_obj),
+        )
@@ -1,5 +1,5 @@
 """EPUB 电子书加载器"""
-from typing import List
+from typing import Iterator, List
 import ebooklib
 from ebooklib import epub
 from bs4 import BeautifulSoup
@@ -9,34 +9,32 @@ from src.loaders.base import BaseLoader, Document
 class EPUBLoader(BaseLoader):
     """EPUB 电子书加载器"""
 
-    def load(self, path: str) -> List[Document]:
+    def iter_load(self, path: str) -> Iterator[Document]:
         """
-        加载 EPUB 电子书
+        按阅读顺序（spine）逐章加载 EPUB 电子书
+
+        每个章节在产出时才解析 HTML，已产出章节的解析结果不会保留。
 
         Args:
             path: EPUB 文件路径
 
-        Returns:
-            文档列表（每个章节一个文档）
+        Yields:
+            每个非空章节一个文档
         """
         path_obj = self.validate_file_path(path, file_type="EPUB")
 
-        documents = []
-
         try:
             # 读取 EPUB 文件
             book = epub.read_epub(path)
 
             # 获取目录结构
-            toc = book.get_table_of_contents()
-            chapters_info = self._extract_chapters_info(toc)
+            chapters_info = self._extract_chapters_info(book.toc)
 
-            # 获取所有 HTML 内容
-            items = list(book.get_items())
-            epub_items = [item for item in items if isinstance(item, ebooklib.epub.EpubHtml)]
+            # 获取文件名作为书名
+            book_title = path_obj.stem
 
             # 按章节提取内容
-            for idx, item in enumerate(epub_items):
+            for idx, item in enumerate(self._iter_html_items(book)):
                 # 获取章节名称
                 chapter_name = item.get_name()
                 chapter_title = self._get_chapter_title(chapter_name, chapters_info, book)
@@ -46,10 +44,7 @@ class EPUBLoader(BaseLoader):
                 text = soup.get_text(separator='\n', strip=True)
 
                 if text.strip():
-                    # 获取文件名作为书名
-                    book_title = path_obj.stem
-
-                    doc = Document(
+                    yield Document(
                         content=text,
                         metadata={
                             "chapter_id": f"ch_{idx + 1}",
@@ -60,12 +55,24 @@ class EPUBLoader(BaseLoader):
                         },
                         source=str(path_obj),
                     )
-                    documents.append(doc)
 
         except Exception as e:
             raise RuntimeError(f"Failed to load EPUB file: {e}")
 
-        return documents
+    @staticmethod
+    def _iter_html_items(book) -> Iterator[epub.EpubHtml]:
+        """按 spine 顺序产出 HTML 章节，spine 为空时退回到文件顺序"""
+        seen = set()
+        for idref, _linear in book.spine:
+            item = book.get_item_with_id(idref)
+            if isinstance(item, epub.EpubHtml) and item.id not in seen:
+                seen.add(item.id)
+                yield item
+
+        if not seen:
+            for item in book.get_items():
+                if isinstance(item, epub.EpubHtml):
+                    yield item
 
     def _extract_chapters_info(self, toc) -> List[dict]:
         """从目录结构中提取章节信息"""
@@ -1,30 +1,63 @@
 """Markdown 文档加载器"""
-from typing import List
+import re
+from typing import Iterator, Optional
+from src.config import config
 from src.loaders.base import BaseLoader, Document
 
+_HEADING_RE = re.compile(r"^#{1,6}\s")
+_FENCE_RE = re.compile(r"^\s*(```|~~~)")
+
 
 class MarkdownLoader(BaseLoader):
-    """Markdown 文档加载器"""
+    """
+    Markdown 文档加载器
+
+    按标题切成不超过 section_chars 左右的段落，代码块内的 # 行不作为标题。
+    小于 section_chars 的文件仍然作为 1 个 Document。
+    """
+
+    def __init__(self, section_chars: Optional[int] = None):
+        """
+        初始化 Markdown 加载器
 
-    def load(self, path: str) -> List[Document]:
+        Args:
+            section_chars: 每个段落的目标字符数
+        """
+        self.section_chars = section_chars or config.LOADER_SECTION_CHARS
+
+    def iter_load(self, path: str) -> Iterator[Document]:
         """
-        加载 Markdown 文档
+        逐段加载 Markdown 文档
 
         Args:
             path: Markdown 文件路径
 
-        Returns:
-            文档列表（整个文档作为一个文档）
+        Yields:
+            每个段落一个文档（空文件产出一个空文档）
         """
         path_obj = self.validate_file_path(path, file_type="Markdown")
+        in_fence = False
+
+        def is_boundary(line: str) -> bool:
+            nonlocal in_fence
+            if _FENCE_RE.match(line):
+                in_fence = not in_fence
+                # 代码块开头可以切分，结尾不行
+                return in_fence
+            return not in_fence and bool(_HEADING_RE.match(line))
 
         with open(path, "r", encoding="utf-8") as f:
-            content = f.read()
-
-        return [
-            Document(
-                content=content,
-                metadata={"type": "markdown"},
-                source=str(path_obj),
-            )
-        ]
+            empty = True
+            for index, content in enumerate(self.iter_sections(f, is_boundary, self.section_chars)):
+                empty = False
+                yield Document(
+                    content=content,
+                    metadata={"type": "markdown", "section_index": index},
+                    source=str(path_obj),
+                )
+            if empty:
+                yield Document(
+                    content="",
+                    metadata={"type": "markdown", "section_index": 0},
+                    source=str(path_obj),
+                )
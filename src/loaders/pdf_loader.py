@@ -1,44 +1,109 @@
 """PDF 文档加载器"""
-from typing import List
+from concurrent.futures import Future, ProcessPoolExecutor
+from collections import deque
+from typing import Deque, Iterator, List, Optional, Tuple
 import pypdf
+from src.config import config
 from src.loaders.base import BaseLoader, Document
 
 
+def extract_page_range(path: str, start: int, end: int) -> List[Tuple[int, str]]:
+    """
+    提取一段页面的文本（在工作进程中执行）
+
+    Args:
+        path: PDF 文件路径
+        start: 起始页下标（包含）
+        end: 结束页下标（不包含）
+
+    Returns:
+        (页下标, 文本) 列表
+    """
+    with open(path, "rb") as f:
+        pdf_reader = pypdf.PdfReader(f)
+        return [(page_num, pdf_reader.pages[page_num].extract_text()) for page_num in range(start, end)]
+
+
 class PDFLoader(BaseLoader):
     """PDF 文档加载器"""
 
-    def load(self, path: str) -> List[Document]:
+    def __init__(self, workers: Optional[int] = None, pages_per_task: Optional[int] = None):
+        """
+        初始化 PDF 加载器
+
+        Args:
+            workers: 并行提取文本的进程数，1 表示在当前进程中逐页提取
+            pages_per_task: 并行模式下每个任务提取的页数
         """
-        加载 PDF 文档
+        self.workers = workers or config.PDF_EXTRACT_WORKERS
+        self.pages_per_task = pages_per_task or config.PDF_PAGES_PER_TASK
+
+    def iter_load(self, path: str) -> Iterator[Document]:
+        """
+        逐页加载 PDF 文档
+
+        页面按顺序惰性产出，可以直接接入切分和 embedding 流水线。
 
         Args:
             path: PDF 文件路径
 
-        Returns:
-            文档列表（每个页面一个文档）
+        Yields:
+            每个非空页面一个文档
         """
         path_obj = self.validate_file_path(path, file_type="PDF")
 
-        documents = []
+        with open(path, "rb") as f:
+            num_pages = len(pypdf.PdfReader(f).pages)
+
+        if self.workers > 1 and num_pages > self.pages_per_task:
+            pages = self._iter_pages_parallel(str(path_obj), num_pages)
+        else:
+            pages = self._iter_pages(str(path_obj))
+
+        for page_num, text in pages:
+            if text.strip():
+                yield Document(
+                    content=text,
+                    metadata={
+                        "page": page_num + 1,
+                        "total_pages": num_pages,
+                        "type": "pdf",
+                    },
+                    source=str(path_obj),
+                )
 
+    @staticmethod
+    def _iter_pages(path: str) -> Iterator[Tuple[int, str]]:
+        """在当前进程中逐页提取文本"""
         with open(path, "rb") as f:
             pdf_reader = pypdf.PdfReader(f)
-            num_pages = len(pdf_reader.pages)
-
-            for page_num in range(num_pages):
-                page = pdf_reader.pages[page_num]
-                text = page.extract_text()
-
-                if text.strip():
-                    doc = Document(
-                        content=text,
-                        metadata={
-                            "page": page_num + 1,
-                            "total_pages": num_pages,
-                            "type": "pdf",
-                        },
-                        source=str(path_obj),
-                    )
-                    documents.append(doc)
-
-        return documents
+            for page_num in range(len(pdf_reader.pages)):
+                yield page_num, pdf_reader.pages[page_num].extract_text()
+
+    def _iter_pages_parallel(self, path: str, num_pages: int) -> Iterator[Tuple[int, str]]:
+        """
+        多进程按页段提取文本，按页码顺序产出
+
+        同时提交的任务数限制为进程数的两倍，已完成但未轮到的页段只在内存中短暂停留。
+        """
+        ranges = iter(
+            (start, min(start + self.pages_per_task, num_pages))
+            for start in range(0, num_pages, self.pages_per_task)
+        )
+        max_in_flight = self.workers * 2
+
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            in_flight: Deque[Future] = deque()
+
+            def submit_next() -> None:
+                for start, end in ranges:
+                    in_flight.append(executor.submit(extract_page_range, path, start, end))
+                    if len(in_flight) >= max_in_flight:
+                        break
+
+            submit_next()
+            while in_flight:
+                # 按提交顺序等待，保证页码有序
+                pages = in_flight.popleft().result()
+                submit_next()
+                yield from pages
@@ -1,43 +1,173 @@
 """纯文本文档加载器"""
-from typing import List
+import codecs
+import io
+import mmap
+import re
+from typing import Iterator, Optional
+from src.chunking.chapter_detector import ChapterDetector
+from src.config import config
 from src.loaders.base import BaseLoader, Document
 
+# 一级章节标题（ChapterDetector 的一级模式），作为段落的优先切分点
+_HEADING_RE = re.compile(
+    "|".join(f"(?:{pattern})" for pattern, level in ChapterDetector.PATTERNS if level == 1)
+)
+# 编码检测的采样字节数（文件开头和中间各取一段）
+SAMPLE_BYTES = 64 * 1024
+# 每次从映射中解码的字节数
+READ_BLOCK_BYTES = 1024 * 1024
+
+_BOMS = [
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+]
+
+
+def _decodes_as_utf8(sample: bytes) -> bool:
+    """样本能否按 UTF-8 解码（允许末尾截断的多字节字符）"""
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+        return True
+    except UnicodeDecodeError:
+        return False
+
+
+def detect_encoding(*samples: bytes) -> str:
+    """
+    根据文件样本检测编码
+
+    依次检查 BOM、UTF-8，都不符合时使用 GB18030（兼容 GBK/GB2312）。
+
+    Args:
+        samples: 文件样本，第一个必须是文件开头
+
+    Returns:
+        编码名称
+    """
+    head = samples[0] if samples else b""
+    for bom, encoding in _BOMS:
+        if head.startswith(bom):
+            return encoding
+
+    if all(_decodes_as_utf8(sample) for sample in samples):
+        return "utf-8"
+    return "gb18030"
+
+
+def detect_mapped_encoding(mm: mmap.mmap) -> str:
+    """
+    从文件映射的开头和中间各取一段样本检测编码
+
+    Args:
+        mm: 文件映射
+
+    Returns:
+        编码名称
+    """
+    head = mm[:SAMPLE_BYTES]
+    if len(mm) <= SAMPLE_BYTES:
+        return detect_encoding(head)
+
+    middle = mm[len(mm) // 2:len(mm) // 2 + SAMPLE_BYTES]
+    # 跳过开头被截断的 UTF-8 续字节
+    middle = middle.lstrip(bytes(range(0x80, 0xC0)))
+    return detect_encoding(head, middle)
+
+
+def _is_section_boundary(line: str) -> bool:
+    """空行或一级章节标题可以作为新段落的开头"""
+    stripped = line.strip()
+    return not stripped or bool(_HEADING_RE.match(stripped))
+
 
 class TXTLoader(BaseLoader):
     """
     纯文本文档加载器
 
     处理策略：
-    - 整个文件作为 1 个 Document
-    - 保留内容完整性，由 split_text() 函数负责后续切分
-    - 适用于各种长度的纯文本文件
+    - 内存映射文件，从样本检测编码（BOM / UTF-8 / GB18030），分块增量解码
+    - 按章节标题或空行切成不超过 section_chars 左右的段落，每段 1 个 Document，
+      峰值内存与段落大小相关，与文件大小无关
+    - 小于 section_chars 的文件仍然作为 1 个 Document
+    - 换行统一为 \\n，所有段落按顺序拼接等于原文，由 split_text() 函数负责后续切分
     """
 
-    def load(self, path: str) -> List[Document]:
+    def __init__(self, section_chars: Optional[int] = None):
         """
-        加载纯文本文档
+        初始化纯文本加载器
+
+        Args:
+            section_chars: 每个段落的目标字符数
+        """
+        self.section_chars = section_chars or config.LOADER_SECTION_CHARS
+
+    def iter_load(self, path: str) -> Iterator[Document]:
+        """
+        逐段加载纯文本文档
 
         Args:
             path: 文本文件路径
 
-        Returns:
-            文档列表（整个文档作为一个文档）
+        Yields:
+            每个段落一个文档（空文件产出一个空文档）
         """
         path_obj = self.validate_file_path(path, file_type="Text")
+        file_size = path_obj.stat().st_size
+
+        if file_size == 0:
+            yield self._make_document("", str(path_obj), file_size, 0, "utf-8")
+            return
+
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            encoding = detect_mapped_encoding(mm)
+            lines = self._iter_lines(mm, encoding)
+            for index, content in enumerate(self.iter_sections(lines, _is_section_boundary, self.section_chars)):
+                yield self._make_document(content, str(path_obj), file_size, index, encoding)
+
+    @staticmethod
+    def _iter_lines(mm: mmap.mmap, encoding: str) -> Iterator[str]:
+        """
+        分块增量解码并按行产出
+
+        Args:
+            mm: 文件映射
+            encoding: 文件编码
+
+        Yields:
+            以 \\n 结尾的文本行（最后一行和超长行的片段可能没有换行）
+        """
+        decoder = io.IncrementalNewlineDecoder(codecs.getincrementaldecoder(encoding)(), translate=True)
+        pending = ""
+
+        for start in range(0, len(mm), READ_BLOCK_BYTES):
+            block = mm[start:start + READ_BLOCK_BYTES]
+            text = pending + decoder.decode(block, final=start + READ_BLOCK_BYTES >= len(mm))
+            lines = text.split("\n")
+            pending = lines.pop()
+            for line in lines:
+                yield line + "\n"
+            # 没有换行的超长行也按块产出，避免整行留在内存中
+            if len(pending) >= READ_BLOCK_BYTES:
+                yield pending
+                pending = ""
+
+        if pending:
+            yield pending
 
-        # 读取整个文件内容
-        with open(path, "r", encoding="utf-8") as f:
-            content = f.read()
-
-        # 返回单个 Document，包含完整内容
-        return [
-            Document(
-                content=content,
-                metadata={
-                    "type": "txt",
-                    "file_size": path_obj.stat().st_size,
-                    "char_count": len(content),
-                },
-                source=str(path_obj),
-            )
-        ]
+    @staticmethod
+    def _make_document(content: str, source: str, file_size: int, section_index: int, encoding: str) -> Document:
+        """构造段落文档"""
+        return Document(
+            content=content,
+            metadata={
+                "type": "txt",
+                "file_size": file_size,
+                "char_count": len(content),
+                "section_index": section_index,
+                "encoding": encoding,
+            },
+            source=source,
+        )
@@ -1,5 +1,5 @@
 """网页文档加载器"""
-from typing import List
+from typing import Iterator
 import trafilatura
 from src.loaders.base import BaseLoader, Document
 
@@ -7,15 +7,15 @@ from src.loaders.base import BaseLoader, Document
 class WebLoader(BaseLoader):
     """网页文档加载器"""
 
-    def load(self, url: str) -> List[Document]:
+    def iter_load(self, url: str) -> Iterator[Document]:
         """
         加载网页内容
 
         Args:
             url: 网页 URL
 
-        Returns:
-            文档列表
+        Yields:
+            整个网页作为一个文档
         """
         downloaded = trafilatura.fetch_url(url)
         if downloaded is None:
@@ -26,10 +26,8 @@ class WebLoader(BaseLoader):
         if content is None:
             raise ValueError(f"Failed to extract content from: {url}")
 
-        return [
-            Document(
-                content=content,
-                metadata={"type": "web", "url": url},
-                source=url,
-            )
-        ]
+        yield Document(
+            content=content,
+            metadata={"type": "web", "url": url},
+            source=url,
+        )
@@ -0,0 +1,316 @@
+"""摄入清单模块 - 记录已摄入文件和块的指纹，支持增量重新摄入"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from src.config import config
+from src.loaders.base import Document
+
+# 计算文件哈希时每次读取的字节数
+HASH_BLOCK_SIZE = 1 << 20
+
+
+@dataclass
+class FileFingerprint:
+    """文件指纹"""
+    size: int
+    mtime: float
+    content_hash: str
+
+
+def hash_file(path: str) -> str:
+    """
+    计算文件内容的 SHA-256
+
+    Args:
+        path: 文件路径
+
+    Returns:
+        十六进制哈希值
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def file_fingerprint(path: str) -> FileFingerprint:
+    """
+    获取文件指纹（大小、修改时间、内容哈希）
+
+    Args:
+        path: 文件路径
+
+    Returns:
+        文件指纹
+    """
+    stat = Path(path).stat()
+    return FileFingerprint(
+        size=stat.st_size,
+        mtime=stat.st_mtime,
+        content_hash=hash_file(path),
+    )
+
+
+def hash_chunk(doc: Document) -> str:
+    """
+    计算块的哈希（内容 + 元数据）
+
+    元数据也参与哈希，这样切分策略改变章节、页码等信息时块会被重写。
+
+    Args:
+        doc: 文档块
+
+    Returns:
+        十六进制哈希值
+    """
+    digest = hashlib.sha256(doc.content.encode("utf-8"))
+    digest.update(json.dumps(doc.metadata, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def with_chunk_ids(documents: Iterable[Document]) -> Iterator[Tuple[Document, str]]:
+    """
+    为文档块生成确定性的、基于内容的 chunk ID
+
+    ID 由来源哈希、内容哈希和该内容在来源中的出现序号组成：
+    - 同一来源、同一内容的块在重新切分后 ID 不变，upsert 是幂等的
+    - 在前面插入或删除块不会改变后面块的 ID，增量摄入只需写入真正变化的块
+    - 同一来源中内容完全相同的块按出现顺序编号，不会冲突
+
+    Args:
+        documents: 文档块（可以是迭代器）
+
+    Yields:
+        (文档块, chunk ID)
+    """
+    source_hashes: Dict[str, str] = {}
+    occurrences: Dict[Tuple[str, str], int] = {}
+
+    for doc in documents:
+        source_hash = source_hashes.get(doc.source)
+        if source_hash is None:
+            source_hash = hashlib.sha256(doc.source.encode("utf-8")).hexdigest()[:16]
+            source_hashes[doc.source] = source_hash
+
+        content_hash = hashlib.sha256(doc.content.encode("utf-8")).hexdigest()[:32]
+        ordinal = occurrences.get((doc.source, content_hash), 0)
+        occurrences[(doc.source, content_hash)] = ordinal + 1
+
+        yield doc, f"{source_hash}-{content_hash}-{ordinal}"
+
+
+def make_chunk_ids(documents: Iterable[Document]) -> List[str]:
+    """
+    为文档块生成 chunk ID 列表，规则见 with_chunk_ids
+
+    Args:
+        documents: 文档块
+
+    Returns:
+        chunk ID 列表
+    """
+    return [chunk_id for _, chunk_id in with_chunk_ids(documents)]
+
+
+class IngestManifest:
+    """
+    摄入清单（SQLite 持久化）
+
+    按来源记录文件大小、修改时间和内容哈希，以及每个块的 ID 和哈希。
+    重新摄入时：
+    - 大小和修改时间都没变的文件直接跳过，不打开文件
+    - 只有修改时间变化时比较内容哈希，内容相同同样跳过
+    - 文件变化时只重新 embedding 新出现或哈希发生变化的块
+    """
+
+    def __init__(self, path: Optional[str] = None, collection_name: Optional[str] = None):
+        """
+        初始化摄入清单
+
+        Args:
+            path: 清单数据库路径，默认按集合名存放在 data/index 下
+            collection_name: 集合名称
+        """
+        collection_name = collection_name or config.CHROMA_COLLECTION_NAME
+        self.path = str(path or config.INDEX_DIR / f"{collection_name}_manifest.sqlite3")
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """获取数据库连接（延迟创建）"""
+        if self._conn is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS files (
+                    source TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime REAL NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS chunks (
+                    source TEXT NOT NULL,
+                    chunk_id TEXT NOT NULL,
+                    chunk_hash TEXT NOT NULL,
+                    PRIMARY KEY (source, chunk_id)
+                );
+                """
+            )
+        return self._conn
+
+    def get(self, source: str) -> Optional[FileFingerprint]:
+        """
+        获取来源的文件指纹
+
+        Args:
+            source: 文档来源
+
+        Returns:
+            文件指纹，未记录时返回 None
+        """
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT size, mtime, content_hash FROM files WHERE source = ?",
+                (source,),
+            ).fetchone()
+        if row is None:
+            return None
+        return FileFingerprint(size=row[0], mtime=row[1], content_hash=row[2])
+
+    def get_chunks(self, source: str) -> Dict[str, str]:
+        """
+        获取来源已记录的块
+
+        Args:
+            source: 文档来源
+
+        Returns:
+            chunk ID 到块哈希的映射
+        """
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT chunk_id, chunk_hash FROM chunks WHERE source = ?",
+                (source,),
+            ).fetchall()
+        return dict(rows)
+
+    def is_unchanged(self, path: str) -> bool:
+        """
+        判断文件自上次摄入后是否未变化
+
+        Args:
+            path: 文件路径（即文档来源）
+
+        Returns:
+            文件未变化时返回 True
+        """
+        record = self.get(path)
+        if record is None:
+            return False
+
+        stat = Path(path).stat()
+        if stat.st_size != record.size:
+            return False
+        if stat.st_mtime == record.mtime:
+            return True
+
+        # 修改时间变化（例如被 touch 或重新复制），再比较内容
+        if hash_file(path) != record.content_hash:
+            return False
+
+        with self._lock, self.conn:
+            self.conn.execute(
+                "UPDATE files SET mtime = ? WHERE source = ?",
+                (stat.st_mtime, path),
+            )
+        return True
+
+    def diff_chunks(
+        self,
+        source: str,
+        chunk_ids: Sequence[str],
+        chunk_hashes: Sequence[str],
+    ) -> Tuple[List[int], List[int], List[str]]:
+        """
+        对比新旧块，得到需要写入、更新元数据和删除的块
+
+        chunk ID 由内容生成（见 with_chunk_ids），所以 ID 已存在但哈希变化的块只是元数据变了，
+        只需更新元数据，不需要重新 embedding。
+
+        Args:
+            source: 文档来源
+            chunk_ids: 新的 chunk ID 列表
+            chunk_hashes: 新的块哈希列表
+
+        Returns:
+            (需要写入的块下标列表, 只需更新元数据的块下标列表, 需要删除的 chunk ID 列表)
+        """
+        old_chunks = self.get_chunks(source)
+
+        to_add, to_update = [], []
+        for i, (chunk_id, chunk_hash) in enumerate(zip(chunk_ids, chunk_hashes)):
+            old_hash = old_chunks.get(chunk_id)
+            if old_hash is None:
+                to_add.append(i)
+            elif old_hash != chunk_hash:
+                to_update.append(i)
+
+        # 已消失的块
+        new_ids = set(chunk_ids)
+        to_delete = [chunk_id for chunk_id in old_chunks if chunk_id not in new_ids]
+
+        return to_add, to_update, to_delete
+
+    def record(
+        self,
+        source: str,
+        fingerprint: FileFingerprint,
+        chunk_ids: Sequence[str],
+        chunk_hashes: Sequence[str],
+    ) -> None:
+        """
+        记录来源的最新摄入状态
+
+        Args:
+            source: 文档来源
+            fingerprint: 文件指纹
+            chunk_ids: chunk ID 列表
+            chunk_hashes: 块哈希列表
+        """
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO files (source, size, mtime, content_hash, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (source, fingerprint.size, fingerprint.mtime, fingerprint.content_hash, time.time()),
+            )
+            self.conn.execute("DELETE FROM chunks WHERE source = ?", (source,))
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO chunks (source, chunk_id, chunk_hash) VALUES (?, ?, ?)",
+                [(source, chunk_id, chunk_hash) for chunk_id, chunk_hash in zip(chunk_ids, chunk_hashes)],
+            )
+
+    def remove(self, source: str) -> None:
+        """
+        删除来源的记录
+
+        Args:
+            source: 文档来源
+        """
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM files WHERE source = ?", (source,))
+            self.conn.execute("DELETE FROM chunks WHERE source = ?", (source,))
+
+    def clear(self) -> None:
+        """清空清单"""
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM files")
+            self.conn.execute("DELETE FROM chunks")
@@ -0,0 +1,430 @@
+"""量化向量索引 - int8 / 二值量化的 embedding 存放在内存映射文件中，粗排后用全精度向量精排"""
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from src.config import config
+
+# 支持的量化方式
+QUANTIZATIONS = ("int8", "binary")
+# 粗排时每次扫描的行数：临时数组能放进 CPU 缓存时转换和点积最快
+SCAN_BLOCK_ROWS = 8192
+# SQLite 单条语句的参数数量有上限，批量操作时分段
+_SQL_BATCH = 500
+# 每个字节中 1 的个数（NumPy 2 之前没有 bitwise_count）
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def _popcount(bits: np.ndarray) -> np.ndarray:
+    """逐字节统计 1 的个数"""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(bits)
+    return _POPCOUNT[bits]
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """按行 L2 归一化（零向量保持为零）"""
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
+
+
+def quantize_int8(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    逐向量对称 int8 标量量化
+
+    Args:
+        vectors: float32 向量（n × d）
+
+    Returns:
+        (int8 量化码, 每个向量的缩放系数)，原向量约等于 量化码 × 缩放系数
+    """
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+def quantize_binary(vectors: np.ndarray) -> np.ndarray:
+    """
+    二值量化：每一维只保留符号位，8 维打包为 1 个字节
+
+    Args:
+        vectors: float32 向量（n × d）
+
+    Returns:
+        uint8 量化码（n × ceil(d / 8)）
+    """
+    return np.packbits(vectors > 0, axis=1)
+
+
+class QuantizedIndex:
+    """
+    量化向量索引
+
+    - 每个块的 embedding 按行追加到三个文件：量化码、缩放系数（仅 int8）和全精度向量
+    - 检索时先用量化码对全部向量粗排（int8 点积或汉明距离），
+      再从全精度向量文件中读出候选精确计算余弦相似度
+    - 文件通过内存映射访问，常驻内存的只有每次都会扫描的量化码：
+      int8 约为 float32 的 1/4，二值约为 1/32；全精度向量只在精排时按需读入少量行
+    - chunks 表（SQLite）记录 chunk ID、来源和所在行；删除只删记录，
+      文件中的行成为空洞，由 VectorStore.rebuild_quantized_index 重建时回收
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        collection_name: Optional[str] = None,
+        quantization: Optional[str] = None,
+    ):
+        """
+        初始化量化索引
+
+        Args:
+            path: 索引目录，默认按集合名和量化方式存放在 data/index 下
+            collection_name: 集合名称
+            quantization: 量化方式（int8 或 binary），默认使用配置值
+        """
+        self.quantization = quantization or config.QUANTIZATION
+        if self.quantization not in QUANTIZATIONS:
+            raise ValueError(f"不支持的量化方式: {self.quantization}（可选: {', '.join(QUANTIZATIONS)}）")
+
+        collection_name = collection_name or config.CHROMA_COLLECTION_NAME
+        self.path = Path(path or config.INDEX_DIR / f"{collection_name}_quantized_{self.quantization}")
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        # 内存映射和存活行掩码，写入或删除后重新打开
+        self._arrays: Optional[Tuple[np.ndarray, Optional[np.ndarray], np.ndarray]] = None
+        self._live: Optional[np.ndarray] = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """获取数据库连接（延迟创建）"""
+        if self._conn is None:
+            self.path.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path / "index.sqlite3"), check_same_thread=False)
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS chunks (
+                    chunk_id TEXT PRIMARY KEY,
+                    row INTEGER NOT NULL UNIQUE,
+                    source TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_chunks_source ON chunks (source);
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
+                );
+                """
+            )
+            # 块数随写入和删除维护在 meta 中；旧版本建立的索引没有记录时统计一次
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO meta (key, value) SELECT 'count', COUNT(*) FROM chunks"
+                )
+        return self._conn
+
+    @property
+    def _codes_path(self) -> Path:
+        return self.path / f"codes.{self.quantization}"
+
+    @property
+    def _scales_path(self) -> Path:
+        return self.path / "scales.f32"
+
+    @property
+    def _vectors_path(self) -> Path:
+        return self.path / "vectors.f32"
+
+    def _meta(self, key: str) -> int:
+        """读取元数据（行数、块数、维度），不存在时为 0"""
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else 0
+
+    def _code_width(self, dim: int) -> int:
+        """每行量化码的字节数"""
+        return dim if self.quantization == "int8" else (dim + 7) // 8
+
+    def add(self, chunk_ids: Sequence[str], embeddings: np.ndarray, sources: Sequence[str]) -> None:
+        """
+        添加块的 embedding（已存在的 chunk ID 跳过，ID 由内容生成，embedding 不变）
+
+        Args:
+            chunk_ids: chunk ID 列表
+            embeddings: embedding 矩阵（n × d）
+            sources: 来源列表
+        """
+        if not len(chunk_ids):
+            return
+
+        vectors = _normalize(np.asarray(embeddings, dtype=np.float32))
+        with self._lock, self.conn:
+            existing = set()
+            for start in range(0, len(chunk_ids), _SQL_BATCH):
+                batch = list(chunk_ids[start:start + _SQL_BATCH])
+                existing.update(chunk_id for (chunk_id,) in self.conn.execute(
+                    f"SELECT chunk_id FROM chunks WHERE chunk_id IN ({','.join('?' * len(batch))})",
+                    batch,
+                ))
+            new = list({
+                chunk_id: i for i, chunk_id in enumerate(chunk_ids) if chunk_id not in existing
+            }.values())
+            if not new:
+                return
+
+            rows, dim = self._meta("rows"), self._meta("dim") or vectors.shape[1]
+            if vectors.shape[1] != dim:
+                raise ValueError(f"embedding 维度 {vectors.shape[1]} 与量化索引的维度 {dim} 不一致")
+
+            vectors = vectors[new]
+            if self.quantization == "int8":
+                codes, scales = quantize_int8(vectors)
+                self._append(self._scales_path, rows * 4, scales)
+            else:
+                codes = quantize_binary(vectors)
+            # 先截断到已提交的行数，丢弃上次写入失败时残留的部分
+            self._append(self._codes_path, rows * codes.shape[1], codes)
+            self._append(self._vectors_path, rows * dim * 4, vectors)
+
+            self.conn.executemany(
+                "INSERT INTO chunks (chunk_id, row, source) VALUES (?, ?, ?)",
+                [(chunk_ids[i], rows + j, sources[i]) for j, i in enumerate(new)],
+            )
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                [("rows", rows + len(new)), ("count", self._meta("count") + len(new)), ("dim", dim)],
+            )
+            self._arrays = self._live = None
+
+    @staticmethod
+    def _append(path: Path, offset: int, array: np.ndarray) -> None:
+        """从 offset 字节处写入数组（之后的内容被截断）"""
+        with open(path, "ab") as f:
+            f.truncate(offset)
+            f.write(np.ascontiguousarray(array).tobytes())
+
+    def delete_ids(self, chunk_ids: Sequence[str]) -> None:
+        """
+        按 chunk ID 删除
+
+        Args:
+            chunk_ids: chunk ID 列表
+        """
+        with self._lock, self.conn:
+            deleted = 0
+            for start in range(0, len(chunk_ids), _SQL_BATCH):
+                batch = list(chunk_ids[start:start + _SQL_BATCH])
+                deleted += self.conn.execute(
+                    f"DELETE FROM chunks WHERE chunk_id IN ({','.join('?' * len(batch))})",
+                    batch,
+                ).rowcount
+            self._decrement_count(deleted)
+            self._live = None
+
+    def delete_source(self, source: str) -> None:
+        """
+        删除来源的所有块
+
+        Args:
+            source: 文档来源
+        """
+        with self._lock, self.conn:
+            deleted = self.conn.execute("DELETE FROM chunks WHERE source = ?", (source,)).rowcount
+            self._decrement_count(deleted)
+            self._live = None
+
+    def _decrement_count(self, deleted: int) -> None:
+        """删除块后更新块数（调用方需持有锁并在事务内）"""
+        if deleted > 0:
+            self.conn.execute("UPDATE meta SET value = value - ? WHERE key = 'count'", (deleted,))
+
+    def clear(self) -> None:
+        """清空索引（同时删除数据文件）"""
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM chunks")
+            self.conn.execute("DELETE FROM meta")
+            self._arrays = self._live = None
+            for path in (self._codes_path, self._scales_path, self._vectors_path):
+                path.unlink(missing_ok=True)
+
+    def is_empty(self) -> bool:
+        """索引是否为空"""
+        with self._lock:
+            return self.conn.execute("SELECT 1 FROM chunks LIMIT 1").fetchone() is None
+
+    def __len__(self) -> int:
+        """索引中的块数（读取 meta 中维护的计数，不扫描 chunks 表）"""
+        with self._lock:
+            return self._meta("count")
+
+    def _open(self) -> Optional[Tuple[np.ndarray, Optional[np.ndarray], np.ndarray]]:
+        """打开 (量化码, 缩放系数, 全精度向量) 的只读内存映射（调用方需持有锁）"""
+        if self._arrays is None:
+            rows, dim = self._meta("rows"), self._meta("dim")
+            if not rows:
+                return None
+            codes = np.memmap(
+                self._codes_path,
+                dtype=np.int8 if self.quantization == "int8" else np.uint8,
+                mode="r",
+                shape=(rows, self._code_width(dim)),
+            )
+            scales = (
+                np.memmap(self._scales_path, dtype=np.float32, mode="r", shape=(rows,))
+                if self.quantization == "int8" else None
+            )
+            vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r", shape=(rows, dim))
+            self._arrays = (codes, scales, vectors)
+        return self._arrays
+
+    def _live_rows(self, sources: Optional[Iterable[str]]) -> Optional[np.ndarray]:
+        """
+        可参与检索的行（调用方需持有锁）
+
+        Returns:
+            不过滤来源时为全部行的存活掩码，否则为来源内的行号（升序）
+        """
+        if sources is not None:
+            sources = list(sources)
+            rows: List[int] = []
+            for start in range(0, len(sources), _SQL_BATCH):
+                batch = sources[start:start + _SQL_BATCH]
+                rows.extend(row for (row,) in self.conn.execute(
+                    f"SELECT row FROM chunks WHERE source IN ({','.join('?' * len(batch))})",
+                    batch,
+                ))
+            return np.sort(np.asarray(rows, dtype=np.int64))
+
+        if self._live is None:
+            live = np.zeros(self._meta("rows"), dtype=bool)
+            rows = np.fromiter((row for (row,) in self.conn.execute("SELECT row FROM chunks")), dtype=np.int64)
+            live[rows] = True
+            self._live = live
+        return self._live
+
+    def _coarse_scores(
+        self,
+        codes: np.ndarray,
+        scales: Optional[np.ndarray],
+        query: np.ndarray,
+        query_bits: Optional[np.ndarray],
+    ) -> np.ndarray:
+        """一批量化码的粗排分数（越大越相似）"""
+        if self.quantization == "int8":
+            return (codes.astype(np.float32) @ query) * scales
+        # 汉明距离越小越相似
+        return -_popcount(codes ^ query_bits).sum(axis=1, dtype=np.int32).astype(np.float32)
+
+    def search(
+        self,
+        query_embedding: Sequence[float],
+        top_k: int,
+        sources: Optional[Iterable[str]] = None,
+        candidates: Optional[int] = None,
+    ) -> List[Tuple[str, float]]:
+        """
+        两阶段检索：量化码粗排取 candidates 个候选，再用全精度向量精排
+
+        Args:
+            query_embedding: 查询向量
+            top_k: 返回结果数量
+            sources: 可选的来源白名单
+            candidates: 粗排保留的候选数，默认使用配置值（不少于 top_k）
+
+        Returns:
+            (chunk ID, 余弦相似度) 列表，按相似度降序排列
+        """
+        candidates = max(candidates or config.QUANTIZED_RESCORE_CANDIDATES, top_k)
+        query = _normalize(np.asarray(query_embedding, dtype=np.float32))
+        query_bits = quantize_binary(query[None, :])[0] if self.quantization == "binary" else None
+
+        with self._lock:
+            arrays = self._open()
+            if arrays is None:
+                return []
+            codes, scales, vectors = arrays
+            live = self._live_rows(sources)
+
+            best_rows = np.empty(0, dtype=np.int64)
+            best_scores = np.empty(0, dtype=np.float32)
+            num_rows = len(live) if sources is not None else len(codes)
+            for start in range(0, num_rows, SCAN_BLOCK_ROWS):
+                end = min(start + SCAN_BLOCK_ROWS, num_rows)
+                if sources is not None:
+                    rows = live[start:end]
+                    block_scores = self._coarse_scores(
+                        codes[rows], scales[rows] if scales is not None else None, query, query_bits
+                    )
+                else:
+                    rows = np.arange(start, end)
+                    block_scores = self._coarse_scores(
+                        codes[start:end], scales[start:end] if scales is not None else None, query, query_bits
+                    )
+                    mask = live[start:end]
+                    rows, block_scores = rows[mask], block_scores[mask]
+
+                best_rows = np.concatenate([best_rows, rows])
+                best_scores = np.concatenate([best_scores, block_scores])
+                if len(best_rows) > candidates:
+                    keep = np.argpartition(-best_scores, candidates - 1)[:candidates]
+                    best_rows, best_scores = best_rows[keep], best_scores[keep]
+
+            if not len(best_rows):
+                return []
+
+            # 按行号顺序读取全精度向量，精确计算余弦相似度
+            best_rows = np.sort(best_rows)
+            exact = np.asarray(vectors[best_rows]) @ query
+            order = np.argsort(-exact, kind="stable")[:top_k]
+
+            rows = [int(row) for row in best_rows[order]]
+            row_ids = dict(self.conn.execute(
+                f"SELECT row, chunk_id FROM chunks WHERE row IN ({','.join('?' * len(rows))})",
+                rows,
+            ).fetchall())
+
+        return [(row_ids[row], float(exact[i])) for row, i in zip(rows, order) if row in row_ids]
+
+    def get_vectors(self, chunk_ids: Sequence[str]) -> Dict[str, np.ndarray]:
+        """
+        读取块的全精度向量（已归一化）
+
+        Args:
+            chunk_ids: chunk ID 列表
+
+        Returns:
+            chunk ID -> 向量，不存在的 ID 不在结果中
+        """
+        with self._lock:
+            arrays = self._open()
+            if arrays is None:
+                return {}
+            found: Dict[str, int] = {}
+            for start in range(0, len(chunk_ids), _SQL_BATCH):
+                batch = list(chunk_ids[start:start + _SQL_BATCH])
+                found.update(self.conn.execute(
+                    f"SELECT chunk_id, row FROM chunks WHERE chunk_id IN ({','.join('?' * len(batch))})",
+                    batch,
+                ))
+            vectors = arrays[2]
+            return {chunk_id: np.array(vectors[row]) for chunk_id, row in found.items()}
+
+    def stats(self) -> Dict[str, int]:
+        """
+        获取索引统计信息
+
+        Returns:
+            块数、文件行数（含已删除的空洞）、维度，
+            常驻内存的量化码字节数和只在精排时读取的全精度向量字节数
+        """
+        with self._lock:
+            rows, dim = self._meta("rows"), self._meta("dim")
+            chunks = self.conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+        code_bytes = rows * self._code_width(dim) + (rows * 4 if self.quantization == "int8" else 0)
+        return {
+            "chunks": chunks,
+            "rows": rows,
+            "dim": dim,
+            "code_bytes": code_bytes,
+            "vector_bytes": rows * dim * 4,
+        }
@@ -0,0 +1,17 @@
+"""检索器模块"""
+from src.retriever.base import Retriever, build_filter
+from src.retriever.expansion import merge_windows
+from src.retriever.hybrid import HybridRetriever, reciprocal_rank_fusion
+from src.retriever.mmr import mmr_select
+from src.retriever.reranker import CrossEncoderReranker, get_reranker
+
+__all__ = [
+    "Retriever",
+    "build_filter",
+    "merge_windows",
+    "mmr_select",
+    "HybridRetriever",
+    "reciprocal_rank_fusion",
+    "CrossEncoderReranker",
+    "get_reranker",
+]
@@ -1,11 +1,44 @@
 """RAG 检索器模块"""
 from typing import List, Dict, Any, Optional, TYPE_CHECKING
+from src.config import config
+from src.retriever.expansion import merge_windows
+from src.retriever.mmr import mmr_select
 from src.vector_store import get_vector_store
 
 if TYPE_CHECKING:
+    from src.retriever.reranker import CrossEncoderReranker
     from src.vector_store import VectorStore
 
 
+def build_filter(
+    sources: Optional[List[str]] = None,
+    chapter_titles: Optional[List[str]] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    构造 Chroma where 过滤条件
+
+    章节条件依赖切分时标注的 chapter_title，问题限定在某几章时可以缩小检索范围。
+
+    Args:
+        sources: 来源白名单
+        chapter_titles: 章节标题白名单
+
+    Returns:
+        过滤条件，没有任何条件时返回 None
+    """
+    conditions = []
+    if sources:
+        conditions.append({"source": {"$in": list(sources)}})
+    if chapter_titles:
+        conditions.append({"chapter_title": {"$in": list(chapter_titles)}})
+
+    if not conditions:
+        return None
+    if len(conditions) == 1:
+        return conditions[0]
+    return {"$and": conditions}
+
+
 class Retriever:
     """RAG 检索器"""
 
@@ -14,6 +47,14 @@ class Retriever:
         top_k: Optional[int] = None,
         filter_metadata: Optional[Dict[str, Any]] = None,
         vector_store: Optional["VectorStore"] = None,
+        min_score: Optional[float] = None,
+        reranker: Optional["CrossEncoderReranker"] = None,
+        rerank_candidates: Optional[int] = None,
+        neighbor_window: Optional[int] = None,
+        mmr: Optional[bool] = None,
+        mmr_lambda: Optional[float] = None,
+        mmr_candidates: Optional[int] = None,
+        max_per_source: Optional[int] = None,
     ) -> None:
         """
         初始化检索器
@@ -22,9 +63,25 @@ class Retriever:
             top_k: 返回结果数量
             filter_metadata: 元数据过滤条件
             vector_store: 可选的向量存储实例（用于使用特定的 vector_store）
+            min_score: 最低余弦相似度，低于该值的结果不返回，默认使用配置值
+            reranker: 可选的重排器，设置后先召回 rerank_candidates 个候选再重排
+            rerank_candidates: 重排的候选数量，默认使用配置值
+            neighbor_window: 命中块前后各扩展的相邻块数，0 表示不扩展，默认使用配置值
+            mmr: 是否用 MMR 从 mmr_candidates 个候选中选出多样化的结果，默认使用配置值
+            mmr_lambda: MMR 的相关度权重，默认使用配置值
+            mmr_candidates: MMR 的候选数量，默认使用配置值
+            max_per_source: MMR 选择时每个来源最多的结果数，0 表示不限制，默认使用配置值
         """
         self.top_k = top_k
         self.filter_metadata = filter_metadata
+        self.min_score = config.MIN_RELEVANCE_SCORE if min_score is None else min_score
+        self.reranker = reranker
+        self.rerank_candidates = rerank_candidates or config.RERANK_CANDIDATES
+        self.neighbor_window = config.NEIGHBOR_WINDOW if neighbor_window is None else neighbor_window
+        self.mmr = config.MMR_ENABLED if mmr is None else mmr
+        self.mmr_lambda = config.MMR_LAMBDA if mmr_lambda is None else mmr_lambda
+        self.mmr_candidates = mmr_candidates or config.MMR_CANDIDATES
+        self.max_per_source = config.MMR_MAX_PER_SOURCE if max_per_source is None else max_per_source
         self._vector_store: Optional["VectorStore"] = vector_store
 
     @property
@@ -44,12 +101,119 @@ class Retriever:
         Returns:
             检索结果列表
         """
+        if self.reranker is None and not self.mmr:
+            return self._expand(self._search(query, self.top_k))
+
+        top_k = self.top_k or config.TOP_K_RETRIEVALS
+        candidates = self._search(query, self._fetch_k(top_k))
+        return self._expand(self._select(query, candidates, top_k))
+
+    def retrieve_many(self, queries: List[str]) -> List[List[Dict[str, Any]]]:
+        """
+        批量检索相关文档（一次 embedding 计算和一次向量库查询）
+
+        Args:
+            queries: 查询文本列表
+
+        Returns:
+            与 queries 一一对应的检索结果列表
+        """
+        if self.reranker is None and not self.mmr:
+            return [self._expand(results) for results in self._search_many(queries, self.top_k)]
+
+        top_k = self.top_k or config.TOP_K_RETRIEVALS
+        candidates_many = self._search_many(queries, self._fetch_k(top_k))
+        return [
+            self._expand(self._select(query, candidates, top_k))
+            for query, candidates in zip(queries, candidates_many)
+        ]
+
+    def _fetch_k(self, top_k: int) -> int:
+        """重排、MMR 需要召回的候选数量"""
+        fetch_k = top_k
+        if self.reranker is not None:
+            fetch_k = max(fetch_k, self.rerank_candidates)
+        if self.mmr:
+            fetch_k = max(fetch_k, self.mmr_candidates)
+        return fetch_k
+
+    def _select(self, query: str, candidates: List[Dict[str, Any]], top_k: int) -> List[Dict[str, Any]]:
+        """从候选中选出 top_k 个结果：先重排，再做 MMR 多样化"""
+        if self.reranker is not None:
+            candidates = self.reranker.rerank(query, candidates, len(candidates) if self.mmr else top_k)
+        if self.mmr:
+            candidates = self._diversify(query, candidates, top_k)
+        return candidates
+
+    def _diversify(self, query: str, candidates: List[Dict[str, Any]], top_k: int) -> List[Dict[str, Any]]:
+        """
+        用 MMR 选出相关且互不重复的结果
+
+        召回时没有带回 embedding 的候选（如词法检索结果）一次批量读取 embedding。
+        重排过的候选以重排分数作为相关度，否则使用与查询的余弦相似度。
+
+        Args:
+            query: 查询文本
+            candidates: 候选列表
+            top_k: 返回结果数量
+
+        Returns:
+            选中的结果（不含 embedding 字段）
+        """
+        missing = [c["id"] for c in candidates if c.get("embedding") is None and c.get("id")]
+        found = self.vector_store.get_embeddings(missing)
+        candidates = [
+            {**c, "embedding": c["embedding"] if c.get("embedding") is not None else found[c.get("id")]}
+            for c in candidates
+            if c.get("embedding") is not None or c.get("id") in found
+        ]
+        if not candidates:
+            return []
+
+        selected = mmr_select(
+            query_embedding=self.vector_store.embeddings.embed_query(query),
+            embeddings=[c["embedding"] for c in candidates],
+            k=top_k,
+            lambda_mult=self.mmr_lambda,
+            relevance=[c.get("score", 0.0) for c in candidates] if self.reranker is not None else None,
+            sources=[c["metadata"].get("source", "") for c in candidates],
+            max_per_source=self.max_per_source,
+        )
+        return [
+            {key: value for key, value in candidates[i].items() if key != "embedding"}
+            for i in selected
+        ]
+
+    def _expand(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """把命中块与前后相邻的块合并为连续段落（neighbor_window 为 0 时原样返回）"""
+        if not self.neighbor_window or not results:
+            return results
+        return merge_windows(results, self.vector_store.get_windows(results, self.neighbor_window))
+
+    def _search(self, query: str, top_k: Optional[int]) -> List[Dict[str, Any]]:
+        """召回候选（子类可替换召回方式）"""
         return self.vector_store.search(
             query=query,
-            top_k=self.top_k,
+            top_k=top_k,
             filter=self.filter_metadata,
+            min_score=self.min_score,
+            **self._search_options(),
         )
 
+    def _search_many(self, queries: List[str], top_k: Optional[int]) -> List[List[Dict[str, Any]]]:
+        """批量召回候选"""
+        return self.vector_store.search_many(
+            queries=queries,
+            top_k=top_k,
+            filter=self.filter_metadata,
+            min_score=self.min_score,
+            **self._search_options(),
+        )
+
+    def _search_options(self) -> Dict[str, Any]:
+        """向量检索的附加参数（MMR 需要候选的 embedding）"""
+        return {"include_embeddings": True} if self.mmr else {}
+
     def get_context(self, query: str) -> str:
         """
         获取检索到的上下文文本
@@ -81,16 +245,20 @@ class Retriever:
             query: 查询文本
 
         Returns:
-            来源信息列表
+            来源信息列表（score 为相关度分数，retrieval_score 为与查询的余弦相似度）
         """
         results = self.retrieve(query)
 
         sources = []
         for result in results:
             sources.append({
+                "id": result.get("id"),
                 "content": result["content"],
                 "source": result["metadata"].get("source", "未知来源"),
                 "metadata": result["metadata"],
+                "score": result.get("score", 0.0),
+                # 与查询的余弦相似度（重排、混合检索时 score 为重排分数或融合得分）
+                "retrieval_score": result.get("retrieval_score", result.get("score", 0.0)),
             })
 
         return sources
@@ -0,0 +1,80 @@
+"""相邻块扩展 - 把命中块和前后相邻的块合并为连续段落"""
+from typing import Any, Dict, List
+from src.chunking.chapter_splitter import document_key
+from src.chunking.splitter import overlap_length
+
+
+def merge_windows(
+    results: List[Dict[str, Any]],
+    windows: List[List[Dict[str, Any]]],
+) -> List[Dict[str, Any]]:
+    """
+    合并检索结果的相邻块窗口
+
+    同一文档（见 document_key）中相互重叠或首尾相接的窗口合并为一个段落，切分重叠部分只保留一次。
+    段落继承其中排名最靠前的命中结果的 id、score 等字段，按该结果的排名排序。
+
+    Args:
+        results: 按相关度降序排列的检索结果
+        windows: 与 results 一一对应的相邻块窗口（按 chunk_index 排序，见 VectorStore.get_windows）
+
+    Returns:
+        段落列表；metadata 中 chunk_index / last_chunk_index 为段落覆盖的块范围，
+        chunk_ids 为段落包含的块 ID
+    """
+    # 每个文档中已收集的块：chunk_index -> 块，以及命中该文档的最佳排名
+    documents: Dict[tuple, Dict[int, Dict[str, Any]]] = {}
+    hits: Dict[tuple, List[int]] = {}
+    passthrough: List[int] = []
+
+    for rank, (result, window) in enumerate(zip(results, windows)):
+        metadata = result.get("metadata") or {}
+        if metadata.get("chunk_index") is None:
+            passthrough.append(rank)
+            continue
+
+        key = document_key(metadata, result.get("source"))
+        chunks = documents.setdefault(key, {})
+        chunks[metadata["chunk_index"]] = result
+        for chunk in window:
+            chunks.setdefault(chunk["metadata"]["chunk_index"], chunk)
+        hits.setdefault(key, []).append(rank)
+
+    passages: List[tuple] = [(rank, results[rank]) for rank in passthrough]
+
+    for key, chunks in documents.items():
+        # 连续的 chunk_index 组成一个段落
+        runs: List[List[int]] = []
+        for index in sorted(chunks):
+            if runs and index == runs[-1][-1] + 1:
+                runs[-1].append(index)
+            else:
+                runs.append([index])
+
+        for run in runs:
+            ranks = [
+                rank for rank in hits[key]
+                if run[0] <= results[rank]["metadata"]["chunk_index"] <= run[-1]
+            ]
+            if not ranks:
+                continue
+            best = results[min(ranks)]
+
+            content = chunks[run[0]]["content"]
+            for index in run[1:]:
+                following = chunks[index]["content"]
+                content += following[overlap_length(content, following):]
+
+            passages.append((min(ranks), {
+                **best,
+                "content": content,
+                "metadata": {
+                    **best["metadata"],
+                    "chunk_index": run[0],
+                    "last_chunk_index": run[-1],
+                    "chunk_ids": [chunks[index].get("id") for index in run],
+                },
+            }))
+
+    passages.sort(key=lambda passage: passage[0])
+    return [passage for _, passage in passages]
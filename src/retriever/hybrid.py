@@ -0,0 +1,221 @@
+"""混合检索器 - 向量检索与 BM25 词法检索的倒数排名融合"""
+from typing import List, Dict, Any, Optional, Sequence, TYPE_CHECKING
+import numpy as np
+from src.config import config
+from src.retriever.base import Retriever
+
+if TYPE_CHECKING:
+    from src.retriever.reranker import CrossEncoderReranker
+    from src.vector_store import VectorStore
+
+# RRF 平滑常数（原论文取 60）
+DEFAULT_RRF_K = 60
+# 每路召回数量相对 top_k 的倍数
+DEFAULT_FETCH_MULTIPLIER = 4
+
+
+def reciprocal_rank_fusion(
+    ranked_lists: Sequence[List[Dict[str, Any]]],
+    weights: Optional[Sequence[float]] = None,
+    k: int = DEFAULT_RRF_K,
+) -> List[Dict[str, Any]]:
+    """
+    倒数排名融合（Reciprocal Rank Fusion）
+
+    每个结果的得分为 sum(weight / (k + rank))，rank 从 1 开始。
+
+    Args:
+        ranked_lists: 多路检索结果，每路按相关度降序排列，结果需包含 id
+        weights: 每路的权重，默认均为 1
+        k: 平滑常数
+
+    Returns:
+        按融合得分降序排列的结果列表（score 为融合得分）
+    """
+    weights = weights or [1.0] * len(ranked_lists)
+    fused: Dict[str, Dict[str, Any]] = {}
+    scores: Dict[str, float] = {}
+
+    for results, weight in zip(ranked_lists, weights):
+        for rank, result in enumerate(results, 1):
+            doc_id = result["id"]
+            if doc_id not in fused:
+                fused[doc_id] = dict(result)
+                scores[doc_id] = 0.0
+            scores[doc_id] += weight / (k + rank)
+
+    ranked_ids = sorted(scores, key=scores.get, reverse=True)
+    return [{**fused[doc_id], "score": scores[doc_id]} for doc_id in ranked_ids]
+
+
+class HybridRetriever(Retriever):
+    """
+    混合检索器：向量检索 + BM25，结果按 RRF 融合
+
+    返回结果的 score 为 RRF 融合得分（设置重排器时为重排分数），retrieval_score 为与查询的余弦相似度：
+    向量检索召回的结果沿用其相似度，只由词法检索召回的结果读取 embedding 计算。
+    min_score 在融合后按 retrieval_score 过滤，两路召回的结果都要满足。
+    """
+
+    def __init__(
+        self,
+        top_k: Optional[int] = None,
+        filter_metadata: Optional[Dict[str, Any]] = None,
+        vector_store: Optional["VectorStore"] = None,
+        min_score: Optional[float] = None,
+        fetch_k: Optional[int] = None,
+        rrf_k: int = DEFAULT_RRF_K,
+        vector_weight: float = 1.0,
+        lexical_weight: float = 1.0,
+        reranker: Optional["CrossEncoderReranker"] = None,
+        rerank_candidates: Optional[int] = None,
+        neighbor_window: Optional[int] = None,
+        mmr: Optional[bool] = None,
+        mmr_lambda: Optional[float] = None,
+        mmr_candidates: Optional[int] = None,
+        max_per_source: Optional[int] = None,
+    ) -> None:
+        """
+        初始化混合检索器
+
+        Args:
+            top_k: 返回结果数量
+            filter_metadata: 元数据过滤条件
+            vector_store: 可选的向量存储实例
+            min_score: 融合结果的最低余弦相似度，默认使用配置值
+            fetch_k: 每路召回数量，默认 top_k 的 4 倍
+            rrf_k: RRF 平滑常数
+            vector_weight: 向量检索的权重
+            lexical_weight: 词法检索的权重
+            reranker: 可选的重排器，对融合后的候选重排
+            rerank_candidates: 重排的候选数量，默认使用配置值
+            neighbor_window: 命中块前后各扩展的相邻块数，默认使用配置值
+            mmr: 是否对融合后的候选做 MMR 多样化，默认使用配置值
+            mmr_lambda: MMR 的相关度权重，默认使用配置值
+            mmr_candidates: MMR 的候选数量，默认使用配置值
+            max_per_source: MMR 选择时每个来源最多的结果数，默认使用配置值
+        """
+        super().__init__(
+            top_k=top_k,
+            filter_metadata=filter_metadata,
+            vector_store=vector_store,
+            min_score=min_score,
+            reranker=reranker,
+            rerank_candidates=rerank_candidates,
+            neighbor_window=neighbor_window,
+            mmr=mmr,
+            mmr_lambda=mmr_lambda,
+            mmr_candidates=mmr_candidates,
+            max_per_source=max_per_source,
+        )
+        self.fetch_k = fetch_k
+        self.rrf_k = rrf_k
+        self.vector_weight = vector_weight
+        self.lexical_weight = lexical_weight
+
+    def _limits(self, top_k: Optional[int]) -> tuple:
+        """计算 (返回数量, 每路召回数量)"""
+        top_k = top_k or config.TOP_K_RETRIEVALS
+        return top_k, self.fetch_k or top_k * DEFAULT_FETCH_MULTIPLIER
+
+    def _fuse(
+        self,
+        queries: List[str],
+        dense_many: List[List[Dict[str, Any]]],
+        lexical_many: List[List[Dict[str, Any]]],
+        top_k: int,
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        融合两路结果，补上余弦相似度后按 min_score 过滤
+
+        只由词法检索召回的结果的 embedding 一次批量读取；读取不到 embedding 的结果无法判断相关度，
+        设置了 min_score 时丢弃。
+
+        Args:
+            queries: 查询文本列表
+            dense_many: 每个查询的向量检索结果
+            lexical_many: 每个查询的词法检索结果
+            top_k: 融合后返回的数量
+
+        Returns:
+            与查询一一对应的融合结果列表
+        """
+        fused_many = [
+            reciprocal_rank_fusion(
+                [[{**result, "retrieval_score": result.get("score", 0.0)} for result in dense], lexical],
+                weights=[self.vector_weight, self.lexical_weight],
+                k=self.rrf_k,
+            )
+            for dense, lexical in zip(dense_many, lexical_many)
+        ]
+
+        missing = list(dict.fromkeys(
+            result["id"] for fused in fused_many for result in fused if "retrieval_score" not in result
+        ))
+        found = self.vector_store.get_embeddings(missing) if missing else {}
+        # 查询向量在向量检索时已计算过，这里命中查询 embedding 缓存
+        query_embeddings = self.vector_store.embeddings.embed_queries(queries) if found else []
+        for query_embedding, fused in zip(query_embeddings, fused_many):
+            query_vector = np.asarray(query_embedding, dtype=np.float32)
+            query_vector /= np.linalg.norm(query_vector) or 1.0
+            for result in fused:
+                if "retrieval_score" not in result and result["id"] in found:
+                    vector = found[result["id"]]
+                    result["retrieval_score"] = float(vector @ query_vector / (np.linalg.norm(vector) or 1.0))
+
+        if self.min_score:
+            fused_many = [
+                [
+                    result for result in fused
+                    if result.get("retrieval_score") is not None and result["retrieval_score"] >= self.min_score
+                ]
+                for fused in fused_many
+            ]
+        return [fused[:top_k] for fused in fused_many]
+
+    def _search(self, query: str, top_k: Optional[int]) -> List[Dict[str, Any]]:
+        """
+        混合召回
+
+        Args:
+            query: 查询文本
+            top_k: 融合后返回的数量
+
+        Returns:
+            检索结果列表
+        """
+        top_k, fetch_k = self._limits(top_k)
+        dense = self.vector_store.search(
+            query=query,
+            top_k=fetch_k,
+            filter=self.filter_metadata,
+            min_score=self.min_score,
+            **self._search_options(),
+        )
+        lexical = self.vector_store.lexical_search(query=query, top_k=fetch_k, filter=self.filter_metadata)
+        return self._fuse([query], [dense], [lexical], top_k)[0]
+
+    def _search_many(self, queries: List[str], top_k: Optional[int]) -> List[List[Dict[str, Any]]]:
+        """
+        批量混合召回（向量检索部分一次批量完成）
+
+        Args:
+            queries: 查询文本列表
+            top_k: 融合后返回的数量
+
+        Returns:
+            与 queries 一一对应的检索结果列表
+        """
+        top_k, fetch_k = self._limits(top_k)
+        dense_many = self.vector_store.search_many(
+            queries=queries,
+            top_k=fetch_k,
+            filter=self.filter_metadata,
+            min_score=self.min_score,
+            **self._search_options(),
+        )
+        lexical_many = [
+            self.vector_store.lexical_search(query=query, top_k=fetch_k, filter=self.filter_metadata)
+            for query in queries
+        ]
+        return self._fuse(queries, dense_many, lexical_many, top_k)
@@ -0,0 +1,73 @@
+"""最大边际相关（MMR）- 在相关度和多样性之间权衡，避免返回近似重复的块"""
+from typing import List, Optional, Sequence
+import numpy as np
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """按行 L2 归一化（零向量保持为零）"""
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
+
+
+def mmr_select(
+    query_embedding: Sequence[float],
+    embeddings: Sequence[Sequence[float]],
+    k: int,
+    lambda_mult: float = 0.5,
+    relevance: Optional[Sequence[float]] = None,
+    sources: Optional[Sequence[str]] = None,
+    max_per_source: int = 0,
+) -> List[int]:
+    """
+    按 MMR 贪心选择候选
+
+    每一步选择 lambda_mult * 相关度 - (1 - lambda_mult) * 与已选候选的最大相似度 最高的候选。
+    候选间的余弦相似度矩阵一次算出，每步只更新各候选与已选集合的最大相似度。
+
+    Args:
+        query_embedding: 查询向量
+        embeddings: 候选向量（n × d）
+        k: 选择数量
+        lambda_mult: 相关度权重，1 表示只看相关度，0 表示只看多样性
+        relevance: 候选的相关度分数，默认使用与查询的余弦相似度
+        sources: 候选的来源，与 max_per_source 一起使用
+        max_per_source: 每个来源最多选择的候选数，0 表示不限制
+
+    Returns:
+        选中候选的下标，按选择顺序排列
+    """
+    vectors = _normalize(np.asarray(embeddings, dtype=np.float32))
+    if vectors.ndim != 2 or len(vectors) == 0 or k <= 0:
+        return []
+
+    if relevance is None:
+        relevance = vectors @ _normalize(np.asarray(query_embedding, dtype=np.float32))
+    else:
+        relevance = np.asarray(relevance, dtype=np.float32)
+    similarity = vectors @ vectors.T
+
+    available = np.ones(len(vectors), dtype=bool)
+    max_similarity = np.zeros(len(vectors), dtype=np.float32)
+    source_array = np.asarray(sources, dtype=object) if sources is not None and max_per_source > 0 else None
+    counts = {}
+    selected: List[int] = []
+
+    while len(selected) < k and available.any():
+        if selected:
+            scores = lambda_mult * relevance - (1.0 - lambda_mult) * max_similarity
+        else:
+            scores = relevance.copy()
+        scores[~available] = -np.inf
+        index = int(np.argmax(scores))
+
+        selected.append(index)
+        available[index] = False
+        max_similarity = np.maximum(max_similarity, similarity[index]) if len(selected) > 1 else similarity[index]
+
+        if source_array is not None:
+            source = source_array[index]
+            counts[source] = counts.get(source, 0) + 1
+            if counts[source] >= max_per_source:
+                available &= source_array != source
+
+    return selected
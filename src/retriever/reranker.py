@@ -0,0 +1,136 @@
+"""交叉编码器重排 - 对多召回的候选重新打分，取更精确的 top_k"""
+import time
+from typing import Any, Dict, List, Optional
+from src.cache.lru import LRUCache
+from src.config import config
+
+
+class CrossEncoderReranker:
+    """
+    交叉编码器重排器
+
+    - (问题, chunk ID) 的分数缓存在进程内 LRU 中，重复问题只给新候选打分
+    - 未命中缓存的候选按批次打分；预计超出耗时预算时放弃重排，退回原顺序
+    - 重排后的 score 为交叉编码器分数（Sigmoid 后位于 0~1），原分数保存在 retrieval_score
+      （候选已带有 retrieval_score 时保留，如混合检索的余弦相似度）
+    """
+
+    def __init__(
+        self,
+        model_name: Optional[str] = None,
+        device: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        max_length: Optional[int] = None,
+        cache_size: Optional[int] = None,
+        latency_budget: Optional[float] = None,
+        model=None,
+    ):
+        """
+        初始化重排器
+
+        Args:
+            model_name: 交叉编码器模型名称
+            device: 设备 (cpu/cuda)
+            batch_size: 每批打分的候选数
+            max_length: 问题 + 文档块的最大 token 数
+            cache_size: 分数缓存大小
+            latency_budget: 单次重排的耗时预算（秒），0 表示不限制
+            model: 可选的模型实例（需要支持 predict）
+        """
+        self.model_name = model_name or config.RERANK_MODEL
+        self.device = device or config.EMBEDDING_DEVICE
+        self.batch_size = batch_size or config.RERANK_BATCH_SIZE
+        self.max_length = max_length or config.RERANK_MAX_LENGTH
+        self.cache = LRUCache(config.RERANK_CACHE_SIZE if cache_size is None else cache_size)
+        self.latency_budget = config.RERANK_LATENCY_BUDGET if latency_budget is None else latency_budget
+        self.fallbacks = 0
+        self._model = model
+
+    @property
+    def model(self):
+        """延迟加载模型"""
+        if self._model is None:
+            from sentence_transformers import CrossEncoder
+
+            print(f"Loading rerank model: {self.model_name}")
+            self._model = CrossEncoder(self.model_name, device=self.device, max_length=self.max_length)
+        return self._model
+
+    @staticmethod
+    def _cache_key(query: str, result: Dict[str, Any]) -> tuple:
+        """分数缓存键，没有 ID 的结果按内容区分"""
+        return query, result.get("id") or result["content"]
+
+    def rerank(self, query: str, results: List[Dict[str, Any]], top_k: int) -> List[Dict[str, Any]]:
+        """
+        重排检索结果
+
+        Args:
+            query: 查询文本
+            results: 按原相关度降序排列的候选
+            top_k: 返回结果数量
+
+        Returns:
+            按交叉编码器分数降序排列的前 top_k 个结果；超出耗时预算时为原顺序的前 top_k 个
+        """
+        if len(results) <= 1:
+            return results[:top_k]
+
+        keys = [self._cache_key(query, result) for result in results]
+        scores = [self.cache.get(key) for key in keys]
+        missing = [i for i, score in enumerate(scores) if score is None]
+
+        if missing:
+            model = self.model  # 模型加载不计入耗时预算
+            start = time.perf_counter()
+            for batch_num, offset in enumerate(range(0, len(missing), self.batch_size)):
+                if batch_num and self.latency_budget:
+                    elapsed = time.perf_counter() - start
+                    # 按已完成批次的平均耗时估计下一批，预计超出预算时放弃
+                    if elapsed + elapsed / batch_num > self.latency_budget:
+                        self.fallbacks += 1
+                        return results[:top_k]
+
+                batch = missing[offset:offset + self.batch_size]
+                batch_scores = model.predict(
+                    [(query, results[i]["content"]) for i in batch],
+                    batch_size=self.batch_size,
+                    show_progress_bar=False,
+                )
+                for i, score in zip(batch, batch_scores):
+                    scores[i] = float(score)
+                    self.cache.put(keys[i], scores[i])
+
+        # 分数相同时保持原顺序
+        order = sorted(range(len(results)), key=lambda i: -scores[i])[:top_k]
+        return [
+            {**results[i], "score": scores[i], "retrieval_score": results[i].get("retrieval_score", results[i].get("score", 0.0))}
+            for i in order
+        ]
+
+    def stats(self) -> Dict[str, float]:
+        """
+        获取重排统计信息
+
+        Returns:
+            分数缓存命中数、未命中数、命中率和退回次数
+        """
+        total = self.cache.hits + self.cache.misses
+        return {
+            "hits": self.cache.hits,
+            "misses": self.cache.misses,
+            "hit_rate": self.cache.hits / total if total else 0.0,
+            "fallbacks": self.fallbacks,
+        }
+
+
+# 全局单例
+_reranker_instance = None
+
+
+def get_reranker() -> CrossEncoderReranker:
+    """获取全局 CrossEncoderReranker 实例"""
+    global _reranker_instance
+    if _reranker_instance is None:
+        _reranker_instance = CrossEncoderReranker()
+    return _reranker_instance
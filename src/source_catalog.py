@@ -0,0 +1,206 @@
+"""来源目录模块 - 按来源维护块数、字节数等统计，列出来源时无需扫描整个集合"""
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from src.config import config
+
+
+@dataclass
+class SourceInfo:
+    """来源统计信息"""
+    source: str
+    chunk_count: int
+    byte_size: int
+    ingested_at: float
+    model: str
+
+
+def chunk_byte_size(text: Optional[str]) -> int:
+    """块文本的 UTF-8 字节数"""
+    return len((text or "").encode("utf-8"))
+
+
+def summarize_chunks(sources: Iterable[str], texts: Iterable[str]) -> Dict[str, Tuple[int, int]]:
+    """
+    按来源汇总块数和字节数
+
+    Args:
+        sources: 每个块的来源
+        texts: 每个块的文本
+
+    Returns:
+        来源到 (块数, UTF-8 字节数) 的映射
+    """
+    return summarize_sizes(sources, (chunk_byte_size(text) for text in texts))
+
+
+def summarize_sizes(sources: Iterable[str], sizes: Iterable[int]) -> Dict[str, Tuple[int, int]]:
+    """
+    按来源汇总块数和已知的块字节数
+
+    Args:
+        sources: 每个块的来源
+        sizes: 每个块的 UTF-8 字节数
+
+    Returns:
+        来源到 (块数, UTF-8 字节数) 的映射
+    """
+    totals: Dict[str, List[int]] = defaultdict(lambda: [0, 0])
+    for source, size in zip(sources, sizes):
+        totals[source][0] += 1
+        totals[source][1] += size
+    return {source: (count, size) for source, (count, size) in totals.items()}
+
+
+class SourceCatalog:
+    """
+    来源目录（SQLite 持久化）
+
+    由 VectorStore 在写入和删除块时同步更新，每次更新在一个事务内完成。
+    列出来源的开销与来源数量成正比，而不是与块数量成正比。
+    """
+
+    def __init__(self, path: Optional[str] = None, collection_name: Optional[str] = None):
+        """
+        初始化来源目录
+
+        Args:
+            path: 目录数据库路径，默认按集合名存放在 data/index 下
+            collection_name: 集合名称
+        """
+        collection_name = collection_name or config.CHROMA_COLLECTION_NAME
+        self.path = str(path or config.INDEX_DIR / f"{collection_name}_sources.sqlite3")
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """获取数据库连接（延迟创建）"""
+        if self._conn is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS sources (
+                    source TEXT PRIMARY KEY,
+                    chunk_count INTEGER NOT NULL,
+                    byte_size INTEGER NOT NULL,
+                    ingested_at REAL NOT NULL,
+                    model TEXT NOT NULL
+                );
+                """
+            )
+        return self._conn
+
+    def add_chunks(self, totals: Dict[str, Tuple[int, int]], model: str) -> None:
+        """
+        记录新写入的块
+
+        Args:
+            totals: 来源到 (新增块数, 新增字节数) 的映射
+            model: embedding 模型名称
+        """
+        if not totals:
+            return
+
+        now = time.time()
+        with self._lock, self.conn:
+            self.conn.executemany(
+                """
+                INSERT INTO sources (source, chunk_count, byte_size, ingested_at, model)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (source) DO UPDATE SET
+                    chunk_count = chunk_count + excluded.chunk_count,
+                    byte_size = byte_size + excluded.byte_size,
+                    ingested_at = excluded.ingested_at,
+                    model = excluded.model
+                """,
+                [(source, count, size, now, model) for source, (count, size) in totals.items()],
+            )
+
+    def remove_chunks(self, totals: Dict[str, Tuple[int, int]]) -> None:
+        """
+        记录被删除的块，块数归零的来源从目录中移除
+
+        Args:
+            totals: 来源到 (删除块数, 删除字节数) 的映射
+        """
+        if not totals:
+            return
+
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "UPDATE sources SET chunk_count = chunk_count - ?, byte_size = byte_size - ? WHERE source = ?",
+                [(count, size, source) for source, (count, size) in totals.items()],
+            )
+            self.conn.execute("DELETE FROM sources WHERE chunk_count <= 0")
+
+    def remove(self, source: str) -> None:
+        """
+        删除来源
+
+        Args:
+            source: 文档来源
+        """
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM sources WHERE source = ?", (source,))
+
+    def replace(self, totals: Dict[str, Tuple[int, int]], model: str) -> None:
+        """
+        用完整统计替换整个目录（重建时使用）
+
+        Args:
+            totals: 来源到 (块数, 字节数) 的映射
+            model: embedding 模型名称
+        """
+        now = time.time()
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM sources")
+            self.conn.executemany(
+                "INSERT INTO sources (source, chunk_count, byte_size, ingested_at, model) VALUES (?, ?, ?, ?, ?)",
+                [(source, count, size, now, model) for source, (count, size) in totals.items()],
+            )
+
+    def clear(self) -> None:
+        """清空目录"""
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM sources")
+
+    def get(self, source: str) -> Optional[SourceInfo]:
+        """
+        获取来源的统计信息
+
+        Args:
+            source: 文档来源
+
+        Returns:
+            来源统计信息，不存在时返回 None
+        """
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT source, chunk_count, byte_size, ingested_at, model FROM sources WHERE source = ?",
+                (source,),
+            ).fetchone()
+        return SourceInfo(*row) if row else None
+
+    def list(self) -> List[SourceInfo]:
+        """
+        列出所有来源
+
+        Returns:
+            按来源排序的统计信息列表
+        """
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT source, chunk_count, byte_size, ingested_at, model FROM sources ORDER BY source"
+            ).fetchall()
+        return [SourceInfo(*row) for row in rows]
+
+    def is_empty(self) -> bool:
+        """目录是否为空"""
+        with self._lock:
+            return self.conn.execute("SELECT 1 FROM sources LIMIT 1").fetchone() is None
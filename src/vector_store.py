@@ -1,9 +1,31 @@
 """向量存储模块"""
-from typing import List, Dict, Any, Optional
+import copy
+import json
+import sys
+from itertools import islice
+from typing import Iterable, Iterator, List, Dict, Any, Optional, Tuple
+import numpy as np
 from chromadb import PersistentClient, Collection
+from src.cache.lru import LRUCache
+from src.chunking.chapter_splitter import document_key
 from src.config import config
 from src.embeddings import get_embeddings
+from src.lexical_index import LexicalIndex, sources_from_filter
 from src.loaders.base import Document
+from src.manifest import FileFingerprint, IngestManifest, hash_chunk, make_chunk_ids, with_chunk_ids
+from src.quantized_index import QuantizedIndex
+from src.source_catalog import SourceCatalog, SourceInfo, chunk_byte_size, summarize_chunks, summarize_sizes
+
+# 过滤条件无法下推到词法索引、量化索引时的过量召回倍数
+FILTER_OVERFETCH = 5
+# 重建词法索引、来源目录时每页读取的块数
+REBUILD_PAGE_SIZE = 1000
+# 按条件删除时每页读取的 ID 数
+DELETE_PAGE_SIZE = 1000
+# 批量删除来源时单个 $in 条件包含的来源数
+DELETE_SOURCES_BATCH = 100
+# 块元数据中记录文本 UTF-8 字节数的字段（删除块时更新来源目录无需读取文本）
+BYTE_SIZE_FIELD = "byte_size"
 
 
 class VectorStore:
@@ -19,7 +41,18 @@ class VectorStore:
         self.collection_name = collection_name or config.CHROMA_COLLECTION_NAME
         self._client: Optional[PersistentClient] = None
         self._collection: Optional[Collection] = None
+        self._manifest: Optional[IngestManifest] = None
+        self._lexical_index: Optional[LexicalIndex] = None
+        self._quantized_index: Optional[QuantizedIndex] = None
+        # 是否已核对过量化索引与集合的块数
+        self._quantized_checked = False
+        self._source_catalog: Optional[SourceCatalog] = None
+        self._max_batch_size: Optional[int] = None
         self._embeddings = get_embeddings()
+        # 检索结果缓存和相邻块窗口缓存，集合内容变化时整体失效
+        # 其他进程写入集合时不会清空本进程的缓存，条目按 TTL 过期
+        self._result_cache = LRUCache(config.SEARCH_RESULT_CACHE_SIZE, ttl=config.SEARCH_RESULT_CACHE_TTL)
+        self._window_cache = LRUCache(config.NEIGHBOR_CACHE_SIZE, ttl=config.SEARCH_RESULT_CACHE_TTL)
 
     @property
     def client(self) -> PersistentClient:
@@ -43,44 +76,138 @@ class VectorStore:
                 )
         return self._collection
 
-    def add_documents(self, documents: List[Document], chunk_ids: List[str] = None):
+    @property
+    def embeddings(self):
+        """获取 embedding 实例"""
+        return self._embeddings
+
+    @property
+    def manifest(self) -> IngestManifest:
+        """获取摄入清单"""
+        if self._manifest is None:
+            self._manifest = IngestManifest(collection_name=self.collection_name)
+        return self._manifest
+
+    @property
+    def source_catalog(self) -> SourceCatalog:
+        """获取来源目录"""
+        if self._source_catalog is None:
+            self._source_catalog = SourceCatalog(collection_name=self.collection_name)
+        return self._source_catalog
+
+    @property
+    def lexical_index(self) -> Optional[LexicalIndex]:
+        """获取 BM25 词法索引（未启用时返回 None）"""
+        if self._lexical_index is None and config.LEXICAL_INDEX_ENABLED:
+            self._lexical_index = LexicalIndex(collection_name=self.collection_name)
+        return self._lexical_index
+
+    @property
+    def quantized_index(self) -> Optional[QuantizedIndex]:
+        """获取量化向量索引（未启用时返回 None，检索走 Chroma 的 HNSW 索引）"""
+        if self._quantized_index is None and config.QUANTIZED_INDEX_ENABLED:
+            self._quantized_index = QuantizedIndex(collection_name=self.collection_name)
+        return self._quantized_index
+
+    @property
+    def max_batch_size(self) -> int:
+        """单次写入的块数上限（配置值与 Chroma 最大批大小中的较小者）"""
+        if self._max_batch_size is None:
+            self._max_batch_size = max(1, min(config.CHROMA_ADD_BATCH_SIZE, self.client.get_max_batch_size()))
+        return self._max_batch_size
+
+    def add_documents(
+        self,
+        documents: Iterable[Document],
+        chunk_ids: Iterable[str] = None,
+        batch_size: int = None,
+    ) -> int:
         """
         添加文档到向量存储
 
+        按窗口流式处理：每个窗口单独 embedding 并写入，内存占用与窗口大小成正比，
+        可以直接传入生成器。写入使用 upsert，相同 ID 的块会被覆盖。
+
         Args:
-            documents: 文档列表
-            chunk_ids: 可选的 chunk ID 列表
+            documents: 文档列表或迭代器
+            chunk_ids: 可选的 chunk ID 列表或迭代器，与 documents 一一对应，
+                默认按来源和内容生成（见 make_chunk_ids）
+            batch_size: 每个窗口的块数，默认使用 max_batch_size
+
+        Returns:
+            写入的块数
         """
-        if not documents:
-            return
+        batch_size = min(batch_size or self.max_batch_size, self.max_batch_size)
 
+        # 生成 IDs
+        if chunk_ids is None:
+            pairs = with_chunk_ids(documents)
+        else:
+            pairs = zip(documents, chunk_ids)
+
+        added = 0
+        try:
+            while True:
+                window = list(islice(pairs, batch_size))
+                if not window:
+                    break
+                self._add_window([doc for doc, _ in window], [chunk_id for _, chunk_id in window])
+                added += len(window)
+        finally:
+            if added:
+                self._clear_caches()
+
+        return added
+
+    def _add_window(self, documents: List[Document], chunk_ids: List[str]):
+        """
+        embedding 并写入一个窗口的文档块
+
+        Args:
+            documents: 文档列表
+            chunk_ids: chunk ID 列表
+        """
         # 提取文本和元数据
         texts = [doc.content for doc in documents]
-        metadatas = [
-            {**doc.metadata, "source": doc.source}
-            for doc in documents
-        ]
+        sources = [doc.source for doc in documents]
+        metadatas = [self._chunk_metadata(doc) for doc in documents]
 
-        # 生成 embeddings
-        embeddings = self._embeddings.embed_documents(texts)
+        # 生成 embeddings（保持 NumPy 数组，Chroma 直接接受）
+        embeddings = self._embeddings.embed_documents_array(texts)
 
-        # 生成 IDs
-        if chunk_ids is None:
-            chunk_ids = [f"{doc.source}_{i}" for i, doc in enumerate(documents)]
+        # 已存在的 ID 内容相同（ID 由内容生成），覆盖写入时不重复计入来源目录
+        existing_ids = set(self.collection.get(ids=chunk_ids, include=[])["ids"])
 
-        # 添加到集合
-        self.collection.add(
+        # 写入集合（覆盖同 ID 的块）
+        self.collection.upsert(
             embeddings=embeddings,
             documents=texts,
             metadatas=metadatas,
             ids=chunk_ids,
         )
+        if self.lexical_index is not None:
+            self.lexical_index.add(chunk_ids, texts, sources)
+        if self.quantized_index is not None:
+            self.quantized_index.add(chunk_ids, embeddings, sources)
+
+        new = [i for i, chunk_id in enumerate(chunk_ids) if chunk_id not in existing_ids]
+        self.source_catalog.add_chunks(
+            summarize_chunks([sources[i] for i in new], [texts[i] for i in new]),
+            self._embeddings.model_name,
+        )
+
+    @staticmethod
+    def _chunk_metadata(doc: Document) -> Dict[str, Any]:
+        """写入集合的块元数据（附带来源和文本字节数）"""
+        return {**doc.metadata, "source": doc.source, BYTE_SIZE_FIELD: chunk_byte_size(doc.content)}
 
     def search(
         self,
         query: str,
         top_k: int = None,
         filter: Dict[str, Any] = None,
+        min_score: float = None,
+        include_embeddings: bool = False,
     ) -> List[Dict[str, Any]]:
         """
         搜索相似文档
@@ -89,35 +216,432 @@ class VectorStore:
             query: 查询文本
             top_k: 返回结果数量
             filter: 元数据过滤条件
+            min_score: 最低相似度，低于该值的结果被丢弃
+            include_embeddings: 是否同时返回块的 embedding（结果中的 embedding 字段）
 
         Returns:
-            搜索结果列表
+            搜索结果列表（score 为余弦相似度）
         """
         top_k = top_k or config.TOP_K_RETRIEVALS
 
+        # 相同查询直接返回缓存结果，跳过推理和 HNSW 检索
+        cache_key = (query, top_k, self._filter_key(filter), include_embeddings)
+        cached = self._result_cache.get(cache_key)
+        if cached is not None:
+            return self._apply_min_score(copy.deepcopy(cached), min_score)
+
         # 生成查询 embedding
         query_embedding = self._embeddings.embed_query(query)
 
         # 搜索
-        results = self.collection.query(
-            query_embeddings=[query_embedding],
-            n_results=top_k,
-            where=filter,
+        if self.quantized_index is not None:
+            formatted_results = self._quantized_query([query_embedding], top_k, filter, include_embeddings)[0]
+        else:
+            results = self.collection.query(
+                query_embeddings=[query_embedding],
+                n_results=top_k,
+                where=filter,
+                include=self._query_include(include_embeddings),
+            )
+
+            # 格式化结果
+            formatted_results = self._format_results(results, 0)
+
+        self._result_cache.put(cache_key, copy.deepcopy(formatted_results))
+        return self._apply_min_score(formatted_results, min_score)
+
+    def search_many(
+        self,
+        queries: List[str],
+        top_k: int = None,
+        filter: Dict[str, Any] = None,
+        min_score: float = None,
+        include_embeddings: bool = False,
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        批量搜索相似文档
+
+        所有未命中缓存的查询在一次 encode 调用中生成 embedding，并通过一次 Chroma 查询完成检索。
+
+        Args:
+            queries: 查询文本列表
+            top_k: 每个查询返回的结果数量
+            filter: 元数据过滤条件（对所有查询生效）
+            min_score: 最低相似度，低于该值的结果被丢弃
+            include_embeddings: 是否同时返回块的 embedding
+
+        Returns:
+            与 queries 一一对应的搜索结果列表
+        """
+        top_k = top_k or config.TOP_K_RETRIEVALS
+        filter_key = self._filter_key(filter)
+
+        results_by_query: Dict[str, List[Dict[str, Any]]] = {}
+        for query in queries:
+            cached = self._result_cache.get((query, top_k, filter_key, include_embeddings))
+            if cached is not None:
+                results_by_query[query] = cached
+
+        missing = list(dict.fromkeys(q for q in queries if q not in results_by_query))
+        if missing:
+            query_embeddings = self._embeddings.embed_queries(missing)
+            if self.quantized_index is not None:
+                formatted_many = self._quantized_query(query_embeddings, top_k, filter, include_embeddings)
+            else:
+                results = self.collection.query(
+                    query_embeddings=query_embeddings,
+                    n_results=top_k,
+                    where=filter,
+                    include=self._query_include(include_embeddings),
+                )
+                formatted_many = [self._format_results(results, i) for i in range(len(missing))]
+            for query, formatted_results in zip(missing, formatted_many):
+                self._result_cache.put((query, top_k, filter_key, include_embeddings), formatted_results)
+                results_by_query[query] = formatted_results
+
+        return [
+            self._apply_min_score(copy.deepcopy(results_by_query[query]), min_score)
+            for query in queries
+        ]
+
+    def lexical_search(
+        self,
+        query: str,
+        top_k: int = None,
+        filter: Dict[str, Any] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        BM25 词法检索
+
+        Args:
+            query: 查询文本
+            top_k: 返回结果数量
+            filter: 元数据过滤条件（来源条件下推到索引，其余条件由 Chroma 过滤）
+
+        Returns:
+            搜索结果列表（score 为 BM25 分数）
+        """
+        index = self.lexical_index
+        if index is None:
+            return []
+
+        top_k = top_k or config.TOP_K_RETRIEVALS
+
+        # 启用词法索引前摄入的数据需要先建立索引
+        if index.is_empty() and self.collection.count() > 0:
+            self.rebuild_lexical_index()
+
+        sources, pushed_down = sources_from_filter(filter)
+        fetch_k = top_k if pushed_down else top_k * FILTER_OVERFETCH
+        hits = index.search(query, fetch_k, sources)
+        if not hits:
+            return []
+
+        results = self.collection.get(
+            ids=[chunk_id for chunk_id, _ in hits],
+            where=None if pushed_down else filter,
+            include=["documents", "metadatas"],
         )
+        found = {
+            chunk_id: (document, metadata)
+            for chunk_id, document, metadata in zip(results["ids"], results["documents"], results["metadatas"])
+        }
 
-        # 格式化结果
         formatted_results = []
-        if results["ids"] and results["ids"][0]:
-            for i, doc_id in enumerate(results["ids"][0]):
-                formatted_results.append({
-                    "id": doc_id,
-                    "content": results["documents"][0][i],
-                    "metadata": results["metadatas"][0][i],
-                    "score": 0.0,  # Chroma 暂不返回分数
+        for chunk_id, score in hits:
+            if chunk_id not in found:
+                continue
+            document, metadata = found[chunk_id]
+            formatted_results.append({
+                "id": chunk_id,
+                "content": document,
+                "metadata": metadata,
+                "score": score,
+            })
+
+        return formatted_results[:top_k]
+
+    def _quantized_query(
+        self,
+        query_embeddings: List[List[float]],
+        top_k: int,
+        filter: Optional[Dict[str, Any]],
+        include_embeddings: bool,
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        用量化索引检索（粗排 + 全精度精排），结果格式与 Chroma 查询相同
+
+        Args:
+            query_embeddings: 查询向量列表
+            top_k: 每个查询返回的结果数量
+            filter: 元数据过滤条件（来源条件下推到索引，其余条件由 Chroma 过滤）
+            include_embeddings: 是否同时返回块的 embedding
+
+        Returns:
+            与 query_embeddings 一一对应的搜索结果列表
+        """
+        index = self.quantized_index
+
+        # 启用量化索引前摄入的数据需要先建立索引
+        if index.is_empty() and self.collection.count() > 0:
+            self.rebuild_quantized_index()
+        elif not self._quantized_checked:
+            self._check_quantized_index()
+
+        sources, pushed_down = sources_from_filter(filter)
+        fetch_k = top_k if pushed_down else top_k * FILTER_OVERFETCH
+        hits_many = [index.search(embedding, fetch_k, sources) for embedding in query_embeddings]
+
+        ids = list(dict.fromkeys(chunk_id for hits in hits_many for chunk_id, _ in hits))
+        if not ids:
+            return [[] for _ in query_embeddings]
+
+        results = self.collection.get(
+            ids=ids,
+            where=None if pushed_down else filter,
+            include=["documents", "metadatas"],
+        )
+        found = {
+            chunk_id: (document, metadata)
+            for chunk_id, document, metadata in zip(results["ids"], results["documents"], results["metadatas"])
+        }
+        vectors = index.get_vectors(list(found)) if include_embeddings else {}
+
+        formatted_many = []
+        for hits in hits_many:
+            formatted_results = []
+            for chunk_id, score in hits:
+                if chunk_id not in found:
+                    continue
+                document, metadata = found[chunk_id]
+                formatted_result = {
+                    "id": chunk_id,
+                    "content": document,
+                    "metadata": metadata,
+                    "score": score,
+                }
+                if include_embeddings:
+                    formatted_result["embedding"] = vectors[chunk_id]
+                formatted_results.append(formatted_result)
+            formatted_many.append(formatted_results[:top_k])
+        return formatted_many
+
+    def _check_quantized_index(self):
+        """
+        首次检索时核对一次量化索引与集合的块数（如关闭量化索引期间摄入过数据）
+
+        不一致时只提示，不在检索路径上重建：其他进程摄入期间块数本来就会暂时不一致，
+        需要时用 scripts/ingest.py --rebuild-quantized-index 显式重建。
+        """
+        self._quantized_checked = True
+        indexed, total = len(self.quantized_index), self.collection.count()
+        if indexed != total:
+            print(
+                f"⚠️  量化索引有 {indexed} 个块，集合有 {total} 个块；"
+                f"运行 python scripts/ingest.py --rebuild-quantized-index 重建",
+                file=sys.stderr,
+            )
+
+    def rebuild_quantized_index(self):
+        """按集合中的现有数据重建量化索引（同时回收已删除块占用的行）"""
+        index = self.quantized_index
+        if index is None:
+            return
+
+        index.clear()
+        for page in self._iter_pages(include=["embeddings", "metadatas"]):
+            index.add(
+                page["ids"],
+                np.asarray(page["embeddings"], dtype=np.float32),
+                [metadata.get("source", "") for metadata in page["metadatas"]],
+            )
+        self._quantized_checked = True
+        self._clear_caches()
+
+    def rebuild_lexical_index(self):
+        """按集合中的现有数据重建词法索引"""
+        index = self.lexical_index
+        if index is None:
+            return
+
+        index.clear()
+        for page in self._iter_pages(include=["documents", "metadatas"]):
+            index.add(
+                page["ids"],
+                page["documents"],
+                [metadata.get("source", "") for metadata in page["metadatas"]],
+            )
+
+    def rebuild_source_catalog(self):
+        """按集合中的现有数据重建来源目录（只读取元数据，没有记录字节数的旧块才读取文本）"""
+        totals: Dict[str, List[int]] = {}
+        for page in self._iter_pages(include=["metadatas"]):
+            page_totals = summarize_sizes(
+                [metadata.get("source", "") for metadata in page["metadatas"]],
+                self._chunk_sizes(page["ids"], page["metadatas"]),
+            )
+            for source, (count, size) in page_totals.items():
+                total = totals.setdefault(source, [0, 0])
+                total[0] += count
+                total[1] += size
+
+        self.source_catalog.replace(
+            {source: (count, size) for source, (count, size) in totals.items()},
+            self._embeddings.model_name,
+        )
+
+    def get_embeddings(self, ids: List[str]) -> Dict[str, np.ndarray]:
+        """
+        批量读取块的 embedding（一次 collection.get）
+
+        Args:
+            ids: chunk ID 列表
+
+        Returns:
+            chunk ID -> embedding，不存在的 ID 不在结果中
+        """
+        if not ids:
+            return {}
+        found = self.collection.get(ids=list(dict.fromkeys(ids)), include=["embeddings"])
+        return {
+            chunk_id: np.asarray(embedding, dtype=np.float32)
+            for chunk_id, embedding in zip(found["ids"], found["embeddings"])
+        }
+
+    def get_windows(self, results: List[Dict[str, Any]], window: int) -> List[List[Dict[str, Any]]]:
+        """
+        获取检索结果前后相邻的块
+
+        chunk ID 由内容生成，无法从命中块推算相邻块的 ID；
+        未命中缓存的窗口按所属文档（见 document_key）和 chunk_index 合并成一次 collection.get 查询。
+
+        Args:
+            results: 检索结果（metadata 中需要有 chunk_index）
+            window: 每侧的相邻块数
+
+        Returns:
+            与 results 一一对应的窗口，按 chunk_index 排序并包含命中块本身；
+            没有 chunk_index 的结果窗口只包含自身
+        """
+        windows: List[Optional[List[Dict[str, Any]]]] = [None] * len(results)
+        missing: Dict[tuple, List[int]] = {}
+
+        for i, result in enumerate(results):
+            metadata = result.get("metadata") or {}
+            chunk_index = metadata.get("chunk_index")
+            if chunk_index is None or window <= 0:
+                windows[i] = [result]
+                continue
+
+            first = max(chunk_index - window, 0)
+            last = chunk_index + window
+            if metadata.get("total_chunks"):
+                last = min(last, metadata["total_chunks"] - 1)
+
+            key = (document_key(metadata), first, last)
+            cached = self._window_cache.get(key)
+            if cached is not None:
+                windows[i] = copy.deepcopy(cached)
+            else:
+                missing.setdefault(key, []).append(i)
+
+        if missing:
+            clauses = []
+            for (doc_key, first, last) in missing:
+                conditions = [{name: value} for name, value in doc_key if value is not None]
+                conditions.append({"chunk_index": {"$in": list(range(first, last + 1))}})
+                clauses.append(conditions[0] if len(conditions) == 1 else {"$and": conditions})
+
+            found = self.collection.get(
+                where=clauses[0] if len(clauses) == 1 else {"$or": clauses},
+                include=["documents", "metadatas"],
+            )
+            chunks_by_document: Dict[tuple, List[Dict[str, Any]]] = {}
+            for chunk_id, document, metadata in zip(found["ids"], found["documents"], found["metadatas"]):
+                chunks_by_document.setdefault(document_key(metadata), []).append({
+                    "id": chunk_id,
+                    "content": document,
+                    "metadata": metadata,
                 })
 
+            for key, indices in missing.items():
+                doc_key, first, last = key
+                chunks = sorted(
+                    (
+                        chunk for chunk in chunks_by_document.get(doc_key, [])
+                        if first <= chunk["metadata"]["chunk_index"] <= last
+                    ),
+                    key=lambda chunk: chunk["metadata"]["chunk_index"],
+                )
+                self._window_cache.put(key, copy.deepcopy(chunks))
+                for i in indices:
+                    windows[i] = copy.deepcopy(chunks) or [results[i]]
+
+        return windows
+
+    def _clear_caches(self):
+        """集合内容变化后清空检索结果缓存和窗口缓存"""
+        self._result_cache.clear()
+        self._window_cache.clear()
+
+    def _iter_pages(self, include: List[str]) -> Iterator[Dict[str, Any]]:
+        """分页遍历集合中的全部块"""
+        offset = 0
+        while True:
+            page = self.collection.get(limit=REBUILD_PAGE_SIZE, offset=offset, include=include)
+            if not page["ids"]:
+                return
+            yield page
+            offset += len(page["ids"])
+
+    @staticmethod
+    def _format_results(results: Dict[str, Any], index: int) -> List[Dict[str, Any]]:
+        """
+        格式化 Chroma 查询结果中第 index 个查询的结果
+
+        Args:
+            results: collection.query 的返回值
+            index: 查询下标
+
+        Returns:
+            搜索结果列表
+        """
+        formatted_results = []
+        if results["ids"] and results["ids"][index]:
+            distances = results.get("distances")
+            embeddings = results.get("embeddings")
+            for i, doc_id in enumerate(results["ids"][index]):
+                # 集合使用余弦距离，相似度 = 1 - 距离
+                score = 1.0 - distances[index][i] if distances else 0.0
+                formatted_result = {
+                    "id": doc_id,
+                    "content": results["documents"][index][i],
+                    "metadata": results["metadatas"][index][i],
+                    "score": score,
+                }
+                if embeddings is not None:
+                    formatted_result["embedding"] = np.asarray(embeddings[index][i], dtype=np.float32)
+                formatted_results.append(formatted_result)
         return formatted_results
 
+    @staticmethod
+    def _query_include(include_embeddings: bool) -> List[str]:
+        """collection.query 返回的字段"""
+        include = ["documents", "metadatas", "distances"]
+        return include + ["embeddings"] if include_embeddings else include
+
+    @staticmethod
+    def _apply_min_score(results: List[Dict[str, Any]], min_score: Optional[float]) -> List[Dict[str, Any]]:
+        """丢弃相似度低于 min_score 的结果（结果已按相似度降序排列）"""
+        if not min_score:
+            return results
+        return [result for result in results if result["score"] >= min_score]
+
+    @staticmethod
+    def _filter_key(filter: Optional[Dict[str, Any]]) -> str:
+        """把过滤条件序列化为可哈希的缓存键"""
+        return json.dumps(filter, sort_keys=True, ensure_ascii=False, default=str)
+
     def delete_by_source(self, source: str):
         """
         删除指定来源的所有文档
@@ -125,11 +649,222 @@ class VectorStore:
         Args:
             source: 文档来源
         """
-        # 获取该来源的所有文档 ID
-        results = self.collection.get(where={"source": source})
+        self.delete_by_sources([source])
 
-        if results["ids"]:
-            self.collection.delete(ids=results["ids"])
+    def delete_by_sources(self, sources: List[str]) -> int:
+        """
+        批量删除多个来源的所有文档
+
+        按页只读取 ID 后删除，内存占用与来源大小无关。
+
+        Args:
+            sources: 文档来源列表
+
+        Returns:
+            删除的块数
+        """
+        sources = list(dict.fromkeys(sources))
+        deleted = 0
+
+        for start in range(0, len(sources), DELETE_SOURCES_BATCH):
+            batch = sources[start:start + DELETE_SOURCES_BATCH]
+            where = {"source": batch[0]} if len(batch) == 1 else {"source": {"$in": batch}}
+            deleted += self._delete_where(where)
+
+        if deleted:
+            self._clear_caches()
+
+        for source in sources:
+            if self.lexical_index is not None:
+                self.lexical_index.delete_source(source)
+            if self.quantized_index is not None:
+                self.quantized_index.delete_source(source)
+            self.source_catalog.remove(source)
+            self.manifest.remove(source)
+
+        return deleted
+
+    def _delete_where(self, where: Dict[str, Any]) -> int:
+        """
+        分页删除满足条件的块（只读取 ID）
+
+        Args:
+            where: Chroma where 条件
+
+        Returns:
+            删除的块数
+        """
+        deleted = 0
+        while True:
+            page = self.collection.get(where=where, limit=DELETE_PAGE_SIZE, include=[])
+            if not page["ids"]:
+                return deleted
+            self.collection.delete(ids=page["ids"])
+            deleted += len(page["ids"])
+
+    def delete_ids(self, ids: List[str]):
+        """
+        按 ID 删除文档块
+
+        按页读取被删除块的元数据（来源和字节数）用于更新来源目录，不读取文本；
+        没有记录字节数的旧块才回退读取文本。
+
+        Args:
+            ids: chunk ID 列表
+        """
+        for start in range(0, len(ids), DELETE_PAGE_SIZE):
+            batch = ids[start:start + DELETE_PAGE_SIZE]
+            existing = self.collection.get(ids=batch, include=["metadatas"])
+            sizes = self._chunk_sizes(existing["ids"], existing["metadatas"])
+
+            self.collection.delete(ids=batch)
+            if self.lexical_index is not None:
+                self.lexical_index.delete_ids(batch)
+            if self.quantized_index is not None:
+                self.quantized_index.delete_ids(batch)
+            self.source_catalog.remove_chunks(summarize_sizes(
+                [metadata.get("source", "") for metadata in existing["metadatas"]],
+                sizes,
+            ))
+
+        if ids:
+            self._clear_caches()
+
+    def _chunk_sizes(self, ids: List[str], metadatas: List[Dict[str, Any]]) -> List[int]:
+        """
+        块文本的字节数：读取元数据中记录的值，记录字节数之前写入的块回退读取文本
+
+        Args:
+            ids: chunk ID 列表
+            metadatas: 与 ids 一一对应的元数据
+
+        Returns:
+            与 ids 一一对应的 UTF-8 字节数
+        """
+        sizes = [metadata.get(BYTE_SIZE_FIELD) for metadata in metadatas]
+        legacy = [chunk_id for chunk_id, size in zip(ids, sizes) if size is None]
+        if legacy:
+            found = self.collection.get(ids=legacy, include=["documents"])
+            texts = dict(zip(found["ids"], found["documents"]))
+            sizes = [
+                chunk_byte_size(texts.get(chunk_id)) if size is None else size
+                for chunk_id, size in zip(ids, sizes)
+            ]
+        return sizes
+
+    def sync_source(
+        self,
+        source: str,
+        documents: List[Document],
+        fingerprint: FileFingerprint,
+    ) -> Tuple[int, int]:
+        """
+        增量同步一个来源：只写入哈希变化的块，删除已不存在的块
+
+        chunk ID 总是由内容生成（见 with_chunk_ids）：清单把“ID 相同、哈希变化”的块视为只有元数据变化，
+        由调用方指定的 ID 不能保证这一点，会留下过期的文本和 embedding。
+
+        Args:
+            source: 文档来源
+            documents: 该来源切分后的全部文档块
+            fingerprint: 文件指纹
+
+        Returns:
+            (写入的块数, 删除的块数)
+        """
+        chunk_ids = make_chunk_ids(documents)
+        chunk_hashes = [hash_chunk(doc) for doc in documents]
+
+        if self.manifest.get(source) is None:
+            # 没有清单记录（首次摄入或旧版本摄入的数据），写入全部块并删除多余的旧块
+            added, deleted = self.replace_source(source, documents, chunk_ids)
+        else:
+            to_add, to_update, to_delete = self.manifest.diff_chunks(source, chunk_ids, chunk_hashes)
+            self.update_metadatas(
+                [documents[i] for i in to_update],
+                [chunk_ids[i] for i in to_update],
+            )
+            added = self.add_documents(
+                [documents[i] for i in to_add],
+                chunk_ids=[chunk_ids[i] for i in to_add],
+            )
+            # 新块写入成功后再删除旧块，写入失败时来源保留旧数据
+            self.delete_ids(to_delete)
+            deleted = len(to_delete)
+
+        self.manifest.record(source, fingerprint, chunk_ids, chunk_hashes)
+
+        return added, deleted
+
+    def update_metadatas(self, documents: List[Document], chunk_ids: List[str]):
+        """
+        只更新已有块的元数据（内容不变，不重新 embedding）
+
+        Args:
+            documents: 文档块列表
+            chunk_ids: chunk ID 列表
+        """
+        for start in range(0, len(chunk_ids), self.max_batch_size):
+            window = documents[start:start + self.max_batch_size]
+            self.collection.update(
+                ids=chunk_ids[start:start + self.max_batch_size],
+                metadatas=[self._chunk_metadata(doc) for doc in window],
+            )
+        if chunk_ids:
+            self._clear_caches()
+
+    def replace_source(
+        self,
+        source: str,
+        documents: List[Document],
+        chunk_ids: List[str] = None,
+    ) -> Tuple[int, int]:
+        """
+        用新的文档块替换一个来源：upsert 全部块，写入成功后只删除不再存在的旧块
+
+        Args:
+            source: 文档来源
+            documents: 该来源切分后的全部文档块
+            chunk_ids: 可选的 chunk ID 列表
+
+        Returns:
+            (写入的块数, 删除的块数)
+        """
+        if chunk_ids is None:
+            chunk_ids = make_chunk_ids(documents)
+
+        added = self.add_documents(documents, chunk_ids=chunk_ids)
+        deleted = self.delete_stale(source, chunk_ids)
+        return added, deleted
+
+    def delete_stale(self, source: str, keep_ids: List[str]) -> int:
+        """
+        删除来源中不在 keep_ids 里的块（只读取 ID）
+
+        Args:
+            source: 文档来源
+            keep_ids: 需要保留的 chunk ID
+
+        Returns:
+            删除的块数
+        """
+        keep = set(keep_ids)
+        stale = []
+        offset = 0
+        while True:
+            page = self.collection.get(
+                where={"source": source},
+                limit=DELETE_PAGE_SIZE,
+                offset=offset,
+                include=[],
+            )
+            if not page["ids"]:
+                break
+            stale.extend(chunk_id for chunk_id in page["ids"] if chunk_id not in keep)
+            offset += len(page["ids"])
+
+        self.delete_ids(stale)
+        return len(stale)
 
     def source_exists(self, source: str) -> bool:
         """
@@ -141,7 +876,7 @@ class VectorStore:
         Returns:
             文档是否存在
         """
-        results = self.collection.get(where={"source": source})
+        results = self.collection.get(where={"source": source}, limit=1, include=[])
         return bool(results["ids"])
 
     def get_all_sources(self) -> List[str]:
@@ -151,19 +886,21 @@ class VectorStore:
         Returns:
             来源列表（文件路径）
         """
-        # 获取所有文档的 metadata
-        results = self.collection.get()
+        return [info.source for info in self.list_sources()]
 
-        if not results["metadatas"]:
-            return []
+    def list_sources(self) -> List[SourceInfo]:
+        """
+        获取所有来源的统计信息（块数、字节数、摄入时间、模型）
 
-        # 提取唯一的 source
-        sources = set()
-        for metadata in results["metadatas"]:
-            if "source" in metadata:
-                sources.add(metadata["source"])
+        从来源目录读取，不扫描集合。
 
-        return sorted(list(sources))
+        Returns:
+            按来源排序的统计信息列表
+        """
+        # 来源目录引入前摄入的数据需要先建立目录
+        if self.source_catalog.is_empty() and self.collection.count() > 0:
+            self.rebuild_source_catalog()
+        return self.source_catalog.list()
 
     def clear(self):
         """清空集合"""
@@ -173,6 +910,14 @@ class VectorStore:
         except Exception:
             pass
 
+        self._clear_caches()
+        if self.lexical_index is not None:
+            self.lexical_index.clear()
+        if self.quantized_index is not None:
+            self.quantized_index.clear()
+        self.source_catalog.clear()
+        self.manifest.clear()
+
 
 # 全局单例
 _vector_store_instance = None
@@ -2,14 +2,14 @@
 import gradio as gr
 import sys
 from pathlib import Path
-from typing import List, Tuple, Optional, Dict, Any, TYPE_CHECKING
+from typing import AsyncIterator, List, Tuple, Optional, Dict, Any, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from src.embeddings import Embeddings
     from src.vector_store import VectorStore
     from src.chains.llm_manager import LLMManager
 
-from src.chunking.splitter import get_text_splitter
+from src.chunking.chapter_splitter import ChapterAwareSplitter
 
 
 # 全局状态
@@ -71,7 +71,7 @@ def get_initial_models() -> List[str]:
 
 
 def process_upload(files: List, state: SessionState, progress: gr.Progress = gr.Progress()) -> str:
-    """处理文件上传 - 支持流式进度显示，跳过已上传的文件"""
+    """处理文件上传 - 支持流式进度显示，跳过未变化的文件，只重新 embedding 变化的块"""
     if not files:
         return "❌ 请选择文件"
 
@@ -81,7 +81,7 @@ def process_upload(files: List, state: SessionState, progress: gr.Progress = gr.
     status_lines = []
 
     from src.loaders import get_loader
-    from src.loaders.base import Document
+    from src.manifest import file_fingerprint
 
     # 统计需要处理的文件数量
     files_to_process = []
@@ -90,7 +90,8 @@ def process_upload(files: List, state: SessionState, progress: gr.Progress = gr.
     for file in files:
         file_path = file.name
         path = Path(file_path)
-        if state.vector_store.source_exists(str(path)):
+        # 按摄入清单判断，未变化的文件不会被打开
+        if state.vector_store.manifest.is_unchanged(str(path)):
             skipped_files.append(path.name)
         else:
             files_to_process.append(file)
@@ -100,7 +101,7 @@ def process_upload(files: List, state: SessionState, progress: gr.Progress = gr.
 
     # 先报告跳过的文件
     if skipped_files:
-        status_lines.append(f"⏭️ 跳过 {len(skipped_files)} 个已上传的文件: {', '.join(skipped_files)}")
+        status_lines.append(f"⏭️ 跳过 {len(skipped_files)} 个未变化的文件: {', '.join(skipped_files)}")
         skipped = len(skipped_files)
 
     for file_idx, file in enumerate(files_to_process, 1):
@@ -112,6 +113,7 @@ def process_upload(files: List, state: SessionState, progress: gr.Progress = gr.
             current_step += 1
             progress(current_step / total_steps, desc=f"📖 [{file_idx}/{len(files_to_process)}] 正在解析 {path.name}...")
 
+            fingerprint = file_fingerprint(str(path))
             loader = get_loader(str(path))
             documents = loader.load(str(path))
 
@@ -121,33 +123,20 @@ def process_upload(files: List, state: SessionState, progress: gr.Progress = gr.
             current_step += 1
             progress(current_step / total_steps, desc=f"✂️ [{file_idx}/{len(files_to_process)}] 正在切分 {path.name}...")
 
-            chunked_docs = []
-            for doc in documents:
-                chunks = get_text_splitter().split_text(doc.content)
-                for i, chunk in enumerate(chunks):
-                    chunked_doc = Document(
-                        content=chunk,
-                        metadata={
-                            **doc.metadata,
-                            "chunk_index": i,
-                            "total_chunks": len(chunks),
-                        },
-                        source=doc.source,
-                    )
-                    chunked_docs.append(chunked_doc)
+            chunked_docs = ChapterAwareSplitter().split_documents(documents)
 
             status_lines.append(f"✂️ [{file_idx}/{len(files_to_process)}] {path.name}: 已切分 {len(chunked_docs)} 块")
 
-            # 清除旧数据
-            state.vector_store.delete_by_source(str(path))
-
-            # 步骤3: 生成 embeddings
+            # 步骤3: 生成 embeddings（只处理变化的块）
             current_step += 1
             progress(current_step / total_steps, desc=f"🔢 [{file_idx}/{len(files_to_process)}] 正在生成 embeddings ({len(chunked_docs)} 块)...")
 
-            state.vector_store.add_documents(chunked_docs)
+            added, deleted = state.vector_store.sync_source(str(path), chunked_docs, fingerprint)
 
-            status_lines.append(f"✅ [{file_idx}/{len(files_to_process)}] {path.name}: 完成！共 {len(chunked_docs)} 个块")
+            status_lines.append(
+                f"✅ [{file_idx}/{len(files_to_process)}] {path.name}: 完成！共 {len(chunked_docs)} 个块"
+                f"（写入 {added} 个，删除 {deleted} 个）"
+            )
             count += 1
             total_chunks += len(chunked_docs)
 
@@ -157,7 +146,7 @@ def process_upload(files: List, state: SessionState, progress: gr.Progress = gr.
     state.documents_loaded = count > 0 or skipped > 0
 
     total_processed = count + skipped
-    summary = f"📊 共 {total_processed} 个文件 (新增 {count} 个，跳过 {skipped} 个已存在)，共 {total_chunks} 个文档块\n\n" + "\n".join(status_lines)
+    summary = f"📊 共 {total_processed} 个文件 (处理 {count} 个，跳过 {skipped} 个未变化)，共 {total_chunks} 个文档块\n\n" + "\n".join(status_lines)
     return summary
 
 
@@ -174,27 +163,13 @@ def process_url(url: str, state: SessionState) -> str:
 
     try:
         from src.loaders.web_loader import WebLoader
-        from src.loaders.base import Document
 
         # 抓取网页
         loader = WebLoader()
         documents = loader.load(url)
 
         # 切分文档
-        chunked_docs = []
-        for doc in documents:
-            chunks = split_text(doc.content)
-            for i, chunk in enumerate(chunks):
-                chunked_doc = Document(
-                    content=chunk,
-                    metadata={
-                        **doc.metadata,
-                        "chunk_index": i,
-                        "total_chunks": len(chunks),
-                    },
-                    source=doc.source,
-                )
-                chunked_docs.append(chunked_doc)
+        chunked_docs = ChapterAwareSplitter().split_documents(documents)
 
         # 存储到向量库
         state.vector_store.add_documents(chunked_docs)
@@ -213,7 +188,9 @@ def refresh_file_list(state: SessionState) -> Tuple[List[str], str]:
     Returns:
         (文件名列表, 信息文本)
     """
-    all_sources = state.vector_store.get_all_sources()
+    # 从来源目录读取，不扫描集合
+    source_infos = state.vector_store.list_sources()
+    all_sources = [info.source for info in source_infos]
 
     # 提取文件名（从完整路径）
     filenames = [Path(src).name for src in all_sources]
@@ -221,7 +198,8 @@ def refresh_file_list(state: SessionState) -> Tuple[List[str], str]:
     # 默认全选
     state.selected_sources = all_sources
 
-    info = f"📁 数据库中共有 {len(all_sources)} 个文件"
+    total_chunks = sum(info.chunk_count for info in source_infos)
+    info = f"📁 数据库中共有 {len(all_sources)} 个文件，{total_chunks} 个文本块"
     return filenames, info
 
 
@@ -245,22 +223,24 @@ def update_selected_sources(selected_filenames: List[str], state: SessionState)
     ]
 
 
-def chat_response(
+async def chat_response(
     message: str,
     history: List[dict],
     api_key: str,
     model: str,
     state: SessionState,
-) -> List[dict]:
-    """处理问答 - 返回 messages 格式"""
+) -> AsyncIterator[List[dict]]:
+    """处理问答 - 异步流式返回 messages 格式，答案随生成逐步更新"""
     if not message.strip():
-        return history
+        yield history
+        return
 
     # 检查 API Key
     if not api_key:
         history.append({"role": "user", "content": message})
         history.append({"role": "assistant", "content": "⚠️ 请先配置 OpenRouter API Key"})
-        return history
+        yield history
+        return
 
     # 更新 LLM 管理器
     if api_key != state.api_key or model != state.model:
@@ -276,45 +256,63 @@ def chat_response(
     if not state.documents_loaded:
         history.append({"role": "user", "content": message})
         history.append({"role": "assistant", "content": "⚠️ 请先上传文档"})
-        return history
+        yield history
+        return
+
+    history.append({"role": "user", "content": message})
+    reply = {"role": "assistant", "content": "🔍 正在检索相关文档..."}
+    history.append(reply)
+    yield history
 
     try:
+        from src.cache.answer_cache import get_answer_cache
         from src.chains.qa_chain import QAChain
+        from src.config import config
         from src.retriever.base import Retriever
+        from src.retriever.hybrid import HybridRetriever
+        from src.retriever.reranker import get_reranker
 
         # 创建检索器时添加 source 过滤
         filter_dict = None
         if state.selected_sources:
             filter_dict = {"source": {"$in": state.selected_sources}}
 
-        retriever = Retriever(
+        # 启用词法索引时使用混合检索，兼顾语义和精确词匹配
+        retriever_class = HybridRetriever if config.LEXICAL_INDEX_ENABLED else Retriever
+        retriever = retriever_class(
             vector_store=state.vector_store,
-            filter_metadata=filter_dict
+            filter_metadata=filter_dict,
+            reranker=get_reranker() if config.RERANK_ENABLED else None,
+        )
+        qa_chain = QAChain(
+            retriever=retriever,
+            llm_manager=state.llm_manager,
+            answer_cache=get_answer_cache() if config.ANSWER_CACHE_ENABLED else None,
         )
-        qa_chain = QAChain(retriever=retriever, llm_manager=state.llm_manager)
-
-        # 执行问答
-        result = qa_chain.run(message)
-
-        # 保存引用到状态中
-        state.current_citations = result.citations
-
-        # 直接使用格式化后的答案（包含引用内容）
-        response = result.answer
 
-        history.append({"role": "user", "content": message})
-        history.append({"role": "assistant", "content": response})
+        # 流式执行问答
+        answer = ""
+        async for event in qa_chain.astream(message):
+            if event.type == "delta":
+                answer += event.delta
+                reply["content"] = answer
+                yield history
+            elif event.type == "done":
+                # 保存引用到状态中
+                state.current_citations = event.result.citations
+                # 生成结束后替换为格式化后的答案（包含引用内容）
+                reply["content"] = event.result.answer
+                yield history
 
     except Exception as e:
-        error_msg = f"❌ 问答出错: {str(e)}"
-        history.append({"role": "user", "content": message})
-        history.append({"role": "assistant", "content": error_msg})
-
-    return history
+        reply["content"] = f"❌ 问答出错: {str(e)}"
+        yield history
 
 
 def create_interface() -> gr.Blocks:
     """创建 Gradio 界面"""
+    from src.config import config
+
     state = SessionState()
 
     # 启动时获取免费模型列表
@@ -500,13 +498,16 @@ def create_interface() -> gr.Blocks:
             outputs=[],
         )
 
-        def handle_chat(message, history, api_key, model):
-            return chat_response(message, history, api_key, model, state)
+        async def handle_chat(message, history, api_key, model):
+            async for updated_history in chat_response(message, history, api_key, model, state):
+                yield updated_history
 
+        # 异步处理函数不占用线程，允许多个问答并发进行
         submit_btn.click(
             fn=handle_chat,
             inputs=[chat_input, chatbot, api_key_input, model_dropdown],
             outputs=[chatbot],
+            concurrency_limit=config.LLM_MAX_CONCURRENCY,
         ).then(
             lambda: "",
             outputs=[chat_input],
@@ -516,6 +517,7 @@ def create_interface() -> gr.Blocks:
             fn=handle_chat,
             inputs=[chat_input, chatbot, api_key_input, model_dropdown],
             outputs=[chatbot],
+            concurrency_limit=config.LLM_MAX_CONCURRENCY,
         ).then(
             lambda: "",
             outputs=[chat_input],
@@ -41,16 +41,30 @@ def generate_response(prompt: str, vector_store: "VectorStore") -> dict:
         )
 
     try:
+        from src.cache.answer_cache import get_answer_cache
         from src.chains.qa_chain import QAChain
+        from src.config import config
         from src.retriever.base import Retriever
+        from src.retriever.hybrid import HybridRetriever
+        from src.retriever.reranker import get_reranker
 
         # 创建检索器（带过滤）
         filter_dict = None
         if st.session_state.selected_sources:
             filter_dict = {"source": {"$in": st.session_state.selected_sources}}
 
-        retriever = Retriever(vector_store=vector_store, filter_metadata=filter_dict)
-        qa_chain = QAChain(retriever=retriever, llm_manager=st.session_state.llm_manager)
+        # 启用词法索引时使用混合检索，兼顾语义和精确词匹配
+        retriever_class = HybridRetriever if config.LEXICAL_INDEX_ENABLED else Retriever
+        retriever = retriever_class(
+            vector_store=vector_store,
+            filter_metadata=filter_dict,
+            reranker=get_reranker() if config.RERANK_ENABLED else None,
+        )
+        qa_chain = QAChain(
+            retriever=retriever,
+            llm_manager=st.session_state.llm_manager,
+            answer_cache=get_answer_cache() if config.ANSWER_CACHE_ENABLED else None,
+        )
 
         # 执行问答
         result = qa_chain.run(prompt)
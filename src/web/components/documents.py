@@ -7,7 +7,7 @@ from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from src.vector_store import VectorStore
 
-from src.chunking.splitter import get_text_splitter
+from src.chunking.chapter_splitter import ChapterAwareSplitter
 
 
 def render_document_panel(vector_store: "VectorStore") -> None:
@@ -49,32 +49,22 @@ def render_document_panel(vector_store: "VectorStore") -> None:
                     try:
                         path = Path(temp_path)
 
-                        # 加载文档
+                        # 加载文档，使用原始文件名作为 source 并保存原始文件名
                         loader = get_loader(str(path))
-                        documents = loader.load(str(path))
-
-                        # 切分文档
-                        chunked_docs = []
-                        for doc in documents:
-                            chunks = get_text_splitter().split_text(doc.content)
-                            for j, chunk in enumerate(chunks):
-                                chunked_doc = Document(
-                                    content=chunk,
-                                    metadata={
-                                        **doc.metadata,
-                                        "chunk_index": j,
-                                        "total_chunks": len(chunks),
-                                        "original_filename": file.name,  # 保存原始文件名
-                                    },
-                                    source=original_source,  # 使用原始文件名作为 source
-                                )
-                                chunked_docs.append(chunked_doc)
-
-                        # 清除旧数据（如果存在）
-                        vector_store.delete_by_source(original_source)
-
-                        # 存储到向量库
-                        vector_store.add_documents(chunked_docs)
+                        documents = (
+                            Document(
+                                content=doc.content,
+                                metadata={**doc.metadata, "original_filename": file.name},
+                                source=original_source,
+                            )
+                            for doc in loader.iter_load(str(path))
+                        )
+
+                        # 按章节切分文档
+                        chunked_docs = ChapterAwareSplitter().split_documents(documents)
+
+                        # 存储到向量库（覆盖写入，只删除不再存在的旧块）
+                        vector_store.replace_source(original_source, chunked_docs)
                         st.success(f"✅ {file.name}: {len(chunked_docs)} 个块")
 
                     except Exception as e:
@@ -112,27 +102,13 @@ def render_web_scraping(vector_store: "VectorStore") -> None:
                 with st.spinner("正在抓取..."):
                     try:
                         from src.loaders.web_loader import WebLoader
-                        from src.loaders.base import Document
 
                         # 抓取网页
                         loader = WebLoader()
                         documents = loader.load(url)
 
                         # 切分文档
-                        chunked_docs = []
-                        for doc in documents:
-                            chunks = get_text_splitter().split_text(doc.content)
-                            for i, chunk in enumerate(chunks):
-                                chunked_doc = Document(
-                                    content=chunk,
-                                    metadata={
-                                        **doc.metadata,
-                                        "chunk_index": i,
-                                        "total_chunks": len(chunks),
-                                    },
-                                    source=doc.source,
-                                )
-                                chunked_docs.append(chunked_doc)
+                        chunked_docs = ChapterAwareSplitter().split_documents(documents)
 
                         # 存储到向量库
                         vector_store.add_documents(chunked_docs)
@@ -167,11 +143,12 @@ def render_file_management(vector_store: "VectorStore") -> None:
             if st.button("清除旧数据", use_container_width=True):
                 all_sources = vector_store.get_all_sources()
                 # 删除所有临时文件（以 C:\ 开头的）
-                deleted = 0
-                for source in all_sources:
-                    if source.startswith("C:\\") or source.startswith("/tmp/"):
-                        vector_store.delete_by_source(source)
-                        deleted += 1
+                stale_sources = [
+                    source for source in all_sources
+                    if source.startswith("C:\\") or source.startswith("/tmp/")
+                ]
+                vector_store.delete_by_sources(stale_sources)
+                deleted = len(stale_sources)
                 if deleted > 0:
                     st.success(f"✅ 已清除 {deleted} 个旧文件")
                     st.rerun()
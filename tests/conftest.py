@@ -1,7 +1,60 @@
 """Pytest 配置文件 - 自动设置测试环境"""
 import sys
 from pathlib import Path
+import numpy as np
+import pytest
 
 # 添加 src 目录到 Python 路径
 src_path = Path(__file__).parent.parent / "src"
 sys.path.insert(0, str(src_path))
+
+
+class FakeEmbeddings:
+    """不加载模型的假 Embeddings：按字符分桶计数并归一化，记录被 embedding 的文本"""
+
+    DIM = 16
+
+    def __init__(self):
+        self.model_name = "fake-embeddings"
+        self.embedded = []
+        self.queries = []
+
+    def _vector(self, text):
+        vector = np.zeros(self.DIM, dtype=np.float32)
+        for ch in text:
+            vector[ord(ch) % self.DIM] += 1.0
+        vector[0] += 1e-3  # 避免空文本得到零向量
+        return vector / np.linalg.norm(vector)
+
+    def embed_documents_array(self, texts):
+        self.embedded.extend(texts)
+        return np.stack([self._vector(t) for t in texts]) if texts else np.zeros((0, self.DIM), dtype=np.float32)
+
+    def embed_documents(self, texts):
+        return self.embed_documents_array(texts).tolist()
+
+    def embed_query(self, text):
+        self.queries.append(text)
+        return self._vector(text).tolist()
+
+    def embed_queries(self, texts):
+        self.queries.extend(texts)
+        return [self._vector(t).tolist() for t in texts]
+
+
+@pytest.fixture
+def vector_store(tmp_path, monkeypatch):
+    """使用临时目录和假 Embeddings 的 VectorStore"""
+    from src.config import config
+    from src.lexical_index import LexicalIndex
+    from src.manifest import IngestManifest
+    from src.source_catalog import SourceCatalog
+    from src.vector_store import VectorStore
+
+    monkeypatch.setattr(config, "CHROMA_PERSIST_DIR", str(tmp_path / "chroma"))
+    vs = VectorStore(collection_name="test_collection")
+    vs._embeddings = FakeEmbeddings()
+    vs._manifest = IngestManifest(path=tmp_path / "manifest.sqlite3")
+    vs._lexical_index = LexicalIndex(path=tmp_path / "lexical.sqlite3")
+    vs._source_catalog = SourceCatalog(path=tmp_path / "sources.sqlite3")
+    return vs
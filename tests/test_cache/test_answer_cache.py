@@ -0,0 +1,80 @@
+"""测试语义答案缓存"""
+import pytest
+from unittest.mock import Mock
+from src.cache.answer_cache import AnswerCache
+from src.chains.qa_chain import QAChain
+
+RESULT = {"answer": "答案", "sources": [], "citations": []}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return AnswerCache(path=tmp_path / "answers.sqlite3", threshold=0.9, ttl=3600, max_entries=3)
+
+
+class TestAnswerCache:
+    """测试 AnswerCache 类"""
+
+    def test_similar_query_hits(self, cache):
+        """测试相似查询命中，不相似查询未命中"""
+        cache.put([1.0, 0.0], "m", "null", ["a", "b"], RESULT)
+
+        assert cache.get([0.99, 0.05], "m", "null", ["a", "b"]) == RESULT
+        assert cache.get([0.0, 1.0], "m", "null", ["a", "b"]) is None
+        assert cache.stats()["hit_rate"] == 0.5
+
+    def test_key_requires_same_chunks_filter_and_model(self, cache):
+        """测试检索结果、过滤条件和模型都必须一致"""
+        cache.put([1.0, 0.0], "m", "null", ["a", "b"], RESULT)
+
+        assert cache.get([1.0, 0.0], "m", "null", ["a", "c"]) is None
+        assert cache.get([1.0, 0.0], "m", "null", ["b", "a"]) is None
+        assert cache.get([1.0, 0.0], "m", '{"source": "x"}', ["a", "b"]) is None
+        assert cache.get([1.0, 0.0], "other", "null", ["a", "b"]) is None
+
+    def test_ttl(self, tmp_path):
+        """测试过期条目不再命中"""
+        cache = AnswerCache(path=tmp_path / "answers.sqlite3", threshold=0.9, ttl=3600)
+        cache.put([1.0, 0.0], "m", "null", ["a"], RESULT)
+        cache.conn.execute("UPDATE answers SET created_at = created_at - 7200")
+
+        assert cache.get([1.0, 0.0], "m", "null", ["a"]) is None
+
+    def test_lru_eviction(self, cache):
+        """测试超过容量时淘汰最久未访问的条目"""
+        for i in range(3):
+            cache.put([1.0, 0.0], "m", "null", [str(i)], RESULT)
+        cache.get([1.0, 0.0], "m", "null", ["0"])
+        cache.put([1.0, 0.0], "m", "null", ["3"], RESULT)
+
+        assert len(cache) == 3
+        assert cache.get([1.0, 0.0], "m", "null", ["0"]) == RESULT
+        assert cache.get([1.0, 0.0], "m", "null", ["1"]) is None
+
+    def test_persistence(self, tmp_path):
+        """测试缓存持久化到磁盘"""
+        path = tmp_path / "answers.sqlite3"
+        AnswerCache(path=path, threshold=0.9).put([1.0, 0.0], "m", "null", ["a"], RESULT)
+
+        assert AnswerCache(path=path, threshold=0.9).get([1.0, 0.0], "m", "null", ["a"]) == RESULT
+
+
+def test_qa_chain_uses_answer_cache(cache):
+    """测试 QAChain 对相似问题复用答案，跳过 LLM 调用"""
+    mock_retriever = Mock()
+    mock_retriever.filter_metadata = None
+    mock_retriever.get_sources.return_value = [
+        {"id": "a", "content": "内容", "source": "test.pdf", "metadata": {}, "score": 0.8}
+    ]
+    mock_retriever.vector_store.embeddings.embed_query.side_effect = [[1.0, 0.0], [0.99, 0.05]]
+    mock_llm = Mock()
+    mock_llm.default_model = "deepseek/deepseek-chat"
+    mock_llm.generate.return_value = "LLM 答案"
+
+    chain = QAChain(retriever=mock_retriever, llm_manager=mock_llm, answer_cache=cache)
+    first = chain.run("问题")
+    second = chain.run("问题的另一种问法")
+
+    assert second.answer == first.answer
+    assert second.citations[0].confidence == 0.8
+    mock_llm.generate.assert_called_once()
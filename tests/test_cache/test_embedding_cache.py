@@ -0,0 +1,77 @@
+"""测试 Embedding 磁盘缓存"""
+import pytest
+from unittest.mock import Mock, patch
+import numpy as np
+from src.cache.embedding_cache import EmbeddingCache
+from src.embeddings import Embeddings
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return EmbeddingCache(path=tmp_path / "cache.sqlite3", max_entries=3)
+
+
+class TestEmbeddingCache:
+    """测试 EmbeddingCache 类"""
+
+    def test_miss_then_hit(self, cache):
+        """测试未命中后写入再命中"""
+        assert cache.get_many("m", True, ["a"]) == [None]
+
+        cache.put_many("m", True, ["a"], np.array([[1.0, 2.0]]))
+        result = cache.get_many("m", True, ["a"])
+
+        np.testing.assert_array_equal(result[0], np.array([1.0, 2.0], dtype=np.float32))
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+        assert cache.stats()["hit_rate"] == 0.5
+
+    def test_key_includes_model_and_normalize(self, cache):
+        """测试模型名和归一化标志都参与缓存键"""
+        cache.put_many("m", True, ["a"], np.array([[1.0]]))
+
+        assert cache.get_many("other", True, ["a"]) == [None]
+        assert cache.get_many("m", False, ["a"]) == [None]
+
+    def test_eviction(self, cache):
+        """测试超过容量时淘汰最久未访问的条目"""
+        cache.put_many("m", True, ["a", "b", "c"], np.eye(3))
+        # 访问 a，使 b 成为最久未访问的条目
+        cache.get_many("m", True, ["a"])
+        cache.put_many("m", True, ["d"], np.ones((1, 3)))
+
+        assert len(cache) == 3
+        assert cache.get_many("m", True, ["b"]) == [None]
+        assert cache.get_many("m", True, ["a"])[0] is not None
+
+    def test_persistence(self, tmp_path):
+        """测试缓存持久化到磁盘"""
+        path = tmp_path / "cache.sqlite3"
+        EmbeddingCache(path=path).put_many("m", True, ["a"], np.array([[3.0]]))
+
+        result = EmbeddingCache(path=path).get_many("m", True, ["a"])
+
+        assert result[0][0] == 3.0
+
+
+class TestEmbeddingsWithCache:
+    """测试 Embeddings 通过缓存计算"""
+
+    @patch('src.embeddings.SentenceTransformer')
+    def test_only_misses_are_encoded(self, mock_transformer_class, cache):
+        """测试只对未命中的文本调用模型，重复文本只计算一次"""
+        mock_model = Mock()
+        mock_model.encode.side_effect = lambda texts, **kwargs: np.array(
+            [[float(len(t)), 0.0] for t in texts]
+        )
+        mock_transformer_class.return_value = mock_model
+
+        embeddings = Embeddings(cache=cache)
+        first = embeddings.embed_documents(["aa", "b", "aa"])
+        assert first == [[2.0, 0.0], [1.0, 0.0], [2.0, 0.0]]
+        assert mock_model.encode.call_args[0][0] == ["aa", "b"]
+
+        second = embeddings.embed_documents(["b", "ccc"])
+        assert second == [[1.0, 0.0], [3.0, 0.0]]
+        assert mock_model.encode.call_args[0][0] == ["ccc"]
+        assert mock_model.encode.call_count == 2
@@ -0,0 +1,59 @@
+"""测试 LRU 缓存"""
+from src.cache.lru import LRUCache
+
+
+def test_get_and_put():
+    """测试基本读写和命中统计"""
+    cache = LRUCache(maxsize=2)
+    assert cache.get("a") is None
+
+    cache.put("a", 1)
+
+    assert cache.get("a") == 1
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_eviction_order():
+    """测试淘汰最久未使用的条目"""
+    cache = LRUCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert len(cache) == 2
+
+
+def test_zero_maxsize_disables_cache():
+    """测试 maxsize=0 时不缓存"""
+    cache = LRUCache(maxsize=0)
+    cache.put("a", 1)
+    assert cache.get("a") is None
+
+
+def test_clear():
+    """测试清空缓存"""
+    cache = LRUCache(maxsize=2)
+    cache.put("a", 1)
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_ttl_expires_entries(monkeypatch):
+    """测试条目超过有效期后失效"""
+    import src.cache.lru as lru_module
+    now = [100.0]
+    monkeypatch.setattr(lru_module.time, "monotonic", lambda: now[0])
+    cache = LRUCache(maxsize=2, ttl=10)
+    cache.put("a", 1)
+
+    now[0] += 9
+    assert cache.get("a") == 1
+
+    now[0] += 2
+    assert "a" not in cache
+    assert cache.get("a") is None
+    assert len(cache) == 0
@@ -0,0 +1,165 @@
+"""测试上下文打包"""
+from unittest.mock import Mock
+from src.chains.context_packer import ContextPacker, count_tokens
+from src.chains.llm_manager import LLMManager
+from src.chains.qa_chain import QAChain
+
+
+def make_source(content, source="book.txt", chunk_index=0, **metadata):
+    return {
+        "id": f"{source}:{chunk_index}",
+        "content": content,
+        "source": source,
+        "metadata": {"chunk_index": chunk_index, "page": 0, **metadata},
+    }
+
+
+class TestCountTokens:
+    """测试 token 计数"""
+
+    def test_counts_cjk_and_latin(self):
+        assert count_tokens("") == 0
+        assert count_tokens("中文文本") > 0
+        assert count_tokens("a" * 400) > count_tokens("a" * 40)
+
+
+class TestContextPacker:
+    """测试 ContextPacker"""
+
+    def setup_method(self):
+        self.packer = ContextPacker(token_counter=len)
+
+    def test_merges_adjacent_chunks_and_removes_overlap(self):
+        sources = [
+            make_source("重叠的部分在这里。后面的内容。", chunk_index=1),
+            make_source("第一块的内容，重叠的部分在这里。", chunk_index=0),
+        ]
+
+        packed = self.packer.pack(sources, budget=10000)
+
+        assert packed.text == "[book 第1-2块]\n内容：第一块的内容，重叠的部分在这里。后面的内容。"
+        assert packed.merged_chunks == 1
+        assert packed.tokens_saved > 0
+        assert len(packed.sources) == 2
+
+    def test_does_not_merge_across_sources_or_gaps(self):
+        sources = [
+            make_source("甲", source="a.txt", chunk_index=0),
+            make_source("乙", source="b.txt", chunk_index=1),
+            make_source("丙", source="a.txt", chunk_index=2),
+        ]
+
+        packed = self.packer.pack(sources, budget=10000)
+
+        assert packed.merged_chunks == 0
+        assert packed.text.index("[a 第1块]") < packed.text.index("[b 第2块]") < packed.text.index("[a 第3块]")
+
+    def test_expanded_passage_covers_chunk_range(self):
+        sources = [
+            make_source(
+                "甲乙丙", chunk_index=0, last_chunk_index=2, chunk_ids=["book.txt:0", "book.txt:1", "book.txt:2"]
+            ),
+            make_source("乙", chunk_index=1),
+            make_source("丁", chunk_index=3),
+        ]
+
+        packed = self.packer.pack(sources, budget=10000)
+
+        assert packed.text == "[book 第1-4块]\n内容：甲乙丙丁"
+        assert packed.merged_chunks == 2
+
+    def test_deduplicates_repeated_chunk(self):
+        source = make_source("同一块内容")
+        packed = self.packer.pack([source, dict(source)], budget=10000)
+
+        assert packed.text.count("同一块内容") == 1
+        assert packed.merged_chunks == 1
+
+    def test_same_chunk_index_in_different_chapters(self):
+        sources = [
+            make_source("第一章开头", source="book.epub", chunk_index=0, chapter_id="ch_1"),
+            make_source("第二章开头", source="book.epub", chunk_index=0, chapter_id="ch_2"),
+            make_source("第三章第二块", source="book.epub", chunk_index=1, chapter_id="ch_3"),
+        ]
+        for source, chapter_id in zip(sources, ["ch_1", "ch_2", "ch_3"]):
+            source["id"] = f"{chapter_id}:{source['metadata']['chunk_index']}"
+
+        packed = self.packer.pack(sources, budget=10000)
+
+        assert packed.text == "\n\n".join([
+            "[book 第1块]\n内容：第一章开头",
+            "[book 第1块]\n内容：第二章开头",
+            "[book 第2块]\n内容：第三章第二块",
+        ])
+        assert packed.merged_chunks == 0
+        assert packed.tokens_saved == 0
+
+    def test_fills_budget_in_relevance_order(self):
+        sources = [
+            make_source("最相关" * 10, source="a.txt"),
+            make_source("次相关" * 100, source="b.txt"),
+            make_source("短", source="c.txt"),
+        ]
+        budget = len("[a 第1块]\n内容：" + "最相关" * 10) + 2 + len("[c 第1块]\n内容：短")
+
+        packed = self.packer.pack(sources, budget=budget)
+
+        assert "[a 第1块]" in packed.text
+        assert "[b 第1块]" not in packed.text
+        assert "[c 第1块]" in packed.text
+        assert packed.dropped_chunks == 1
+        assert packed.tokens <= budget
+        assert [s["source"] for s in packed.sources] == ["a.txt", "c.txt"]
+
+    def test_truncates_last_block_when_enough_budget_remains(self):
+        sources = [make_source("字" * 1000)]
+
+        packed = self.packer.pack(sources, budget=200)
+
+        assert packed.truncated_chunks == 1
+        assert packed.text.endswith("…")
+        assert packed.tokens <= 200
+        assert packed.sources == sources
+
+    def test_empty_sources(self):
+        packed = self.packer.pack([], budget=100)
+
+        assert packed.text == ""
+        assert packed.stats()["tokens_saved"] == 0
+
+
+class TestQAChainContextBudget:
+    """测试 QAChain 的上下文预算"""
+
+    def test_budget_limited_by_model_window(self, monkeypatch):
+        from src.config import config
+
+        monkeypatch.setattr(config, "CONTEXT_TOKEN_BUDGET", 100000)
+        monkeypatch.setattr(config, "CONTEXT_ANSWER_RESERVE", 1000)
+        llm = Mock()
+        llm.default_model = "meta-llama/llama-3-70b"
+        chain = QAChain(retriever=Mock(), llm_manager=llm)
+
+        budget = chain._context_budget("问题")
+
+        assert budget < LLMManager.context_window("llama") - 1000
+        assert budget > 0
+
+    def test_run_records_context_stats(self):
+        retriever = Mock()
+        retriever.get_sources.return_value = [
+            make_source("第一块的内容，重叠的部分。", chunk_index=0),
+            make_source("重叠的部分。第二块的内容。", chunk_index=1),
+        ]
+        llm = Mock()
+        llm.default_model = "deepseek/deepseek-chat"
+        llm.generate.return_value = "答案"
+        chain = QAChain(retriever=retriever, llm_manager=llm)
+
+        result = chain.run("问题")
+
+        prompt = llm.generate.call_args[0][0]
+        assert prompt.count("重叠的部分。") == 1
+        assert result.context_stats["merged_chunks"] == 1
+        assert result.context_stats["tokens_saved"] > 0
+        assert len(result.sources) == 2
@@ -0,0 +1,136 @@
+"""测试 LLMManager"""
+import asyncio
+import httpx
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock, PropertyMock, patch
+from openai import APIConnectionError
+from src.chains.llm_manager import LLMManager
+from src.config import config
+
+
+def _chunk(content):
+    """构造流式响应的一个分块"""
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=content))])
+
+
+def _completion(content):
+    """构造非流式响应"""
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def _connection_error():
+    return APIConnectionError(request=httpx.Request("POST", "https://openrouter.ai/api/v1"))
+
+
+async def _astream_chunks(*contents):
+    for content in contents:
+        yield _chunk(content)
+
+
+@pytest.fixture
+def async_client(monkeypatch):
+    """替换异步客户端，并关闭重试等待"""
+    monkeypatch.setattr(config, "LLM_RETRY_BACKOFF", 0.0)
+    client = Mock()
+    client.chat.completions.create = AsyncMock()
+    with patch.object(LLMManager, "async_client", new_callable=PropertyMock, return_value=client):
+        yield client
+
+
+@pytest.fixture
+def llm():
+    manager = LLMManager(api_key="test-key", default_model="deepseek")
+    manager.client = Mock()
+    return manager
+
+
+def test_stream(llm):
+    """测试流式生成逐段返回文本增量"""
+    llm.client.chat.completions.create.return_value = iter([
+        _chunk("你"), _chunk(None), SimpleNamespace(choices=[]), _chunk("好"),
+    ])
+
+    assert list(llm.stream("问题")) == ["你", "好"]
+
+    kwargs = llm.client.chat.completions.create.call_args[1]
+    assert kwargs["stream"] is True
+    assert kwargs["model"] == "deepseek/deepseek-chat"
+    assert kwargs["messages"] == [{"role": "user", "content": "问题"}]
+
+
+def test_stream_error(llm):
+    """测试流式调用失败时抛出 RuntimeError"""
+    llm.client.chat.completions.create.side_effect = Exception("boom")
+
+    with pytest.raises(RuntimeError, match="LLM 调用失败"):
+        list(llm.stream("问题"))
+
+
+def test_agenerate(llm, async_client):
+    """测试异步生成"""
+    async_client.chat.completions.create.return_value = _completion("答案")
+
+    assert asyncio.run(llm.agenerate("问题")) == "答案"
+    assert async_client.chat.completions.create.call_args[1]["model"] == "deepseek/deepseek-chat"
+
+
+def test_agenerate_retries(llm, async_client):
+    """测试连接错误时重试"""
+    async_client.chat.completions.create.side_effect = [_connection_error(), _completion("答案")]
+
+    assert asyncio.run(llm.agenerate("问题")) == "答案"
+    assert async_client.chat.completions.create.call_count == 2
+
+
+def test_agenerate_gives_up(llm, async_client, monkeypatch):
+    """测试超过重试次数后抛出 RuntimeError，非重试类错误不重试"""
+    monkeypatch.setattr(config, "LLM_MAX_RETRIES", 2)
+    async_client.chat.completions.create.side_effect = _connection_error()
+
+    with pytest.raises(RuntimeError, match="LLM 调用失败"):
+        asyncio.run(llm.agenerate("问题"))
+    assert async_client.chat.completions.create.call_count == 3
+
+    async_client.chat.completions.create.reset_mock(side_effect=True)
+    async_client.chat.completions.create.side_effect = ValueError("bad request")
+    with pytest.raises(RuntimeError):
+        asyncio.run(llm.agenerate("问题"))
+    assert async_client.chat.completions.create.call_count == 1
+
+
+def test_agenerate_concurrency_limit(llm, async_client, monkeypatch):
+    """测试同时进行的请求数不超过 LLM_MAX_CONCURRENCY"""
+    monkeypatch.setattr(config, "LLM_MAX_CONCURRENCY", 2)
+    active = 0
+    peak = 0
+
+    async def create(**kwargs):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return _completion("答案")
+
+    async_client.chat.completions.create.side_effect = create
+
+    async def main():
+        return await asyncio.gather(*(llm.agenerate(f"问题{i}") for i in range(6)))
+
+    assert asyncio.run(main()) == ["答案"] * 6
+    assert peak == 2
+
+
+def test_astream(llm, async_client):
+    """测试异步流式生成，开始输出前的错误会重试"""
+    async_client.chat.completions.create.side_effect = [
+        _connection_error(),
+        _astream_chunks("你", None, "好"),
+    ]
+
+    async def collect():
+        return [delta async for delta in llm.astream("问题")]
+
+    assert asyncio.run(collect()) == ["你", "好"]
+    assert async_client.chat.completions.create.call_args[1]["stream"] is True
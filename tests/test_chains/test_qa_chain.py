@@ -1,6 +1,7 @@
 """测试 QAChain 问答链"""
+import asyncio
 import pytest
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, Mock, patch
 from src.chains.qa_chain import QAChain, QAResult, Citation
 
 
@@ -119,6 +120,72 @@ class TestQAChain:
         assert result.sources == []
         assert result.citations == []
 
+    def test_stream(self):
+        """测试流式问答：先返回来源，再返回答案增量，最后返回完整结果"""
+        mock_retriever = Mock()
+        mock_retriever.get_sources.return_value = [
+            {"content": "测试内容", "source": "test.pdf", "metadata": {}}
+        ]
+        mock_llm = Mock()
+        mock_llm.stream.return_value = iter(["这是", "答案"])
+
+        events = list(QAChain(retriever=mock_retriever, llm_manager=mock_llm).stream("测试问题"))
+
+        assert [e.type for e in events] == ["sources", "delta", "delta", "done"]
+        assert events[0].sources[0]["source"] == "test.pdf"
+        assert "".join(e.delta for e in events[1:3]) == "这是答案"
+        assert events[-1].result.answer.startswith("这是答案")
+        assert len(events[-1].result.citations) == 1
+        mock_llm.generate.assert_not_called()
+
+    def test_stream_no_sources(self):
+        """测试流式问答无检索结果"""
+        mock_retriever = Mock()
+        mock_retriever.get_sources.return_value = []
+
+        events = list(QAChain(retriever=mock_retriever).stream("测试问题"))
+
+        assert [e.type for e in events] == ["sources", "delta", "done"]
+        assert "没有找到" in events[-1].result.answer
+
+    def test_arun(self):
+        """测试异步问答使用异步 LLM 调用"""
+        mock_retriever = Mock()
+        mock_retriever.get_sources.return_value = [
+            {"content": "测试内容", "source": "test.pdf", "metadata": {}}
+        ]
+        mock_llm = Mock()
+        mock_llm.agenerate = AsyncMock(return_value="异步答案")
+
+        result = asyncio.run(QAChain(retriever=mock_retriever, llm_manager=mock_llm).arun("测试问题"))
+
+        assert result.answer.startswith("异步答案")
+        mock_llm.agenerate.assert_awaited_once()
+        mock_llm.generate.assert_not_called()
+
+    def test_astream(self):
+        """测试异步流式问答"""
+        mock_retriever = Mock()
+        mock_retriever.get_sources.return_value = [
+            {"content": "测试内容", "source": "test.pdf", "metadata": {}}
+        ]
+
+        async def astream(prompt):
+            for delta in ["异步", "答案"]:
+                yield delta
+
+        mock_llm = Mock()
+        mock_llm.astream = astream
+
+        async def collect():
+            chain = QAChain(retriever=mock_retriever, llm_manager=mock_llm)
+            return [event async for event in chain.astream("测试问题")]
+
+        events = asyncio.run(collect())
+
+        assert [e.type for e in events] == ["sources", "delta", "delta", "done"]
+        assert events[-1].result.answer.startswith("异步答案")
+
     def test_build_context(self):
         """测试上下文构建"""
         sources = [
@@ -173,6 +240,22 @@ class TestQAChain:
         assert citations[0].page_num == 10
         assert "..." in citations[0].excerpt  # 内容被截断
 
+    def test_generate_citations_confidence(self):
+        """测试引用置信度来自检索分数"""
+        sources = [{"content": "内容", "source": "test.pdf", "metadata": {}, "score": 0.83}]
+
+        citations = QAChain(retriever=Mock())._generate_citations(sources)
+
+        assert citations[0].confidence == 0.83
+
+    def test_generate_citations_confidence_prefers_cosine_similarity(self):
+        """测试混合检索、重排时引用置信度使用余弦相似度而不是融合得分"""
+        sources = [{"content": "内容", "source": "test.pdf", "metadata": {}, "score": 0.016, "retrieval_score": 0.72}]
+
+        citations = QAChain(retriever=Mock())._generate_citations(sources)
+
+        assert citations[0].confidence == 0.72
+
     def test_format_answer_with_citations(self):
         """测试答案格式化"""
         answer = "这是原始答案"
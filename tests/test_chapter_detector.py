@@ -0,0 +1,94 @@
+"""测试章节检测器"""
+import random
+import re
+from src.chunking.chapter_detector import ChapterDetector
+from src.loaders import txt_loader
+
+
+def reference_chapters(content):
+    """逐行逐模式匹配的参考实现，返回 (标题, 级别, 行号)"""
+    results = []
+    for line_num, line in enumerate(content.split("\n")):
+        line = line.strip()
+        if not line:
+            continue
+        for pattern, level in ChapterDetector.PATTERNS:
+            if re.match(pattern, line):
+                results.append((line, level, line_num + 1))
+                break
+    return results
+
+
+def make_corpus(num_lines, seed=0):
+    """生成包含各种标题和干扰行的文本"""
+    rng = random.Random(seed)
+    samples = [
+        "第{n}章 风起", "　　第{n}章：云涌", "第十{n}节 小节", "Chapter {n}: Start", "Chapter\t{n}",
+        "{n}. Introduction text", "{n}、概述", "# 标题{n}", "### 三级", "#### 四级不算",
+        "正文内容{n}，继续。", "1.5 不是标题", "Chapter", "第章", "   ", "", "chapter {n} 小写",
+        "{n}.", "abc 第{n}章 不在行首",
+    ]
+    lines = [rng.choice(samples).format(n=rng.randint(1, 99)) for _ in range(num_lines)]
+    return "\n".join(lines)
+
+
+def test_matches_reference_implementation():
+    """单遍扫描与逐行逐模式匹配的结果一致"""
+    content = make_corpus(5000)
+    chapters = ChapterDetector().detect_txt_chapters(content)
+
+    assert [(c.title, c.level, c.line_start) for c in chapters] == reference_chapters(content)
+
+
+def test_heading_prefix_spanning_lines_is_rejected():
+    """前瞻可以跨行匹配，但确认时只看当前行"""
+    content = "Chapter\n5 正文\n1. first\n2. second"
+    chapters = ChapterDetector().detect_txt_chapters(content)
+
+    assert [c.title for c in chapters] == ["1. first", "2. second"]
+
+
+def test_offsets():
+    """行号、字符偏移和字节偏移对应原文位置"""
+    content = "前言\r\n第一章 开端\r\n内容\r\n第二章 发展\r\n结尾"
+    chapters = ChapterDetector().detect_txt_chapters(content)
+    encoded = content.encode("utf-8")
+
+    assert [c.title for c in chapters] == ["第一章 开端", "第二章 发展"]
+    assert [(c.line_start, c.line_end) for c in chapters] == [(2, 3), (4, 5)]
+    for chapter in chapters:
+        assert content[chapter.char_start:].startswith(chapter.title)
+        assert encoded[chapter.byte_start:].startswith(chapter.title.encode("utf-8"))
+    assert chapters[0].char_end == chapters[1].char_start
+    assert chapters[-1].char_end == len(content)
+    assert chapters[-1].byte_end == len(encoded)
+
+
+def test_detect_file_chapters_gb18030(tmp_path, monkeypatch):
+    """内存映射检测：多字节字符跨块时偏移仍对应文件字节"""
+    monkeypatch.setattr(txt_loader, "READ_BLOCK_BYTES", 5)
+    content = make_corpus(300, seed=1)
+    path = tmp_path / "novel.txt"
+    encoded = content.encode("gb18030")
+    path.write_bytes(encoded)
+
+    chapters = ChapterDetector().detect_file_chapters(str(path))
+
+    assert [(c.title, c.level, c.line_start) for c in chapters] == reference_chapters(content)
+    for chapter in chapters:
+        section = encoded[chapter.byte_start:chapter.byte_end].decode("gb18030")
+        assert section == content[chapter.char_start:chapter.char_end]
+        assert section.strip().startswith(chapter.title)
+    assert chapters[-1].byte_end == len(encoded)
+
+
+def test_detect_file_chapters_with_bom(tmp_path):
+    """BOM 计入字节偏移"""
+    path = tmp_path / "bom.txt"
+    path.write_bytes("﻿第一章 开端\n内容".encode("utf-8"))
+
+    chapters = ChapterDetector().detect_file_chapters(str(path))
+
+    assert len(chapters) == 1
+    assert chapters[0].byte_start == 3
+    assert chapters[0].char_start == 0
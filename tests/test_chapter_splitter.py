@@ -0,0 +1,83 @@
+"""测试章节感知切分"""
+from src.chunking.chapter_splitter import ChapterAwareSplitter
+from src.chunking.splitter import get_text_splitter
+from src.loaders.base import Document
+from src.retriever.base import build_filter
+
+
+def make_splitter(chunk_size=40):
+    return ChapterAwareSplitter(text_splitter=get_text_splitter(chunk_size=chunk_size, chunk_overlap=0))
+
+
+def test_chunks_do_not_cross_chapters():
+    """块不跨越章节边界，并带有章节信息"""
+    content = "序言。\n第一章 开端\n" + "开端内容。" * 10 + "\n第二章 发展\n" + "发展内容。" * 10
+    doc = Document(content=content, metadata={"type": "txt"}, source="book.txt")
+
+    chunks = make_splitter().split_documents([doc])
+
+    assert "chapter_title" not in chunks[0].metadata
+    titled = [chunk for chunk in chunks if "chapter_title" in chunk.metadata]
+    for chunk in titled:
+        other = "发展" if chunk.metadata["chapter_title"] == "第一章 开端" else "开端"
+        assert other not in chunk.content
+    assert {chunk.metadata["chapter_id"] for chunk in titled} == {"ch_1", "ch_2"}
+    assert [chunk.metadata["chunk_index"] for chunk in chunks] == list(range(len(chunks)))
+    assert all(chunk.metadata["total_chunks"] == len(chunks) for chunk in chunks)
+    assert all(chunk.metadata["page"] == 0 for chunk in chunks)
+
+
+def test_chapter_carries_across_documents_of_same_source():
+    """章节跨越多个分段/分页时，后续文档沿用当前章节"""
+    documents = [
+        Document(content="第一章 开端\n第一页内容。", metadata={"page": 1}, source="book.pdf"),
+        Document(content="第二页内容。\n第二章 发展\n更多内容。", metadata={"page": 2}, source="book.pdf"),
+        Document(content="另一本书的内容。", metadata={"page": 1}, source="other.pdf"),
+    ]
+
+    chunks = make_splitter(chunk_size=500).split_documents(documents)
+    labels = [(chunk.metadata["page"], chunk.metadata.get("chapter_title")) for chunk in chunks]
+
+    assert labels == [
+        (1, "第一章 开端"),
+        (2, "第一章 开端"),
+        (2, "第二章 发展"),
+        (1, None),
+    ]
+    assert chunks[2].metadata["chapter_id"] == "ch_2"
+
+
+def test_loader_chapters_are_kept():
+    """加载器提供的章节信息（如 EPUB）保持不变"""
+    doc = Document(
+        content="第九章 不作为边界\n内容",
+        metadata={"chapter_id": "ch_3", "chapter_title": "第三章", "type": "epub"},
+        source="book.epub",
+    )
+
+    chunks = make_splitter(chunk_size=500).split_documents([doc])
+
+    assert len(chunks) == 1
+    assert chunks[0].metadata["chapter_id"] == "ch_3"
+    assert chunks[0].metadata["chapter_title"] == "第三章"
+
+
+def test_build_filter():
+    """过滤条件的构造"""
+    assert build_filter() is None
+    assert build_filter(sources=["a"]) == {"source": {"$in": ["a"]}}
+    assert build_filter(sources=["a"], chapter_titles=["第一章"]) == {
+        "$and": [{"source": {"$in": ["a"]}}, {"chapter_title": {"$in": ["第一章"]}}]
+    }
+
+
+def test_search_filtered_by_chapter(vector_store):
+    """按章节过滤检索"""
+    content = "第一章 开端\n关于龙的故事。\n第二章 发展\n关于龙的传说。"
+    doc = Document(content=content, metadata={"type": "txt"}, source="book.txt")
+    vector_store.add_documents(make_splitter(chunk_size=500).split_documents([doc]))
+
+    results = vector_store.search("龙", top_k=5, filter=build_filter(chapter_titles=["第二章 发展"]))
+
+    assert len(results) == 1
+    assert results[0]["metadata"]["chapter_title"] == "第二章 发展"
@@ -1,6 +1,13 @@
 """测试文本切分模块"""
 import pytest
-from src.chunking.splitter import get_text_splitter, LangchainTextSplitter, DEFAULT_CHUNK_SIZE, DEFAULT_CHUNK_OVERLAP
+from src.chunking.splitter import (
+    DEFAULT_CHUNK_OVERLAP,
+    DEFAULT_CHUNK_SIZE,
+    LangchainTextSplitter,
+    TokenLengthFunction,
+    get_text_splitter,
+    get_token_text_splitter,
+)
 
 
 def test_basic_splitting():
@@ -77,3 +84,54 @@ def test_overlap():
         # 简单检查：有重叠的话，第二块开头应该包含第一块结尾的部分内容
         # 但因为标点符号切分，不能严格保证
         assert len(chunks) > 1
+
+
+class FakeTokenizer:
+    """每个字符一个 token，便于验证长度"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def encode(self, text, add_special_tokens=True):
+        self.calls += 1
+        tokens = [ch for ch in text if not ch.isspace()]
+        return ["[CLS]", *tokens, "[SEP]"] if add_special_tokens else tokens
+
+
+def test_token_splitter_respects_token_budget():
+    """按 token 数切分时每块不超过 chunk_size 个 token"""
+    tokenizer = FakeTokenizer()
+    splitter = get_token_text_splitter(chunk_size=30, chunk_overlap=0, tokenizer=tokenizer)
+    text = "这是一段很长的中文文本。" * 20
+
+    chunks = splitter.split_text(text)
+
+    assert len(chunks) > 1
+    assert all(len(tokenizer.encode(chunk, add_special_tokens=False)) <= 30 for chunk in chunks)
+    assert "".join(chunks) == text
+
+
+def test_token_length_function_is_cached():
+    """同一片段只调用一次 tokenizer"""
+    tokenizer = FakeTokenizer()
+    length = TokenLengthFunction(tokenizer)
+
+    assert length("你好 世界") == 4
+    assert length("你好 世界") == 4
+    assert tokenizer.calls == 1
+
+
+def test_default_splitter_follows_config(monkeypatch):
+    """CHUNK_SIZE_UNIT=tokens 时默认切分器按 token 计数"""
+    from src.chunking import splitter as splitter_module
+    from src.config import config
+
+    monkeypatch.setattr(config, "CHUNK_SIZE_UNIT", "tokens")
+    monkeypatch.setattr(splitter_module, "_default_splitter", None)
+    monkeypatch.setattr(splitter_module, "get_tokenizer", lambda model_name=None: FakeTokenizer())
+
+    splitter = splitter_module.get_default_text_splitter()
+
+    assert isinstance(splitter.length_function, TokenLengthFunction)
+    assert splitter.chunk_size == config.CHUNK_TOKEN_SIZE
+    assert splitter_module.get_default_text_splitter() is splitter
@@ -39,6 +39,21 @@ class TestEmbeddings:
         assert result == [0.5, 0.6]
         mock_model.encode.assert_called_once()
 
+    @patch('src.embeddings.SentenceTransformer')
+    def test_embed_query_cached(self, mock_transformer_class):
+        """测试重复查询命中 LRU 缓存"""
+        mock_model = Mock()
+        mock_model.encode.return_value = np.array([0.5, 0.6])
+        mock_transformer_class.return_value = mock_model
+
+        embeddings = Embeddings()
+        first = embeddings.embed_query("test query")
+        first.append(1.0)  # 修改返回值不应影响缓存
+        second = embeddings.embed_query("test query")
+
+        assert second == [0.5, 0.6]
+        mock_model.encode.assert_called_once()
+
     @patch('src.embeddings.SentenceTransformer')
     def test_get_dimension(self, mock_transformer_class):
         """测试获取维度"""
@@ -96,6 +111,22 @@ class TestEmbeddings:
         # 验证使用了正确的模型名称
         mock_transformer_class.assert_called_once_with("custom-model", device="cpu")
 
+    @patch('src.embeddings.SentenceTransformer')
+    def test_embed_queries_batch(self, mock_transformer_class):
+        """测试批量查询嵌入只调用一次模型，且复用缓存"""
+        mock_model = Mock()
+        mock_model.encode.return_value = np.array([[0.1, 0.2], [0.3, 0.4]])
+        mock_transformer_class.return_value = mock_model
+
+        embeddings = Embeddings()
+        result = embeddings.embed_queries(["q1", "q2", "q1"])
+
+        assert result == [[0.1, 0.2], [0.3, 0.4], [0.1, 0.2]]
+        assert mock_model.encode.call_args[0][0] == ["q1", "q2"]
+
+        assert embeddings.embed_query("q2") == [0.3, 0.4]
+        mock_model.encode.assert_called_once()
+
     def test_embeddings_singleton(self):
         """测试全局单例模式"""
         with patch('src.embeddings.SentenceTransformer'):
@@ -0,0 +1,129 @@
+"""测试文档摄入脚本的流水线模式"""
+import pytest
+from pathlib import Path
+from unittest.mock import Mock
+from scripts.ingest import ingest_files_parallel, load_and_split
+from src.manifest import IngestManifest, make_chunk_ids
+
+
+def _write_markdown(path: Path, paragraphs: int) -> Path:
+    path.write_text("\n\n".join(f"第{i}段内容。" * 20 for i in range(paragraphs)), encoding="utf-8")
+    return path
+
+
+def _mock_vector_store(tmp_path) -> Mock:
+    vector_store = Mock()
+    vector_store.manifest = IngestManifest(path=tmp_path / "manifest.sqlite3")
+    return vector_store
+
+
+def test_load_and_split(tmp_path):
+    """测试工作进程中的加载与切分"""
+    md_file = _write_markdown(tmp_path / "book.md", 10)
+
+    loaded = load_and_split(str(md_file))
+
+    assert loaded.num_documents == 1
+    assert len(loaded.chunks) > 1
+    assert loaded.chunk_ids == make_chunk_ids(loaded.chunks)
+    assert len(loaded.chunk_hashes) == len(loaded.chunks)
+    assert loaded.fingerprint.size == md_file.stat().st_size
+
+
+def test_ingest_files_parallel_batches_across_files(tmp_path):
+    """测试多个文件的块被攒批写入"""
+    files = [_write_markdown(tmp_path / f"book{i}.md", 3) for i in range(4)]
+    vector_store = _mock_vector_store(tmp_path)
+
+    succeeded, failed = ingest_files_parallel(files, vector_store, workers=2, batch_size=10_000)
+
+    assert (succeeded, failed) == (4, 0)
+    # 批大小足够大时只写入一次
+    vector_store.add_documents.assert_called_once()
+    docs = vector_store.add_documents.call_args[0][0]
+    ids = vector_store.add_documents.call_args[1]["chunk_ids"]
+    assert len(docs) == len(ids) == len(set(ids))
+    assert {doc.source for doc in docs} == {str(f) for f in files}
+
+
+def test_ingest_files_parallel_reports_failures(tmp_path):
+    """测试单个文件失败不影响其他文件"""
+    good = _write_markdown(tmp_path / "good.md", 2)
+    missing = tmp_path / "missing.md"
+    vector_store = _mock_vector_store(tmp_path)
+
+    succeeded, failed = ingest_files_parallel([good, missing], vector_store, workers=2, batch_size=1)
+
+    assert (succeeded, failed) == (1, 1)
+    assert vector_store.add_documents.call_count == 1
+
+
+def test_ingest_files_parallel_write_failure(tmp_path):
+    """测试写入失败时批次内的文件计为失败"""
+    files = [_write_markdown(tmp_path / f"book{i}.md", 2) for i in range(2)]
+    vector_store = _mock_vector_store(tmp_path)
+    vector_store.add_documents.side_effect = RuntimeError("boom")
+
+    succeeded, failed = ingest_files_parallel(files, vector_store, workers=2, batch_size=10_000)
+
+    assert (succeeded, failed) == (0, 2)
+
+
+def test_ingest_files_parallel_skips_unchanged(tmp_path):
+    """测试重新运行时跳过未变化的文件"""
+    files = [_write_markdown(tmp_path / f"book{i}.md", 2) for i in range(2)]
+    vector_store = _mock_vector_store(tmp_path)
+
+    ingest_files_parallel(files, vector_store, workers=2)
+    vector_store.add_documents.reset_mock()
+
+    succeeded, failed = ingest_files_parallel(files, vector_store, workers=2)
+
+    assert (succeeded, failed) == (0, 0)
+    vector_store.add_documents.assert_not_called()
+
+
+def test_ingest_files_parallel_deletes_old_chunks_after_write(tmp_path):
+    """测试新块写入成功后才删除旧块，写入失败时保留旧块"""
+    files = [_write_markdown(tmp_path / f"book{i}.md", 2) for i in range(2)]
+    vector_store = _mock_vector_store(tmp_path)
+    vector_store.add_documents.side_effect = RuntimeError("boom")
+
+    ingest_files_parallel(files, vector_store, workers=2, batch_size=10_000)
+
+    vector_store.delete_stale.assert_not_called()
+    vector_store.delete_ids.assert_not_called()
+
+    vector_store.add_documents.side_effect = None
+    succeeded, failed = ingest_files_parallel(files, vector_store, workers=2, batch_size=10_000)
+
+    assert (succeeded, failed) == (2, 0)
+    assert {call.args[0] for call in vector_store.delete_stale.call_args_list} == {str(f) for f in files}
+
+
+def test_ingest_files_parallel_sync_failure_is_per_file(tmp_path):
+    """测试单个文件同步出错时只计为该文件失败，其余文件继续写入"""
+    files = [_write_markdown(tmp_path / f"book{i}.md", 2) for i in range(3)]
+    vector_store = _mock_vector_store(tmp_path)
+
+    def delete_stale(source, keep_ids):
+        if source == str(files[1]):
+            raise RuntimeError("locked")
+        return 0
+
+    vector_store.delete_stale.side_effect = delete_stale
+
+    succeeded, failed = ingest_files_parallel(files, vector_store, workers=2, batch_size=10_000)
+
+    assert (succeeded, failed) == (2, 1)
+    assert vector_store.manifest.get(str(files[1])) is None
+    assert vector_store.manifest.get(str(files[0])) is not None
+
+    # 已有清单记录的文件在比较块差异时出错
+    files[0].write_text("新内容。" * 50, encoding="utf-8")
+    vector_store.update_metadatas.side_effect = RuntimeError("locked")
+    vector_store.delete_stale.side_effect = None
+
+    succeeded, failed = ingest_files_parallel(files, vector_store, workers=2, batch_size=10_000)
+
+    assert (succeeded, failed) == (1, 1)
@@ -0,0 +1,91 @@
+"""测试 BM25 词法索引"""
+import pytest
+from src.lexical_index import LexicalIndex, sources_from_filter, tokenize
+from src.loaders.base import Document
+
+
+@pytest.fixture
+def index(tmp_path):
+    return LexicalIndex(path=tmp_path / "lexical.sqlite3")
+
+
+def test_tokenize_cjk_bigrams_and_identifiers():
+    """测试中文二元组和代码标识符分词"""
+    assert tokenize("调用 get_user_id 函数") == ["get_user_id", "调用", "函数"]
+    assert tokenize("孙悟空") == ["孙悟", "悟空"]
+    assert tokenize("的 Hello") == ["hello", "的"]
+
+
+def test_search_ranks_exact_terms(index):
+    """测试精确词匹配"""
+    index.add(
+        ["a", "b", "c"],
+        ["孙悟空大闹天宫", "猪八戒背媳妇", "唐僧取经，孙悟空护送"],
+        ["s1", "s2", "s1"],
+    )
+
+    hits = index.search("孙悟空", top_k=5)
+
+    assert {chunk_id for chunk_id, _ in hits} == {"a", "c"}
+    assert index.search("沙和尚", top_k=5) == []
+
+
+def test_search_with_source_filter(index):
+    """测试按来源过滤"""
+    index.add(["a", "b"], ["foo_bar 函数", "foo_bar 方法"], ["s1", "s2"])
+
+    assert [chunk_id for chunk_id, _ in index.search("foo_bar", top_k=5, sources=["s2"])] == ["b"]
+    assert index.search("foo_bar", top_k=5, sources=[]) == []
+
+
+def test_add_replaces_and_delete(index):
+    """测试同 ID 覆盖写入、按 ID 和来源删除"""
+    index.add(["a", "b"], ["苹果", "香蕉"], ["s1", "s2"])
+    index.add(["a"], ["橙子"], ["s1"])
+
+    assert index.search("苹果", top_k=5) == []
+    assert [chunk_id for chunk_id, _ in index.search("橙子", top_k=5)] == ["a"]
+
+    index.delete_ids(["a"])
+    index.delete_source("s2")
+    assert index.is_empty()
+
+
+def test_sources_from_filter():
+    """测试从过滤条件中提取来源"""
+    assert sources_from_filter(None) == (None, True)
+    assert sources_from_filter({"source": "a"}) == (["a"], True)
+    assert sources_from_filter({"source": {"$in": ["a", "b"]}}) == (["a", "b"], True)
+    assert sources_from_filter({"type": "pdf"}) == (None, False)
+    assert sources_from_filter(
+        {"$and": [{"source": {"$in": ["a"]}}, {"chapter_title": {"$in": ["第一章"]}}]}
+    ) == (["a"], False)
+
+
+class TestVectorStoreLexicalSearch:
+    """测试 VectorStore 与词法索引的同步"""
+
+    def test_lexical_index_follows_collection(self, vector_store):
+        """测试添加、删除时词法索引同步更新"""
+        vector_store.add_documents([
+            Document(content="调用 get_user_id 获取用户", metadata={"type": "md"}, source="/a.md"),
+            Document(content="孙悟空大闹天宫", metadata={"type": "txt"}, source="/b.txt"),
+        ])
+
+        results = vector_store.lexical_search("get_user_id", top_k=3)
+        assert [r["metadata"]["source"] for r in results] == ["/a.md"]
+        assert results[0]["content"].startswith("调用")
+
+        assert vector_store.lexical_search("孙悟空", top_k=3, filter={"type": "md"}) == []
+
+        vector_store.delete_by_source("/b.txt")
+        assert vector_store.lexical_search("孙悟空", top_k=3) == []
+
+    def test_rebuild_for_existing_collection(self, vector_store):
+        """测试启用词法索引前的数据会自动补建索引"""
+        vector_store.add_documents([Document(content="唐僧取经", metadata={}, source="/c.txt")])
+        vector_store.lexical_index.clear()
+
+        results = vector_store.lexical_search("取经", top_k=3)
+
+        assert [r["content"] for r in results] == ["唐僧取经"]
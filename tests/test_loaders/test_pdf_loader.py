@@ -0,0 +1,56 @@
+"""测试 PDF 加载器"""
+import pytest
+from pypdf import PdfWriter
+from pypdf.generic import DecodedStreamObject, DictionaryObject, NameObject
+from src.loaders.pdf_loader import PDFLoader
+
+
+def _write_pdf(path, texts):
+    """生成每页一行文本的 PDF，空字符串生成空白页"""
+    writer = PdfWriter()
+    font = writer._add_object(DictionaryObject({
+        NameObject("/Type"): NameObject("/Font"),
+        NameObject("/Subtype"): NameObject("/Type1"),
+        NameObject("/BaseFont"): NameObject("/Helvetica"),
+    }))
+    for text in texts:
+        page = writer.add_blank_page(200, 200)
+        page[NameObject("/Resources")] = DictionaryObject({
+            NameObject("/Font"): DictionaryObject({NameObject("/F1"): font}),
+        })
+        stream = DecodedStreamObject()
+        stream.set_data(f"BT /F1 12 Tf 20 100 Td ({text}) Tj ET".encode() if text else b"")
+        page[NameObject("/Contents")] = writer._add_object(stream)
+    writer.write(str(path))
+    return path
+
+
+@pytest.fixture
+def pdf_file(tmp_path):
+    return _write_pdf(tmp_path / "book.pdf", [f"Page {i}" for i in range(1, 8)] + [""])
+
+
+def test_iter_load_is_lazy(pdf_file):
+    """测试逐页惰性产出"""
+    pages = PDFLoader(workers=1).iter_load(str(pdf_file))
+
+    first = next(pages)
+
+    assert first.content == "Page 1"
+    assert first.metadata == {"page": 1, "total_pages": 8, "type": "pdf"}
+    assert len(list(pages)) == 6  # 空白页被跳过
+
+
+def test_parallel_matches_serial(pdf_file):
+    """测试并行模式按页码顺序重组，结果与串行一致"""
+    serial = PDFLoader(workers=1).load(str(pdf_file))
+    parallel = PDFLoader(workers=2, pages_per_task=2).load(str(pdf_file))
+
+    assert parallel == serial
+    assert [doc.metadata["page"] for doc in parallel] == list(range(1, 8))
+
+
+def test_missing_file():
+    """测试文件不存在"""
+    with pytest.raises(FileNotFoundError, match="PDF file not found"):
+        list(PDFLoader().iter_load("/nonexistent/book.pdf"))
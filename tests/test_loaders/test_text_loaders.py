@@ -0,0 +1,108 @@
+"""测试 TXT/Markdown/EPUB 加载器的惰性逐段加载"""
+import types
+from ebooklib import epub
+from src.loaders.base import BaseLoader
+from src.loaders.epub_loader import EPUBLoader
+from src.loaders.markdown_loader import MarkdownLoader
+from src.loaders.txt_loader import TXTLoader
+
+
+def test_iter_sections_cuts_at_boundary_after_threshold():
+    """达到阈值后在下一个边界行切开，拼接后等于原文"""
+    lines = ["aaaa\n", "bbbb\n", "\n", "cccc\n", "\n", "dddd\n"]
+    sections = list(BaseLoader.iter_sections(lines, lambda line: not line.strip(), max_chars=8))
+
+    assert sections == ["aaaa\nbbbb\n", "\ncccc\n\ndddd\n"]
+    assert "".join(sections) == "".join(lines)
+
+
+def test_iter_sections_hard_cut_without_boundary():
+    """没有边界行时在 2 倍阈值处强制切开"""
+    lines = ["abc\n"] * 10
+    sections = list(BaseLoader.iter_sections(lines, lambda line: False, max_chars=8))
+
+    assert all(len(section) <= 16 for section in sections)
+    assert "".join(sections) == "".join(lines)
+
+
+def test_txt_loader_streams_sections(tmp_path):
+    """大文件按章节标题切成多个文档"""
+    chapters = [f"第{i}章 标题\n" + "正文内容。\n" * 20 for i in range(1, 6)]
+    content = "".join(chapters)
+    test_file = tmp_path / "book.txt"
+    test_file.write_text(content, encoding="utf-8")
+
+    documents = list(TXTLoader(section_chars=100).iter_load(str(test_file)))
+
+    assert len(documents) == 5
+    assert "".join(doc.content for doc in documents) == content
+    assert [doc.metadata["section_index"] for doc in documents] == list(range(5))
+    assert all(doc.content.startswith("第") for doc in documents)
+    assert all(doc.metadata["char_count"] == len(doc.content) for doc in documents)
+
+
+def test_iter_load_is_lazy(tmp_path):
+    """iter_load 返回生成器，load 返回列表"""
+    test_file = tmp_path / "short.txt"
+    test_file.write_text("内容", encoding="utf-8")
+    loader = TXTLoader()
+
+    assert isinstance(loader.iter_load(str(test_file)), types.GeneratorType)
+    assert isinstance(loader.load(str(test_file)), list)
+
+
+def test_markdown_loader_ignores_headings_in_code_blocks(tmp_path):
+    """代码块内的 # 行不作为切分点"""
+    content = (
+        "# 第一节\n" + "文字\n" * 10
+        + "```\n# 注释\n" + "code\n" * 3 + "```\n"
+        + "## 第二节\n" + "文字\n" * 10
+    )
+    test_file = tmp_path / "doc.md"
+    test_file.write_text(content, encoding="utf-8")
+
+    documents = MarkdownLoader(section_chars=20).load(str(test_file))
+
+    assert "".join(doc.content for doc in documents) == content
+    assert not any(doc.content.startswith("# 注释") for doc in documents)
+    assert any(doc.content.startswith("## 第二节") for doc in documents)
+    assert all(doc.metadata["type"] == "markdown" for doc in documents)
+
+
+def test_markdown_loader_empty_file(tmp_path):
+    """空文件产出一个空文档"""
+    test_file = tmp_path / "empty.md"
+    test_file.write_text("", encoding="utf-8")
+
+    documents = MarkdownLoader().load(str(test_file))
+
+    assert len(documents) == 1
+    assert documents[0].content == ""
+
+
+def test_epub_loader_follows_spine_order(tmp_path):
+    """EPUB 按 spine 顺序逐章产出"""
+    book = epub.EpubBook()
+    book.set_identifier("test-book")
+    book.set_title("测试")
+    book.set_language("zh")
+
+    chapters = []
+    for name in ("a", "b", "c"):
+        chapter = epub.EpubHtml(title=f"章节{name}", file_name=f"{name}.xhtml", lang="zh")
+        chapter.content = f"<html><body><p>内容{name}</p></body></html>"
+        book.add_item(chapter)
+        chapters.append(chapter)
+
+    book.toc = chapters
+    book.add_item(epub.EpubNcx())
+    # 阅读顺序与添加顺序不同
+    book.spine = [chapters[2], chapters[0], chapters[1]]
+    path = tmp_path / "book.epub"
+    epub.write_epub(str(path), book)
+
+    documents = list(EPUBLoader().iter_load(str(path)))
+
+    assert [doc.content for doc in documents] == ["内容c", "内容a", "内容b"]
+    assert [doc.metadata["chapter_title"] for doc in documents] == ["章节c", "章节a", "章节b"]
+    assert all(doc.metadata["type"] == "epub" for doc in documents)
@@ -0,0 +1,160 @@
+"""测试摄入清单与增量同步"""
+import os
+import pytest
+from src.loaders.base import Document
+from src.manifest import IngestManifest, file_fingerprint, hash_chunk, make_chunk_ids
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    return IngestManifest(path=tmp_path / "manifest.sqlite3")
+
+
+def _docs(source, contents):
+    return [Document(content=c, metadata={"chunk_index": i}, source=source) for i, c in enumerate(contents)]
+
+
+class TestIngestManifest:
+    """测试 IngestManifest"""
+
+    def test_unknown_file_is_changed(self, manifest, tmp_path):
+        """测试未记录的文件视为已变化"""
+        f = tmp_path / "a.txt"
+        f.write_text("hello", encoding="utf-8")
+        assert manifest.is_unchanged(str(f)) is False
+
+    def test_recorded_file_is_unchanged(self, manifest, tmp_path):
+        """测试记录后未修改的文件被跳过"""
+        f = tmp_path / "a.txt"
+        f.write_text("hello", encoding="utf-8")
+        manifest.record(str(f), file_fingerprint(str(f)), ["a_0"], ["h0"])
+        assert manifest.is_unchanged(str(f)) is True
+
+    def test_touched_file_with_same_content_is_unchanged(self, manifest, tmp_path):
+        """测试仅修改时间变化、内容相同的文件被跳过"""
+        f = tmp_path / "a.txt"
+        f.write_text("hello", encoding="utf-8")
+        manifest.record(str(f), file_fingerprint(str(f)), [], [])
+        stat = f.stat()
+        os.utime(f, (stat.st_atime, stat.st_mtime + 100))
+
+        assert manifest.is_unchanged(str(f)) is True
+        assert manifest.get(str(f)).mtime == f.stat().st_mtime
+
+    def test_modified_file_is_changed(self, manifest, tmp_path):
+        """测试内容变化的文件需要重新处理"""
+        f = tmp_path / "a.txt"
+        f.write_text("hello", encoding="utf-8")
+        manifest.record(str(f), file_fingerprint(str(f)), [], [])
+        f.write_text("world", encoding="utf-8")
+        stat = f.stat()
+        os.utime(f, (stat.st_atime, stat.st_mtime + 100))
+
+        assert manifest.is_unchanged(str(f)) is False
+
+    def test_diff_chunks(self, manifest):
+        """测试块级差异计算"""
+        manifest.record("src", file_fingerprint(__file__), ["s_0", "s_1", "s_2"], ["h0", "h1", "h2"])
+
+        to_add, to_update, to_delete = manifest.diff_chunks(
+            "src", ["s_0", "s_1", "s_3"], ["h0", "changed", "h3"]
+        )
+
+        # 新块写入，ID 不变但哈希变化的块只更新元数据，只删除已消失的块
+        assert to_add == [2]
+        assert to_update == [1]
+        assert to_delete == ["s_2"]
+
+    def test_remove_and_clear(self, manifest):
+        """测试删除和清空记录"""
+        fp = file_fingerprint(__file__)
+        manifest.record("a", fp, ["a_0"], ["h"])
+        manifest.record("b", fp, ["b_0"], ["h"])
+
+        manifest.remove("a")
+        assert manifest.get("a") is None
+        assert manifest.get_chunks("a") == {}
+        assert manifest.get("b") is not None
+
+        manifest.clear()
+        assert manifest.get("b") is None
+
+    def test_make_chunk_ids_stable(self):
+        """测试 chunk ID 由来源和内容决定，插入新块不影响其他块的 ID"""
+        ids = make_chunk_ids(_docs("s", ["a", "b"]))
+        shifted = make_chunk_ids(_docs("s", ["new", "a", "b"]))
+
+        assert shifted[1:] == ids
+        assert make_chunk_ids(_docs("t", ["a"]))[0] != ids[0]
+
+    def test_make_chunk_ids_duplicates(self):
+        """测试同一来源中相同内容的块按出现顺序编号"""
+        ids = make_chunk_ids(_docs("s", ["a", "a", "b"]))
+        assert len(set(ids)) == 3
+
+    def test_hash_chunk_includes_metadata(self):
+        """测试元数据变化也会改变块哈希"""
+        a = Document(content="x", metadata={"page": 1}, source="s")
+        b = Document(content="x", metadata={"page": 2}, source="s")
+        assert hash_chunk(a) != hash_chunk(b)
+
+
+class TestSyncSource:
+    """测试 VectorStore.sync_source 增量写入"""
+
+    def test_only_changed_chunks_are_embedded(self, vector_store, tmp_path):
+        """测试只重新 embedding 变化的块"""
+        f = tmp_path / "book.txt"
+        f.write_text("v1", encoding="utf-8")
+        source = str(f)
+
+        added, deleted = vector_store.sync_source(source, _docs(source, ["a", "b", "c"]), file_fingerprint(source))
+        assert (added, deleted) == (3, 0)
+
+        vector_store._embeddings.embedded.clear()
+        added, deleted = vector_store.sync_source(source, _docs(source, ["a", "B"]), file_fingerprint(source))
+
+        assert (added, deleted) == (1, 2)
+        assert vector_store._embeddings.embedded == ["B"]
+        stored = vector_store.collection.get(where={"source": source})
+        assert sorted(stored["documents"]) == ["B", "a"]
+
+    def test_insert_at_front_writes_one_chunk(self, vector_store, tmp_path):
+        """测试在开头插入块时只写入新块"""
+        f = tmp_path / "book.txt"
+        f.write_text("v1", encoding="utf-8")
+        source = str(f)
+        vector_store.sync_source(source, _docs(source, ["a", "b", "c"]), file_fingerprint(source))
+
+        vector_store._embeddings.embedded.clear()
+        added, deleted = vector_store.sync_source(source, _docs(source, ["new", "a", "b", "c"]), file_fingerprint(source))
+
+        assert (added, deleted) == (1, 0)
+        assert vector_store._embeddings.embedded == ["new"]
+        # 其余块的 chunk_index 变化，只更新了元数据
+        stored = vector_store.collection.get(where={"source": source})
+        indexes = {doc: meta["chunk_index"] for doc, meta in zip(stored["documents"], stored["metadatas"])}
+        assert indexes == {"new": 0, "a": 1, "b": 2, "c": 3}
+
+    def test_replace_source_without_manifest(self, vector_store):
+        """测试没有清单记录时覆盖写入并只删除多余的旧块"""
+        vector_store.add_documents(_docs("s", ["a", "b"]))
+
+        added, deleted = vector_store.replace_source("s", _docs("s", ["a", "c"]))
+
+        assert (added, deleted) == (2, 1)
+        stored = vector_store.collection.get(where={"source": "s"})
+        assert sorted(stored["documents"]) == ["a", "c"]
+        assert vector_store.source_catalog.get("s").chunk_count == 2
+
+    def test_delete_by_source_removes_manifest_record(self, vector_store, tmp_path):
+        """测试删除来源时同步删除清单记录"""
+        f = tmp_path / "book.txt"
+        f.write_text("v1", encoding="utf-8")
+        source = str(f)
+        vector_store.sync_source(source, _docs(source, ["a"]), file_fingerprint(source))
+
+        vector_store.delete_by_source(source)
+
+        assert vector_store.manifest.get(source) is None
+        assert vector_store.manifest.is_unchanged(source) is False
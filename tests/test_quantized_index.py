@@ -0,0 +1,193 @@
+"""测试量化向量索引"""
+import numpy as np
+import pytest
+from src.loaders.base import Document
+from src.quantized_index import QuantizedIndex, quantize_binary, quantize_int8
+
+
+def random_vectors(n, dim=32, seed=0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def exact_top_k(vectors, query, k):
+    return list(np.argsort(-(vectors @ query))[:k])
+
+
+@pytest.fixture(params=["int8", "binary"])
+def index(request, tmp_path):
+    return QuantizedIndex(path=tmp_path / "quantized", quantization=request.param)
+
+
+def test_quantize_int8_roundtrip():
+    vectors = random_vectors(10)
+    codes, scales = quantize_int8(vectors)
+
+    assert codes.dtype == np.int8
+    assert np.abs(codes * scales[:, None] - vectors).max() < 0.01
+
+
+def test_quantize_binary_packs_sign_bits():
+    codes = quantize_binary(np.array([[1.0, -1.0] * 8], dtype=np.float32))
+
+    assert codes.shape == (1, 2)
+    assert codes.tolist() == [[0b10101010, 0b10101010]]
+
+
+def test_rescoring_returns_exact_top_k(index):
+    vectors = random_vectors(500)
+    ids = [f"c{i}" for i in range(500)]
+    index.add(ids, vectors, ["a.txt"] * 500)
+
+    # 候选覆盖全部向量时，精排结果与精确检索完全一致
+    for q in range(5):
+        query = vectors[q * 7]
+        hits = index.search(query, top_k=5, candidates=500)
+
+        assert [chunk_id for chunk_id, _ in hits] == [ids[i] for i in exact_top_k(vectors, query, 5)]
+        assert hits[0][1] == pytest.approx(1.0, abs=1e-5)
+
+
+@pytest.mark.parametrize("quantization, min_recall", [("int8", 0.99), ("binary", 0.5)])
+def test_recall_with_limited_candidates(tmp_path, quantization, min_recall):
+    rng = np.random.default_rng(0)
+    centers = rng.standard_normal((50, 128))
+    vectors = centers[rng.integers(0, 50, 2000)] + rng.standard_normal((2000, 128)) * 0.8
+    vectors = (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+    index = QuantizedIndex(path=tmp_path / quantization, quantization=quantization)
+    index.add([str(i) for i in range(2000)], vectors, ["s"] * 2000)
+
+    recalls = []
+    for i in range(20):
+        query = vectors[i] + rng.standard_normal(128).astype(np.float32) * 0.3
+        query /= np.linalg.norm(query)
+        expected = {str(j) for j in exact_top_k(vectors, query, 10)}
+        hits = {chunk_id for chunk_id, _ in index.search(query, top_k=10, candidates=100)}
+        recalls.append(len(expected & hits) / 10)
+
+    assert np.mean(recalls) >= min_recall
+
+
+def test_add_skips_existing_ids(index):
+    vectors = random_vectors(4)
+    index.add(["a", "b"], vectors[:2], ["s", "s"])
+    index.add(["b", "c", "c"], vectors[1:4], ["s", "s", "s"])
+
+    assert len(index) == 3
+    assert index.stats()["rows"] == 3
+
+
+def test_delete_and_source_filter(index):
+    vectors = random_vectors(6)
+    index.add([f"c{i}" for i in range(6)], vectors, ["a", "a", "a", "b", "b", "b"])
+
+    index.delete_ids(["c0"])
+    assert "c0" not in [chunk_id for chunk_id, _ in index.search(vectors[0], top_k=6)]
+
+    hits = index.search(vectors[0], top_k=6, sources=["b"])
+    assert {chunk_id for chunk_id, _ in hits} == {"c3", "c4", "c5"}
+
+    index.delete_source("b")
+    assert {chunk_id for chunk_id, _ in index.search(vectors[0], top_k=6)} == {"c1", "c2"}
+
+
+def test_persists_and_clears(tmp_path):
+    vectors = random_vectors(3)
+    QuantizedIndex(path=tmp_path / "q", quantization="int8").add(["a", "b", "c"], vectors, ["s"] * 3)
+
+    reopened = QuantizedIndex(path=tmp_path / "q", quantization="int8")
+    assert reopened.search(vectors[1], top_k=1)[0][0] == "b"
+    np.testing.assert_allclose(reopened.get_vectors(["c", "missing"])["c"], vectors[2], atol=1e-6)
+
+    reopened.clear()
+    assert reopened.is_empty()
+    assert reopened.search(vectors[1], top_k=1) == []
+
+
+def test_resident_codes_are_smaller(tmp_path):
+    vectors = random_vectors(100, dim=384)
+    sizes = {}
+    for quantization in ("int8", "binary"):
+        index = QuantizedIndex(path=tmp_path / quantization, quantization=quantization)
+        index.add([f"c{i}" for i in range(100)], vectors, ["s"] * 100)
+        sizes[quantization] = index.stats()
+
+    assert sizes["int8"]["vector_bytes"] / sizes["int8"]["code_bytes"] > 3.9
+    assert sizes["binary"]["vector_bytes"] / sizes["binary"]["code_bytes"] == 32
+
+
+def test_rejects_unknown_quantization(tmp_path):
+    with pytest.raises(ValueError):
+        QuantizedIndex(path=tmp_path / "q", quantization="int4")
+
+
+def test_vector_store_uses_quantized_index(vector_store, tmp_path):
+    """测试启用量化索引后检索结果与 HNSW 一致，并随集合同步"""
+    docs = [
+        Document(content="苹果", metadata={}, source="/path/a.pdf"),
+        Document(content="香蕉", metadata={}, source="/path/b.pdf"),
+        Document(content="zzzz", metadata={}, source="/path/c.pdf"),
+    ]
+    vector_store.add_documents(docs)
+    expected = vector_store.search("苹果", top_k=3)
+
+    # 启用前写入的数据在首次检索时自动建立索引
+    vector_store._quantized_index = QuantizedIndex(path=tmp_path / "quantized", quantization="int8")
+    vector_store._clear_caches()
+    results = vector_store.search("苹果", top_k=3)
+
+    assert [r["id"] for r in results] == [r["id"] for r in expected]
+    assert [r["score"] for r in results] == pytest.approx([r["score"] for r in expected], abs=1e-4)
+    assert len(vector_store.quantized_index) == 3
+
+    filtered = vector_store.search_many(["苹果"], top_k=3, filter={"source": "/path/b.pdf"})[0]
+    assert [r["metadata"]["source"] for r in filtered] == ["/path/b.pdf"]
+    assert vector_store.search("苹果", top_k=1, include_embeddings=True)[0]["embedding"].shape == (16,)
+
+    vector_store.delete_by_source("/path/a.pdf")
+    assert "苹果" not in [r["content"] for r in vector_store.search("苹果", top_k=3)]
+
+
+def test_vector_store_reports_stale_quantized_index(vector_store, tmp_path, monkeypatch, capsys):
+    """测试关闭量化索引期间摄入的块：检索时只提示一次、不重建，显式重建后可以检索到"""
+    vector_store._quantized_index = QuantizedIndex(path=tmp_path / "quantized", quantization="int8")
+    vector_store.add_documents([Document(content="苹果", metadata={}, source="/path/a.pdf")])
+
+    # 关闭量化索引后继续摄入
+    index, vector_store._quantized_index = vector_store._quantized_index, None
+    vector_store.add_documents([Document(content="香蕉", metadata={}, source="/path/b.pdf")])
+    vector_store._quantized_index = index
+    vector_store._clear_caches()
+
+    rebuilds = []
+    monkeypatch.setattr(vector_store, "rebuild_quantized_index", lambda: rebuilds.append(True))
+    vector_store.search("香蕉", top_k=1)
+    vector_store.search("苹果", top_k=1)
+
+    assert rebuilds == []
+    assert capsys.readouterr().err.count("--rebuild-quantized-index") == 1
+
+    monkeypatch.undo()
+    vector_store.rebuild_quantized_index()
+
+    assert len(vector_store.quantized_index) == 2
+    assert vector_store.search("香蕉", top_k=1)[0]["content"] == "香蕉"
+
+
+def test_len_reads_maintained_count(tmp_path):
+    """测试块数随写入和删除维护在 meta 中，旧版本的索引打开时补上计数"""
+    index = QuantizedIndex(path=tmp_path / "q", quantization="int8")
+    vectors = np.eye(4, dtype=np.float32)
+    index.add(["a", "b", "c", "d"], vectors, ["x", "x", "y", "y"])
+    index.add(["a"], vectors[:1], ["x"])
+    assert len(index) == 4
+
+    index.delete_ids(["a", "missing"])
+    index.delete_source("y")
+    assert len(index) == 1
+
+    with index.conn:
+        index.conn.execute("DELETE FROM meta WHERE key = 'count'")
+    reopened = QuantizedIndex(path=tmp_path / "q", quantization="int8")
+    assert len(reopened) == 1
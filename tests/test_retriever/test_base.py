@@ -111,3 +111,29 @@ class TestRetriever:
         # 验证 filter 被传递给 search
         call_kwargs = mock_store.search.call_args[1]
         assert call_kwargs["filter"] == filter_meta
+
+    def test_min_score(self):
+        """测试 min_score 传递给 search，get_sources 保留分数"""
+        mock_store = Mock()
+        mock_store.search.return_value = [
+            {"content": "a", "metadata": {"source": "x.pdf"}, "score": 0.9},
+        ]
+
+        retriever = Retriever(vector_store=mock_store, min_score=0.5)
+        sources = retriever.get_sources("test")
+
+        assert mock_store.search.call_args[1]["min_score"] == 0.5
+        assert sources[0]["score"] == 0.9
+
+    def test_retrieve_many(self):
+        """测试批量检索"""
+        mock_store = Mock()
+        mock_store.search_many.return_value = [[{"content": "a"}], [{"content": "b"}]]
+
+        retriever = Retriever(top_k=3, filter_metadata={"type": "pdf"}, vector_store=mock_store)
+        results = retriever.retrieve_many(["q1", "q2"])
+
+        assert [r[0]["content"] for r in results] == ["a", "b"]
+        mock_store.search_many.assert_called_once_with(
+            queries=["q1", "q2"], top_k=3, filter={"type": "pdf"}, min_score=0.0
+        )
@@ -0,0 +1,99 @@
+"""测试相邻块扩展"""
+from src.loaders.base import Document
+from src.retriever.base import Retriever
+from src.retriever.expansion import merge_windows
+
+
+def make_chunk(content, chunk_index, source="/path/a.pdf", page=1, score=0.0):
+    return {
+        "id": f"{source}:{page}:{chunk_index}",
+        "content": content,
+        "metadata": {"source": source, "page": page, "chunk_index": chunk_index},
+        "score": score,
+    }
+
+
+class TestMergeWindows:
+    """测试 merge_windows"""
+
+    def test_overlapping_windows_become_one_passage(self):
+        chunks = [make_chunk(text, i) for i, text in enumerate(["甲甲甲，重叠文字。", "重叠文字。乙乙乙", "丙丙丙"])]
+        hits = [{**chunks[2], "score": 0.9}, {**chunks[0], "score": 0.8}]
+
+        passages = merge_windows(hits, [chunks[1:], chunks[:2]])
+
+        assert len(passages) == 1
+        assert passages[0]["content"] == "甲甲甲，重叠文字。乙乙乙丙丙丙"
+        assert passages[0]["score"] == 0.9
+        assert passages[0]["metadata"]["chunk_index"] == 0
+        assert passages[0]["metadata"]["last_chunk_index"] == 2
+        assert passages[0]["metadata"]["chunk_ids"] == [c["id"] for c in chunks]
+
+    def test_separate_documents_keep_rank_order(self):
+        a = [make_chunk("a0", 0), make_chunk("a1", 1)]
+        b = [make_chunk("b0", 0, page=2), make_chunk("b1", 1, page=2)]
+        hits = [{**b[1], "score": 0.9}, {**a[0], "score": 0.5}]
+
+        passages = merge_windows(hits, [b, a])
+
+        assert [p["content"] for p in passages] == ["b0b1", "a0a1"]
+
+    def test_chapters_with_colliding_chunk_index_stay_apart(self):
+        ch1 = [make_chunk(f"一{i}", i) for i in range(2)]
+        ch2 = [make_chunk(f"二{i}", i) for i in range(2)]
+        for chunk in ch1:
+            chunk["metadata"]["chapter_id"] = "ch_1"
+        for chunk in ch2:
+            chunk["metadata"]["chapter_id"] = "ch_2"
+            chunk["id"] += ":ch_2"
+        hits = [{**ch2[0], "score": 0.9}, {**ch1[1], "score": 0.5}]
+
+        passages = merge_windows(hits, [ch2, ch1])
+
+        assert [p["content"] for p in passages] == ["二0二1", "一0一1"]
+        assert passages[0]["metadata"]["chunk_ids"] == [c["id"] for c in ch2]
+
+    def test_results_without_chunk_index_pass_through(self):
+        hit = {"id": "x", "content": "网页", "metadata": {"source": "http://x"}, "score": 0.5}
+
+        assert merge_windows([hit], [[hit]]) == [hit]
+
+
+def test_retriever_expands_neighbors(vector_store):
+    """测试检索器把命中块扩展为相邻块组成的段落"""
+    texts = ["第一段。", "第二段。", "苹果香蕉", "第四段。", "第五段。"]
+    vector_store.add_documents([
+        Document(content=text, metadata={"page": 0, "chunk_index": i, "total_chunks": len(texts)}, source="/path/a.txt")
+        for i, text in enumerate(texts)
+    ])
+
+    results = Retriever(top_k=1, vector_store=vector_store, neighbor_window=1).retrieve("苹果香蕉")
+
+    assert len(results) == 1
+    assert results[0]["content"] == "第二段。苹果香蕉第四段。"
+    assert results[0]["metadata"]["chunk_index"] == 1
+    assert results[0]["metadata"]["last_chunk_index"] == 3
+
+    assert Retriever(top_k=1, vector_store=vector_store, neighbor_window=0).retrieve("苹果香蕉")[0]["content"] == "苹果香蕉"
+
+
+def test_retriever_expands_within_epub_chapter(vector_store):
+    """测试同一来源的多个文档（EPUB 章节）chunk_index 重复时只扩展命中块所在的文档"""
+    chapters = {"ch_1": ["第一章甲", "第一章乙", "第一章丙"], "ch_2": ["第二章甲", "苹果香蕉", "第二章丙"]}
+    vector_store.add_documents([
+        Document(
+            content=text,
+            metadata={"page": 0, "chunk_index": i, "total_chunks": len(texts), "chapter_id": chapter_id},
+            source="/path/book.epub",
+        )
+        for chapter_id, texts in chapters.items()
+        for i, text in enumerate(texts)
+    ])
+    hit = vector_store.search("苹果香蕉", top_k=1)[0]
+
+    window = vector_store.get_windows([hit], window=1)[0]
+    assert [chunk["content"] for chunk in window] == chapters["ch_2"]
+
+    results = Retriever(top_k=1, vector_store=vector_store, neighbor_window=1).retrieve("苹果香蕉")
+    assert results[0]["content"] == "第二章甲苹果香蕉第二章丙"
+    assert results[0]["metadata"]["chapter_id"] == "ch_2"
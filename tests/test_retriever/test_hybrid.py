@@ -0,0 +1,82 @@
+"""测试混合检索器"""
+from unittest.mock import Mock
+import numpy as np
+import pytest
+from src.loaders.base import Document
+from src.retriever.hybrid import HybridRetriever, reciprocal_rank_fusion
+
+
+def test_reciprocal_rank_fusion():
+    """测试 RRF 融合：两路都靠前的结果排名最高"""
+    dense = [{"id": "a"}, {"id": "b"}, {"id": "c"}]
+    lexical = [{"id": "c"}, {"id": "d"}, {"id": "a"}]
+
+    fused = reciprocal_rank_fusion([dense, lexical], k=60)
+
+    assert [r["id"] for r in fused][:2] == ["a", "c"]
+    assert fused[0]["score"] == 1 / 61 + 1 / 63
+    assert {r["id"] for r in fused} == {"a", "b", "c", "d"}
+
+
+def test_reciprocal_rank_fusion_weights():
+    """测试权重影响融合排序"""
+    fused = reciprocal_rank_fusion([[{"id": "a"}], [{"id": "b"}]], weights=[1.0, 2.0])
+    assert [r["id"] for r in fused] == ["b", "a"]
+
+
+def test_hybrid_retrieve():
+    """测试混合检索合并两路结果并截断到 top_k"""
+    mock_store = Mock()
+    mock_store.search.return_value = [
+        {"id": "a", "content": "A", "metadata": {"source": "x"}, "score": 0.9},
+        {"id": "b", "content": "B", "metadata": {"source": "x"}, "score": 0.8},
+    ]
+    mock_store.lexical_search.return_value = [
+        {"id": "c", "content": "C", "metadata": {"source": "y"}, "score": 7.0},
+        {"id": "a", "content": "A", "metadata": {"source": "x"}, "score": 5.0},
+    ]
+    mock_store.get_embeddings.return_value = {"c": np.array([0.6, 0.8], dtype=np.float32)}
+    mock_store.embeddings.embed_queries.return_value = [[1.0, 0.0]]
+
+    retriever = HybridRetriever(top_k=2, vector_store=mock_store, filter_metadata={"source": "x"})
+    results = retriever.retrieve("query")
+
+    assert [r["id"] for r in results] == ["a", "c"]
+    # 融合得分之外保留余弦相似度：向量检索结果沿用其分数，只由词法检索召回的结果读取 embedding 计算
+    assert [r["retrieval_score"] for r in results] == pytest.approx([0.9, 0.6])
+    mock_store.get_embeddings.assert_called_once_with(["c"])
+    assert mock_store.search.call_args[1] == {
+        "query": "query", "top_k": 8, "filter": {"source": "x"}, "min_score": 0.0,
+    }
+    assert mock_store.lexical_search.call_args[1]["top_k"] == 8
+
+
+def test_hybrid_get_sources():
+    """测试混合检索结果可直接用于 get_sources"""
+    mock_store = Mock()
+    mock_store.search.return_value = []
+    mock_store.lexical_search.return_value = [
+        {"id": "c", "content": "C", "metadata": {"source": "y.pdf"}},
+    ]
+    mock_store.get_embeddings.return_value = {}
+
+    sources = HybridRetriever(vector_store=mock_store).get_sources("query")
+
+    assert sources[0]["source"] == "y.pdf"
+
+
+def test_hybrid_min_score_applies_after_fusion(vector_store):
+    """测试 min_score 在融合后按余弦相似度过滤，词法检索召回的低相关结果同样被丢弃"""
+    vector_store.add_documents([
+        Document(content="苹果香蕉", metadata={}, source="/path/a.pdf"),
+        Document(content="苹果一二三四五六七八九十", metadata={}, source="/path/b.pdf"),
+    ], chunk_ids=["a", "b"])
+
+    unfiltered = HybridRetriever(top_k=2, vector_store=vector_store, min_score=0.0).get_sources("苹果香蕉")
+    scores = {source["id"]: source["retrieval_score"] for source in unfiltered}
+    assert scores["a"] == pytest.approx(1.0, abs=1e-4)
+    assert scores["b"] < 0.9
+
+    retriever = HybridRetriever(top_k=2, vector_store=vector_store, min_score=0.9)
+    assert [source["id"] for source in retriever.get_sources("苹果香蕉")] == ["a"]
+    assert [[r["id"] for r in results] for results in retriever.retrieve_many(["苹果香蕉"])] == [["a"]]
@@ -0,0 +1,87 @@
+"""测试 MMR 多样化"""
+import numpy as np
+from src.loaders.base import Document
+from src.retriever.base import Retriever
+from src.retriever.mmr import mmr_select
+
+
+class TestMMRSelect:
+    """测试 mmr_select"""
+
+    def setup_method(self):
+        self.query = [1.0, 0.0, 0.0]
+        # 0 和 1 几乎相同，2 相关度略低但方向不同
+        self.embeddings = np.array([
+            [0.9, 0.1, 0.0],
+            [0.9, 0.11, 0.0],
+            [0.7, 0.0, 0.7],
+        ])
+
+    def test_lambda_one_keeps_relevance_order(self):
+        assert mmr_select(self.query, self.embeddings, k=3, lambda_mult=1.0) == [0, 1, 2]
+
+    def test_skips_near_duplicates(self):
+        selected = mmr_select(self.query, self.embeddings, k=2, lambda_mult=0.5)
+
+        assert selected[1] == 2
+
+    def test_uses_given_relevance(self):
+        selected = mmr_select(self.query, self.embeddings, k=1, relevance=[0.1, 0.2, 0.9])
+
+        assert selected == [2]
+
+    def test_max_per_source(self):
+        selected = mmr_select(
+            self.query,
+            self.embeddings,
+            k=3,
+            lambda_mult=1.0,
+            sources=["a", "a", "a"],
+            max_per_source=2,
+        )
+
+        assert len(selected) == 2
+
+    def test_empty(self):
+        assert mmr_select(self.query, [], k=3) == []
+
+
+def test_retriever_mmr_returns_diverse_results(vector_store):
+    """测试 MMR 模式下近似重复的块只返回一个"""
+    vector_store.add_documents([
+        Document(content="苹果苹果苹果", metadata={}, source="/path/a.txt"),
+        Document(content="苹果苹果苹果。", metadata={}, source="/path/a.txt"),
+        Document(content="苹果香蕉", metadata={}, source="/path/b.txt"),
+    ])
+
+    plain = Retriever(top_k=2, vector_store=vector_store, mmr=False).retrieve("苹果")
+    diverse = Retriever(top_k=2, vector_store=vector_store, mmr=True, mmr_lambda=0.3).retrieve("苹果")
+
+    assert {r["metadata"]["source"] for r in plain} == {"/path/a.txt"}
+    assert {r["metadata"]["source"] for r in diverse} == {"/path/a.txt", "/path/b.txt"}
+    assert all("embedding" not in r for r in diverse)
+
+
+def test_retriever_mmr_max_per_source(vector_store):
+    """测试每个来源的结果数上限"""
+    vector_store.add_documents([
+        Document(content=f"苹果{i}", metadata={}, source="/path/a.txt") for i in range(3)
+    ] + [Document(content="香蕉", metadata={}, source="/path/b.txt")])
+
+    results = Retriever(
+        top_k=3, vector_store=vector_store, mmr=True, mmr_lambda=1.0, max_per_source=1,
+    ).retrieve("苹果")
+
+    assert [r["metadata"]["source"] for r in results] == ["/path/a.txt", "/path/b.txt"]
+
+
+def test_search_include_embeddings(vector_store):
+    """测试检索时带回 embedding，且与不带 embedding 的结果分开缓存"""
+    vector_store.add_documents([Document(content="苹果", metadata={}, source="/path/a.pdf")])
+
+    plain = vector_store.search("苹果", top_k=1)
+    with_embeddings = vector_store.search("苹果", top_k=1, include_embeddings=True)
+
+    assert "embedding" not in plain[0]
+    assert with_embeddings[0]["embedding"].shape == (16,)
+    assert set(vector_store.get_embeddings([plain[0]["id"], "missing"])) == {plain[0]["id"]}
@@ -0,0 +1,95 @@
+"""测试交叉编码器重排"""
+from unittest.mock import Mock
+import numpy as np
+import pytest
+from src.retriever.base import Retriever
+from src.retriever.hybrid import HybridRetriever
+from src.retriever.reranker import CrossEncoderReranker
+
+
+class FakeCrossEncoder:
+    """按问题字符在文档中出现的次数打分"""
+
+    def __init__(self):
+        self.pairs = []
+
+    def predict(self, pairs, batch_size=32, show_progress_bar=None):
+        self.pairs.extend(pairs)
+        return [sum(text.count(ch) for ch in query) / 10 for query, text in pairs]
+
+
+def make_results(*contents):
+    return [
+        {"id": f"id{i}", "content": content, "metadata": {}, "score": 1.0 - i / 10}
+        for i, content in enumerate(contents)
+    ]
+
+
+def test_rerank_orders_by_cross_encoder_score():
+    """按交叉编码器分数重排，原分数保存在 retrieval_score"""
+    reranker = CrossEncoderReranker(model=FakeCrossEncoder(), latency_budget=0)
+    results = make_results("无关内容", "龙", "龙龙龙")
+
+    reranked = reranker.rerank("龙", results, top_k=2)
+
+    assert [r["id"] for r in reranked] == ["id2", "id1"]
+    assert reranked[0]["score"] == 0.3
+    assert reranked[0]["retrieval_score"] == results[2]["score"]
+
+
+def test_rerank_caches_scores_per_query_and_chunk():
+    """同一 (问题, chunk ID) 只打分一次"""
+    model = FakeCrossEncoder()
+    reranker = CrossEncoderReranker(model=model, latency_budget=0)
+
+    reranker.rerank("龙", make_results("龙", "虎"), top_k=2)
+    reranker.rerank("龙", make_results("龙", "虎", "龙虎"), top_k=2)
+
+    assert len(model.pairs) == 3
+    assert reranker.stats()["hits"] == 2
+
+
+def test_rerank_falls_back_when_over_budget(monkeypatch):
+    """预计超出耗时预算时退回原顺序"""
+    clock = iter([0.0, 0.8])
+    monkeypatch.setattr("src.retriever.reranker.time.perf_counter", lambda: next(clock))
+    model = FakeCrossEncoder()
+    reranker = CrossEncoderReranker(model=model, batch_size=2, latency_budget=1.0)
+    results = make_results("无关", "无关", "龙", "龙龙")
+
+    reranked = reranker.rerank("龙", results, top_k=2)
+
+    assert [r["id"] for r in reranked] == ["id0", "id1"]
+    assert len(model.pairs) == 2
+    assert reranker.stats()["fallbacks"] == 1
+
+
+def test_retriever_overfetches_for_reranking():
+    """设置重排器时召回 rerank_candidates 个候选，重排后取 top_k"""
+    mock_store = Mock()
+    mock_store.search.return_value = make_results("虎", "龙", "龙龙")
+    reranker = CrossEncoderReranker(model=FakeCrossEncoder(), latency_budget=0)
+
+    retriever = Retriever(top_k=1, vector_store=mock_store, reranker=reranker, rerank_candidates=10)
+    results = retriever.retrieve("龙")
+
+    assert mock_store.search.call_args[1]["top_k"] == 10
+    assert [r["id"] for r in results] == ["id2"]
+
+
+def test_hybrid_retriever_reranks_fused_candidates():
+    """混合检索融合后的候选也会被重排"""
+    mock_store = Mock()
+    mock_store.search.return_value = make_results("虎", "龙")
+    mock_store.lexical_search.return_value = [{"id": "lex", "content": "龙龙龙", "metadata": {}}]
+    mock_store.get_embeddings.return_value = {"lex": np.array([1.0, 0.0], dtype=np.float32)}
+    mock_store.embeddings.embed_queries.return_value = [[1.0, 0.0]]
+    reranker = CrossEncoderReranker(model=FakeCrossEncoder(), latency_budget=0)
+
+    retriever = HybridRetriever(top_k=2, vector_store=mock_store, reranker=reranker, rerank_candidates=5)
+    results = retriever.retrieve("龙")
+
+    assert [r["id"] for r in results] == ["lex", "id1"]
+    # 重排后 retrieval_score 仍为余弦相似度，而不是 RRF 融合得分
+    assert results[0]["retrieval_score"] == pytest.approx(1.0)
+    assert results[1]["retrieval_score"] == mock_store.search.return_value[1]["score"]
@@ -0,0 +1,41 @@
+"""测试来源目录"""
+import pytest
+from src.source_catalog import SourceCatalog, summarize_chunks
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    return SourceCatalog(path=tmp_path / "sources.sqlite3")
+
+
+def test_summarize_chunks():
+    """测试按来源汇总块数和字节数"""
+    totals = summarize_chunks(["a", "b", "a"], ["xy", "中", "z"])
+    assert totals == {"a": (2, 3), "b": (1, 3)}
+
+
+def test_add_and_remove_chunks(catalog):
+    """测试增量更新，块数归零时移除来源"""
+    catalog.add_chunks({"a": (2, 10), "b": (1, 5)}, "m1")
+    catalog.add_chunks({"a": (1, 4)}, "m2")
+
+    info = catalog.get("a")
+    assert (info.chunk_count, info.byte_size, info.model) == (3, 14, "m2")
+    assert info.ingested_at > 0
+
+    catalog.remove_chunks({"a": (1, 4), "b": (1, 5)})
+    assert [i.source for i in catalog.list()] == ["a"]
+    assert catalog.get("a").chunk_count == 2
+
+
+def test_remove_replace_and_clear(catalog):
+    """测试删除来源、整体替换和清空"""
+    catalog.add_chunks({"a": (1, 1), "b": (1, 1)}, "m")
+    catalog.remove("a")
+    assert [i.source for i in catalog.list()] == ["b"]
+
+    catalog.replace({"c": (4, 40)}, "m")
+    assert [(i.source, i.chunk_count) for i in catalog.list()] == [("c", 4)]
+
+    catalog.clear()
+    assert catalog.is_empty()
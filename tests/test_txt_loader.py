@@ -1,7 +1,8 @@
 """测试 TXT 加载器 - 针对长/短文本的场景"""
 import pytest
 from pathlib import Path
-from src.loaders.txt_loader import TXTLoader
+from src.loaders import txt_loader
+from src.loaders.txt_loader import TXTLoader, detect_encoding
 from src.chunking.splitter import get_text_splitter
 
 
@@ -157,3 +158,45 @@ class TestTXTWithRAGFlow:
         assert "char_count" in metadata
         assert metadata["type"] == "txt"
         assert metadata["char_count"] == len(content)
+
+
+class TestTXTEncoding:
+    """测试编码检测和增量解码"""
+
+    def test_detect_encoding(self):
+        """BOM、UTF-8 和 GB18030 的检测"""
+        assert detect_encoding("中文".encode("utf-8")) == "utf-8"
+        assert detect_encoding("\ufeff中文".encode("utf-8")) == "utf-8-sig"
+        assert detect_encoding("中文".encode("utf-16")) == "utf-16"
+        assert detect_encoding("中文".encode("gb18030")) == "gb18030"
+        # 末尾被截断的多字节字符仍视为 UTF-8
+        assert detect_encoding("中文".encode("utf-8")[:-1]) == "utf-8"
+        # 开头是纯 ASCII 但中间是 GBK 时以中间样本为准
+        assert detect_encoding(b"ascii", "中文".encode("gbk")) == "gb18030"
+
+    @pytest.mark.parametrize("encoding", ["gb18030", "utf-8-sig", "utf-16"])
+    def test_load_non_utf8_file(self, tmp_path, encoding):
+        """非 UTF-8 文件按检测到的编码解码"""
+        content = "第一章 开端\n这是一段中文。\n"
+        test_file = tmp_path / "novel.txt"
+        test_file.write_bytes(content.encode(encoding))
+
+        documents = TXTLoader().load(str(test_file))
+
+        assert len(documents) == 1
+        assert documents[0].content == content
+        assert documents[0].metadata["encoding"] == encoding
+
+    def test_incremental_decode_across_blocks(self, tmp_path, monkeypatch):
+        """多字节字符和 CRLF 跨越解码块边界时内容不变"""
+        monkeypatch.setattr(txt_loader, "READ_BLOCK_BYTES", 7)
+        chapters = [f"第{i}章 标题\r\n" + "正文内容。\r\n" * 5 for i in range(1, 4)]
+        test_file = tmp_path / "gbk.txt"
+        test_file.write_bytes("".join(chapters).encode("gbk"))
+
+        documents = TXTLoader(section_chars=30).load(str(test_file))
+
+        expected = "".join(chapters).replace("\r\n", "\n")
+        assert "".join(doc.content for doc in documents) == expected
+        assert [doc.content.split("\n")[0] for doc in documents] == ["第1章 标题", "第2章 标题", "第3章 标题"]
+        assert all(doc.metadata["encoding"] == "gb18030" for doc in documents)
@@ -43,3 +43,334 @@ def test_get_all_sources_dedup():
 
     sources = vs.get_all_sources()
     assert sources == ["/path/same_file.pdf"]
+
+
+def test_search_result_cache(vector_store):
+    """测试重复查询命中结果缓存，跳过查询 embedding"""
+    vector_store.add_documents([
+        Document(content="苹果", metadata={}, source="/path/a.pdf"),
+        Document(content="香蕉", metadata={}, source="/path/b.pdf"),
+    ])
+
+    first = vector_store.search("苹果", top_k=1)
+    second = vector_store.search("苹果", top_k=1)
+
+    assert first == second
+    assert vector_store._embeddings.queries == ["苹果"]
+
+
+def test_search_result_cache_invalidated_on_change(vector_store):
+    """测试集合变化时结果缓存失效"""
+    vector_store.add_documents([Document(content="苹果", metadata={}, source="/path/a.pdf")])
+    assert len(vector_store.search("苹果", top_k=5)) == 1
+
+    vector_store.add_documents([Document(content="苹果派", metadata={}, source="/path/b.pdf")])
+    assert len(vector_store.search("苹果", top_k=5)) == 2
+
+    vector_store.delete_by_source("/path/b.pdf")
+    assert len(vector_store.search("苹果", top_k=5)) == 1
+
+    vector_store.clear()
+    assert vector_store.search("苹果", top_k=5) == []
+
+
+def test_search_result_cache_expires_after_external_write(vector_store, monkeypatch):
+    """测试其他进程写入集合后，缓存的检索结果在 TTL 后过期"""
+    import src.cache.lru as lru_module
+    now = [100.0]
+    monkeypatch.setattr(lru_module.time, "monotonic", lambda: now[0])
+    vector_store._result_cache.ttl = 60
+    vector_store.add_documents([Document(content="苹果", metadata={}, source="/path/a.pdf")])
+    assert len(vector_store.search("苹果", top_k=5)) == 1
+
+    # 绕过 VectorStore 直接写入集合，相当于另一个进程摄入
+    vector_store.collection.upsert(
+        ids=["external"],
+        embeddings=[vector_store._embeddings.embed_query("苹果派")],
+        documents=["苹果派"],
+        metadatas=[{"source": "/path/b.pdf"}],
+    )
+    assert len(vector_store.search("苹果", top_k=5)) == 1
+
+    now[0] += 61
+    assert len(vector_store.search("苹果", top_k=5)) == 2
+
+
+def test_search_result_cache_keyed_by_filter(vector_store):
+    """测试不同过滤条件使用不同的缓存条目"""
+    vector_store.add_documents([
+        Document(content="苹果", metadata={}, source="/path/a.pdf"),
+        Document(content="苹果", metadata={}, source="/path/b.pdf"),
+    ])
+
+    all_results = vector_store.search("苹果", top_k=5)
+    filtered = vector_store.search("苹果", top_k=5, filter={"source": "/path/a.pdf"})
+
+    assert len(all_results) == 2
+    assert [r["metadata"]["source"] for r in filtered] == ["/path/a.pdf"]
+
+
+def test_search_many(vector_store):
+    """测试批量检索一次完成所有查询，结果与单次检索一致"""
+    vector_store.add_documents([
+        Document(content="苹果", metadata={}, source="/path/a.pdf"),
+        Document(content="香蕉", metadata={}, source="/path/b.pdf"),
+    ])
+
+    batched = vector_store.search_many(["苹果", "香蕉", "苹果"], top_k=1)
+
+    assert [r[0]["content"] for r in batched] == ["苹果", "香蕉", "苹果"]
+    # 重复查询只计算一次 embedding
+    assert vector_store._embeddings.queries == ["苹果", "香蕉"]
+    assert vector_store.search("香蕉", top_k=1) == batched[1]
+
+
+def test_search_scores(vector_store):
+    """测试返回余弦相似度，并按 min_score 截断"""
+    vector_store.add_documents([
+        Document(content="苹果", metadata={}, source="/path/a.pdf"),
+        Document(content="zzzz", metadata={}, source="/path/b.pdf"),
+    ])
+
+    results = vector_store.search("苹果", top_k=2)
+
+    assert results[0]["content"] == "苹果"
+    assert results[0]["score"] == pytest.approx(1.0, abs=1e-4)
+    assert results[1]["score"] < results[0]["score"]
+
+    trimmed = vector_store.search("苹果", top_k=2, min_score=0.99)
+    assert [r["content"] for r in trimmed] == ["苹果"]
+    assert len(vector_store.search_many(["苹果"], top_k=2, min_score=0.99)[0]) == 1
+
+
+def test_source_catalog_follows_collection(vector_store):
+    """测试来源目录随写入和删除同步更新"""
+    vector_store.add_documents([
+        Document(content="苹果", metadata={}, source="/path/a.pdf"),
+        Document(content="香蕉", metadata={}, source="/path/a.pdf"),
+        Document(content="橙子", metadata={}, source="/path/b.pdf"),
+    ], chunk_ids=["a0", "a1", "b0"])
+
+    infos = vector_store.list_sources()
+    assert [(i.source, i.chunk_count, i.byte_size) for i in infos] == [
+        ("/path/a.pdf", 2, 12),
+        ("/path/b.pdf", 1, 6),
+    ]
+    assert infos[0].model == "fake-embeddings"
+
+    vector_store.delete_ids(["a1"])
+    assert vector_store.source_catalog.get("/path/a.pdf").chunk_count == 1
+
+    vector_store.delete_by_source("/path/b.pdf")
+    assert vector_store.get_all_sources() == ["/path/a.pdf"]
+
+    vector_store.clear()
+    assert vector_store.get_all_sources() == []
+
+
+def test_source_catalog_rebuilt_for_existing_collection(vector_store):
+    """测试来源目录引入前的数据会自动补建目录"""
+    vector_store.add_documents([
+        Document(content="苹果", metadata={}, source="/path/a.pdf"),
+        Document(content="香蕉", metadata={}, source="/path/b.pdf"),
+    ])
+    vector_store.source_catalog.clear()
+
+    assert vector_store.get_all_sources() == ["/path/a.pdf", "/path/b.pdf"]
+
+
+def test_source_catalog_rebuild_reads_metadatas(vector_store, monkeypatch):
+    """测试重建来源目录按元数据中的字节数汇总，只为没有记录字节数的旧块读取文本"""
+    vector_store.add_documents([
+        Document(content="苹果", metadata={}, source="/path/a.pdf"),
+        Document(content="香蕉", metadata={}, source="/path/a.pdf"),
+        Document(content="橙子", metadata={}, source="/path/b.pdf"),
+    ], chunk_ids=["a0", "a1", "b0"])
+    vector_store.collection.update(ids=["a1"], metadatas=[{"byte_size": None}])
+    vector_store.source_catalog.clear()
+
+    get_calls = []
+    original_get = vector_store.collection.get
+
+    def spy_get(*args, **kwargs):
+        get_calls.append(kwargs)
+        return original_get(*args, **kwargs)
+
+    monkeypatch.setattr(vector_store.collection, "get", spy_get)
+
+    vector_store.rebuild_source_catalog()
+
+    infos = vector_store.source_catalog.list()
+    assert [(i.source, i.chunk_count, i.byte_size) for i in infos] == [
+        ("/path/a.pdf", 2, 12),
+        ("/path/b.pdf", 1, 6),
+    ]
+    document_calls = [call for call in get_calls if "documents" in call["include"]]
+    assert [call["ids"] for call in document_calls] == [["a1"]]
+
+
+def test_delete_by_sources_paged(vector_store, monkeypatch):
+    """测试批量删除多个来源，分页只读取 ID"""
+    import src.vector_store as vector_store_module
+    monkeypatch.setattr(vector_store_module, "DELETE_PAGE_SIZE", 2)
+
+    vector_store.add_documents(
+        [Document(content=f"块{i}", metadata={}, source=f"/path/{i % 3}.pdf") for i in range(9)]
+    )
+    get_calls = []
+    original_get = vector_store.collection.get
+
+    def spy_get(*args, **kwargs):
+        get_calls.append(kwargs)
+        return original_get(*args, **kwargs)
+
+    monkeypatch.setattr(vector_store.collection, "get", spy_get)
+
+    deleted = vector_store.delete_by_sources(["/path/0.pdf", "/path/1.pdf"])
+
+    assert deleted == 6
+    assert vector_store.get_all_sources() == ["/path/2.pdf"]
+    assert all(call["include"] == [] and call["limit"] == 2 for call in get_calls)
+    assert {r["metadata"]["source"] for r in vector_store.lexical_search("块", top_k=9)} == {"/path/2.pdf"}
+
+
+def test_delete_ids_paged_reads_metadatas_only(vector_store, monkeypatch):
+    """测试按 ID 删除分页进行，按元数据中的字节数更新来源目录而不读取文本"""
+    import src.vector_store as vector_store_module
+    monkeypatch.setattr(vector_store_module, "DELETE_PAGE_SIZE", 2)
+
+    ids = [f"a{i}" for i in range(5)]
+    vector_store.add_documents(
+        [Document(content=f"块{i}", metadata={}, source="/path/a.pdf") for i in range(5)],
+        chunk_ids=ids,
+    )
+    get_calls = []
+    original_get = vector_store.collection.get
+
+    def spy_get(*args, **kwargs):
+        get_calls.append(kwargs)
+        return original_get(*args, **kwargs)
+
+    monkeypatch.setattr(vector_store.collection, "get", spy_get)
+
+    vector_store.delete_ids(ids[:4])
+
+    assert [len(call["ids"]) for call in get_calls] == [2, 2]
+    assert all(call["include"] == ["metadatas"] for call in get_calls)
+    info = vector_store.source_catalog.get("/path/a.pdf")
+    assert (info.chunk_count, info.byte_size) == (1, len("块4".encode("utf-8")))
+
+
+def test_delete_ids_legacy_chunks_without_byte_size(vector_store):
+    """测试没有记录字节数的旧块删除时回退读取文本"""
+    vector_store.add_documents([
+        Document(content="苹果", metadata={}, source="/path/a.pdf"),
+        Document(content="香蕉", metadata={}, source="/path/a.pdf"),
+    ], chunk_ids=["a0", "a1"])
+    vector_store.collection.update(ids=["a0"], metadatas=[{"byte_size": None}])
+    assert "byte_size" not in vector_store.collection.get(ids=["a0"])["metadatas"][0]
+
+    vector_store.delete_ids(["a0"])
+
+    info = vector_store.source_catalog.get("/path/a.pdf")
+    assert (info.chunk_count, info.byte_size) == (1, 6)
+
+
+def test_source_exists_reads_ids_only(vector_store, monkeypatch):
+    """测试存在性检查只读取一个 ID"""
+    vector_store.add_documents([Document(content="苹果", metadata={}, source="/path/a.pdf")] * 3)
+    get_calls = []
+    original_get = vector_store.collection.get
+
+    def spy_get(*args, **kwargs):
+        get_calls.append(kwargs)
+        return original_get(*args, **kwargs)
+
+    monkeypatch.setattr(vector_store.collection, "get", spy_get)
+
+    assert vector_store.source_exists("/path/a.pdf")
+    assert not vector_store.source_exists("/path/b.pdf")
+    assert get_calls[0]["limit"] == 1 and get_calls[0]["include"] == []
+
+
+def test_add_documents_streams_in_windows(vector_store, monkeypatch):
+    """测试生成器输入按窗口 embedding 和写入，embedding 保持 NumPy 数组"""
+    import numpy as np
+    vector_store._max_batch_size = 2
+    add_calls = []
+    original_upsert = vector_store.collection.upsert
+
+    def spy_upsert(**kwargs):
+        add_calls.append(kwargs)
+        return original_upsert(**kwargs)
+
+    monkeypatch.setattr(vector_store.collection, "upsert", spy_upsert)
+
+    docs = (Document(content=f"块{i}", metadata={}, source="/path/a.pdf") for i in range(5))
+    added = vector_store.add_documents(docs)
+
+    assert added == 5
+    assert [len(call["ids"]) for call in add_calls] == [2, 2, 1]
+    assert all(isinstance(call["embeddings"], np.ndarray) for call in add_calls)
+    assert len(set(sum((call["ids"] for call in add_calls), []))) == 5
+    assert vector_store.collection.count() == 5
+
+
+def test_max_batch_size_respects_chroma_limit(vector_store, monkeypatch):
+    """测试窗口大小不超过 Chroma 的最大批大小"""
+    from src.config import config
+    monkeypatch.setattr(config, "CHROMA_ADD_BATCH_SIZE", 10 ** 9)
+
+    assert vector_store.max_batch_size == vector_store.client.get_max_batch_size()
+
+
+def test_add_documents_idempotent(vector_store):
+    """测试重复写入相同的块不会产生重复数据"""
+    docs = [
+        Document(content="苹果", metadata={}, source="/path/a.pdf"),
+        Document(content="香蕉", metadata={}, source="/path/a.pdf"),
+    ]
+    vector_store.add_documents(docs)
+    vector_store.add_documents(docs)
+
+    assert vector_store.collection.count() == 2
+    assert vector_store.source_catalog.get("/path/a.pdf").chunk_count == 2
+
+
+def test_get_windows_fetches_neighbors_in_one_call(vector_store, monkeypatch):
+    """测试相邻块窗口一次查询取回，并按所属文档和 chunk_index 区分"""
+    docs = [
+        Document(content=f"a{i}", metadata={"page": 1, "chunk_index": i, "total_chunks": 5}, source="/path/a.pdf")
+        for i in range(5)
+    ] + [
+        Document(content=f"a2-{i}", metadata={"page": 2, "chunk_index": i, "total_chunks": 2}, source="/path/a.pdf")
+        for i in range(2)
+    ] + [
+        Document(content=f"b{i}", metadata={"page": 1, "chunk_index": i, "total_chunks": 2}, source="/path/b.pdf")
+        for i in range(2)
+    ]
+    vector_store.add_documents(docs)
+    hits = [
+        vector_store.search("a2", top_k=1, filter={"$and": [{"page": 1}, {"chunk_index": 2}]})[0],
+        vector_store.search("b0", top_k=1, filter={"source": "/path/b.pdf"})[0],
+    ]
+
+    calls = []
+    original_get = vector_store.collection.get
+    monkeypatch.setattr(
+        vector_store.collection, "get", lambda **kwargs: calls.append(kwargs) or original_get(**kwargs)
+    )
+
+    windows = vector_store.get_windows(hits, window=1)
+
+    assert len(calls) == 1
+    assert [c["content"] for c in windows[0]] == ["a1", "a2", "a3"]
+    assert [c["content"] for c in windows[1]] == ["b0", "b1"]
+
+    # 第二次命中窗口缓存；集合变化后缓存失效
+    assert vector_store.get_windows(hits, window=1) == windows
+    assert len(calls) == 1
+    vector_store.delete_by_source("/path/b.pdf")
+    calls.clear()
+    assert vector_store.get_windows(hits[:1], window=1) == windows[:1]
+    assert len(calls) == 1